@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import base64
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:  # optional: pip install auditorium[brotli]
+    brotli = None
+
+# Bump when the bundle format changes, to invalidate cached bundles
+BUNDLE_VERSION = 1
+
+# Theme font families only needed when a feature is used
+FONT_FEATURES = {"Playfair Display": "headings"}
+
+_FEATURE_PATTERNS = {
+    # KaTeX output (browser export), or a $...$ / $$...$$ pair left for KaTeX's
+    # auto-render (native export). Like pandoc, a pair needs no space inside its
+    # delimiters and no digit after it, so prices and shell prompts don't count.
+    "math": re.compile(r'class="katex|\$\$[^$<]+\$\$|\$(?=[^\s$])[^$<]*(?<=[^\s$])\$(?!\d)'),
+    "code": re.compile(r"<pre[\s>]"),
+    "headings": re.compile(r"<h[1-3][\s>]"),
+}
+
+_FONT_MIME = {"woff2": "font/woff2", "woff": "font/woff", "ttf": "font/ttf"}
+
+# Smaller files aren't worth a compressed variant
+COMPRESS_MIN_SIZE = 1024
+
+# Cache-Control for URLs carrying the asset's content version
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def cache_dir() -> Path:
+    """Return auditorium's cache directory, following ``$XDG_CACHE_HOME``."""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "auditorium"
+
+
+def used_features(slide_doms: list[dict]) -> frozenset[str]:
+    """Return which optional assets (math, code, headings) the frames use."""
+    return frozenset(
+        name for name, pattern in _FEATURE_PATTERNS.items()
+        if any(pattern.search(dom["html"]) for dom in slide_doms)
+    )
+
+
+def stylesheet_bundle(static_dir: Path, features: frozenset[str]) -> str:
+    """Return theme, KaTeX and highlight.js CSS with fonts inlined.
+
+    Only the parts needed for *features* are included. Bundles are cached
+    on disk under a key derived from the size and mtime of every asset they
+    are built from, so editing an asset invalidates them without reading
+    any of them on a hit.
+    """
+    sources = _bundle_sources(static_dir, features)
+    key = hashlib.sha256(f"{BUNDLE_VERSION}:{','.join(sorted(features))}".encode())
+    for path in sources:
+        stat = path.stat()
+        key.update(f"{path.relative_to(static_dir).as_posix()}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    cached = cache_dir() / "bundles" / f"{key.hexdigest()}.css"
+    try:
+        return cached.read_text()
+    except OSError:
+        pass
+
+    bundle = _build_bundle(static_dir, features)
+    try:
+        cached.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cached.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(bundle)
+        tmp.replace(cached)
+    except OSError:
+        pass  # read-only cache: just don't persist
+    return bundle
+
+
+def _bundle_sources(static_dir: Path, features: frozenset[str]) -> list[Path]:
+    sources = [static_dir / "theme.css", *sorted((static_dir / "fonts").glob("*.woff2"))]
+    if "math" in features:
+        katex = static_dir / "vendor" / "katex"
+        sources += [katex / "katex.min.css", *sorted((katex / "fonts").glob("*.woff2"))]
+    if "code" in features:
+        sources += [static_dir / "vendor" / "hljs" / "styles" / "github.min.css", static_dir / "highlight.css"]
+    return sources
+
+
+def _build_bundle(static_dir: Path, features: frozenset[str]) -> str:
+    parts = [_inline_theme_fonts((static_dir / "theme.css").read_text(), static_dir, features)]
+    if "math" in features:
+        katex = static_dir / "vendor" / "katex"
+        parts.append(_inline_katex_fonts((katex / "katex.min.css").read_text(), katex / "fonts"))
+    if "code" in features:
+        parts.append((static_dir / "vendor" / "hljs" / "styles" / "github.min.css").read_text())
+        parts.append((static_dir / "highlight.css").read_text())
+    return "\n".join(parts)
+
+
+def _data_uri(path: Path) -> str:
+    mime = _FONT_MIME.get(path.suffix.lstrip("."), "font/woff2")
+    return f"data:{mime};base64,{base64.b64encode(path.read_bytes()).decode()}"
+
+
+def _inline_theme_fonts(theme_css: str, static_dir: Path, features: frozenset[str]) -> str:
+    """Inline the theme's own @font-face sources, dropping unused families."""
+    def _replace(match: re.Match) -> str:
+        rule = match.group(0)
+        family = re.search(r"font-family:\s*'([^']+)'", rule)
+        needs = FONT_FEATURES.get(family.group(1)) if family else None
+        if needs is not None and needs not in features:
+            return ""
+        return re.sub(
+            r"url\('/static/([^']+)'\)",
+            lambda m: f"url({_data_uri(static_dir / m.group(1))})",
+            rule,
+        )
+
+    return re.sub(r"@font-face\s*\{[^}]*\}", _replace, theme_css)
+
+
+def _inline_katex_fonts(katex_css: str, font_dir: Path) -> str:
+    """Replace KaTeX font url() references with base64 data URIs."""
+    def _replace(match: re.Match) -> str:
+        font_path = font_dir / match.group(1)
+        if font_path.exists():
+            return f"url({_data_uri(font_path)})"
+        return match.group(0)
+
+    result = re.sub(r'url\(fonts/([^)]+)\)', _replace, katex_css)
+    # Remove remaining non-inlined font references (woff/ttf fallbacks we don't have)
+    result = re.sub(r',\s*url\(fonts/[^)]+\)\s*format\([^)]+\)', '', result)
+    result = re.sub(r'url\(fonts/[^)]+\)\s*format\([^)]+\)\s*,?', '', result)
+    return result
+
+
+# --- Served assets ---
+
+
+@dataclass
+class Asset:
+    """A static file held in memory with its precompressed variants."""
+
+    body: bytes
+    media_type: str
+    version: str
+    encodings: dict[str, bytes] = field(default_factory=dict)
+
+    def etag(self, encoding: str | None = None) -> str:
+        """Strong ETag; each encoding is a distinct representation."""
+        return f'"{self.version}-{encoding}"' if encoding else f'"{self.version}"'
+
+
+class StaticAssets:
+    """Static files loaded once and precompressed with gzip (and brotli).
+
+    ``url()`` returns content-versioned URLs (``?v=<hash>``), which are
+    served as immutable; unversioned requests revalidate via ETag.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.assets: dict[str, Asset] = {}
+        for path in sorted(directory.rglob("*")):
+            if path.is_file():
+                name = path.relative_to(directory).as_posix()
+                self.assets[name] = _load_asset(path.read_bytes(), path.name)
+
+    def get(self, name: str) -> Asset | None:
+        return self.assets.get(name)
+
+    def url(self, name: str) -> str:
+        asset = self.assets.get(name)
+        return f"/static/{name}?v={asset.version}" if asset else f"/static/{name}"
+
+    def page(self, name: str) -> Asset:
+        """Return a shell page with its ``/static/`` references versioned."""
+        html = re.sub(
+            r'(href|src)="/static/([^"?#]+)"',
+            lambda m: f'{m.group(1)}="{self.url(m.group(2))}"',
+            (self.directory / name).read_text(),
+        )
+        return _load_asset(html.encode(), name)
+
+    def select(self, asset: Asset, accept_encoding: str) -> tuple[bytes, str | None]:
+        """Pick the smallest variant the client accepts."""
+        accepted = _accepted_encodings(accept_encoding)
+        for encoding in ("br", "gzip"):
+            if encoding in accepted and encoding in asset.encodings:
+                return asset.encodings[encoding], encoding
+        return asset.body, None
+
+    def stats(self) -> dict[str, int]:
+        """Raw and best-compressed byte totals across all assets."""
+        raw = sum(len(a.body) for a in self.assets.values())
+        best = sum(min([len(a.body), *map(len, a.encodings.values())]) for a in self.assets.values())
+        return {"files": len(self.assets), "raw": raw, "compressed": best, "saved": raw - best}
+
+
+def _load_asset(body: bytes, filename: str) -> Asset:
+    media_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    if media_type.startswith("text/") or media_type.endswith(("javascript", "json", "xml")):
+        media_type += "; charset=utf-8"
+    asset = Asset(body, media_type, hashlib.sha256(body).hexdigest()[:16])
+    if len(body) >= COMPRESS_MIN_SIZE:
+        variants = {"gzip": gzip.compress(body, 9, mtime=0)}
+        if brotli is not None:
+            variants["br"] = brotli.compress(body)
+        # Already-compressed formats (woff2, png) don't shrink; skip them
+        asset.encodings = {k: v for k, v in variants.items() if len(v) < len(body) * 0.9}
+    return asset
+
+
+def _accepted_encodings(header: str) -> set[str]:
+    accepted = set()
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q=") and q[2:].strip() in ("0", "0.0", "0.00", "0.000"):
+            continue
+        accepted.add(name.strip().lower())
+    return accepted
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import struct
+import threading
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from auditorium.console import console
+
+# Frame: header length and payload length (big-endian u32), the JSON header, the payload
+_PREFIX = struct.Struct("!II")
+# Frames queued for a worker before the broker drops them and has it resync
+BUS_QUEUE_LIMIT = 4096
+
+Handler = Callable[[dict, bytes], Awaitable[None]]
+
+
+def _frame(header: dict, payload: bytes = b"") -> bytes:
+    encoded = json.dumps(header).encode()
+    return _PREFIX.pack(len(encoded), len(payload)) + encoded + payload
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> tuple[dict, bytes, bytes]:
+    """Return a frame's header, payload and raw bytes."""
+    prefix = await reader.readexactly(_PREFIX.size)
+    header_size, payload_size = _PREFIX.unpack(prefix)
+    body = await reader.readexactly(header_size + payload_size)
+    return json.loads(body[:header_size]), body[header_size:], prefix + body
+
+
+class Broker:
+    """Local pub/sub broker for ``auditorium run --workers``.
+
+    Workers connect over a Unix socket and get the lowest free worker
+    number, so a restarted worker takes its predecessor's place. Frames
+    published to a channel are forwarded as-is to every other subscriber,
+    and every worker is told which worker numbers are connected.
+
+    Each worker's frames are queued and written by a background task that
+    waits for its socket to drain, so a slow worker never holds up the
+    others. One that falls :data:`BUS_QUEUE_LIMIT` frames behind has its
+    backlog dropped and gets an ``overflow`` frame telling it to resync.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.channels: dict[str, set[asyncio.StreamWriter]] = {}
+        self.workers: dict[asyncio.StreamWriter, int] = {}
+        self.queues: dict[asyncio.StreamWriter, asyncio.Queue[bytes]] = {}
+
+    async def serve(self, ready: threading.Event | None = None) -> None:
+        server = await asyncio.start_unix_server(self._serve_worker, path=str(self.path))
+        if ready is not None:
+            ready.set()
+        async with server:
+            await server.serve_forever()
+
+    async def _serve_worker(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        taken = set(self.workers.values())
+        worker = next(n for n in range(len(taken) + 1) if n not in taken)
+        self.workers[writer] = worker
+        self.queues[writer] = asyncio.Queue()
+        pump = asyncio.create_task(self._pump(writer, self.queues[writer]))
+        self._send(writer, _frame({"op": "welcome", "worker": worker}))
+        self._announce()
+        try:
+            while True:
+                header, _, raw = await _read_frame(reader)
+                channel = header.get("channel")
+                if header["op"] == "sub":
+                    self.channels.setdefault(channel, set()).add(writer)
+                elif header["op"] == "unsub":
+                    self.channels.get(channel, set()).discard(writer)
+                elif header["op"] == "pub":
+                    for subscriber in self.channels.get(channel, ()):
+                        if subscriber is not writer:
+                            self._send(subscriber, raw)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            pump.cancel()
+            del self.workers[writer]
+            del self.queues[writer]
+            for subscribers in self.channels.values():
+                subscribers.discard(writer)
+            writer.close()
+            self._announce()
+
+    def _send(self, writer: asyncio.StreamWriter, frame: bytes) -> None:
+        """Queue *frame* for a worker, resyncing it if it fell too far behind."""
+        queue = self.queues.get(writer)
+        if queue is None:
+            return
+        if queue.qsize() < BUS_QUEUE_LIMIT:
+            queue.put_nowait(frame)
+            return
+        # Worker membership may have been in the dropped backlog, so resend it
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(_frame({"op": "overflow"}))
+        queue.put_nowait(_frame({"op": "workers", "workers": sorted(self.workers.values())}))
+
+    async def _pump(self, writer: asyncio.StreamWriter, queue: asyncio.Queue[bytes]) -> None:
+        while True:
+            writer.write(await queue.get())
+            try:
+                await writer.drain()
+            except ConnectionError:
+                return
+
+    def _announce(self) -> None:
+        frame = _frame({"op": "workers", "workers": sorted(self.workers.values())})
+        for writer in self.workers:
+            self._send(writer, frame)
+
+
+def start_broker(path: Path) -> threading.Thread:
+    """Run a :class:`Broker` on *path* in a daemon thread; returns once it listens."""
+    ready = threading.Event()
+    thread = threading.Thread(target=asyncio.run, args=(Broker(path).serve(ready),), daemon=True)
+    thread.start()
+    ready.wait()
+    return thread
+
+
+class Bus:
+    """A worker's connection to the broker.
+
+    Handlers run one at a time in arrival order, so they should hand
+    slow work off to tasks. Publishing never blocks: the broker keeps
+    reading and queues frames per subscriber. A worker that falls behind
+    misses frames; *overflow_handlers* are then called to resync it.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, worker: int) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.worker = worker
+        self.workers: set[int] = {worker}
+        self.handlers: dict[str, Handler] = {}
+        self.overflow_handlers: list[Callable[[], None]] = []
+        self.task: asyncio.Task | None = None
+
+    @classmethod
+    async def connect(cls, path: Path) -> Bus:
+        reader, writer = await asyncio.open_unix_connection(str(path))
+        welcome, _, _ = await _read_frame(reader)
+        bus = cls(reader, writer, welcome["worker"])
+        bus.task = asyncio.create_task(bus._listen())
+        return bus
+
+    def subscribe(self, channel: str, handler: Handler) -> None:
+        self.handlers[channel] = handler
+        self.writer.write(_frame({"op": "sub", "channel": channel}))
+
+    def unsubscribe(self, channel: str) -> None:
+        self.handlers.pop(channel, None)
+        self.writer.write(_frame({"op": "unsub", "channel": channel}))
+
+    def publish(self, channel: str, payload: bytes = b"", **fields) -> None:
+        """Send *payload* to the channel's subscribers; *fields* go in the header."""
+        self.writer.write(_frame({"op": "pub", "channel": channel, **fields}, payload))
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                header, payload, _ = await _read_frame(self.reader)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                return
+            if header["op"] == "workers":
+                self.workers = set(header["workers"])
+            elif header["op"] == "overflow":
+                for handler in self.overflow_handlers:
+                    handler()
+            elif header["op"] == "pub":
+                handler = self.handlers.get(header["channel"])
+                if handler is None:
+                    continue
+                try:
+                    await handler(header, payload)
+                except Exception:
+                    console.print_exception()
+
+    def close(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+        self.writer.close()
@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import threading
+import types
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from auditorium.reload import fingerprint
+
+# Directory, next to the deck file, holding the on-disk tier
+CACHE_DIR = ".auditorium-cache"
+# Results kept in memory per store, least recently used evicted first
+MEMORY_ENTRIES = 128
+# Bytes of pickled results kept on disk per store, least recently used evicted first
+DISK_BYTES = 256 * 1024 * 1024
+
+_stores: dict[Path | None, ResultCache] = {}
+_fingerprints: weakref.WeakKeyDictionary[types.FunctionType, str] = weakref.WeakKeyDictionary()
+
+
+def key_for(key: str, fn: Callable, args: tuple, kwargs: dict) -> str:
+    """Hash a user key, the code of *fn* and its arguments into a cache key.
+
+    *fn* is identified by :func:`auditorium.reload.fingerprint` (its code
+    and the deck-local code it uses), so results survive reloads and
+    restarts but not edits. Arguments must be picklable.
+    """
+    h = hashlib.sha256(key.encode())
+    h.update(_identify(fn).encode())
+    try:
+        h.update(pickle.dumps((args, sorted(kwargs.items())), protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception as e:
+        raise TypeError(f"cached arguments of {key!r} must be picklable: {e}") from None
+    return h.hexdigest()[:32]
+
+
+def _identify(fn: Callable) -> str:
+    if isinstance(fn, types.FunctionType):
+        code = _fingerprints.get(fn)
+        if code is None:
+            code = _fingerprints[fn] = fingerprint(fn)
+        return code
+    return f"{getattr(fn, '__module__', '')}.{getattr(fn, '__qualname__', type(fn).__qualname__)}"
+
+
+class ResultCache:
+    """Two-tier store for results of expensive slide computations.
+
+    An in-memory LRU of up to *max_entries* results sits in front of
+    pickle files in *directory* (none when it is None), trimmed to
+    *max_bytes* by evicting the least recently used. Results that can't
+    be pickled are only kept in memory.
+    """
+
+    def __init__(self, directory: Path | None = None, max_entries: int = MEMORY_ENTRIES, max_bytes: int = DISK_BYTES) -> None:
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._memory: OrderedDict[str, Any] = OrderedDict()
+        self._disk_bytes: int | None = None
+        # Keys being computed, so concurrent sessions wait instead of recomputing
+        self._pending: dict[str, asyncio.Future] = {}
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+        # Guards the memory tier and counters: @cached helpers run in compute threads
+        self._lock = threading.RLock()
+
+    def lookup(self, key: str) -> tuple[bool, Any]:
+        """Return ``(True, result)`` from either tier, or ``(False, None)``."""
+        hit, value = self._recall(key)
+        if hit:
+            return hit, value
+        return self._load(key)
+
+    def store(self, key: str, value: Any) -> None:
+        """Keep *value* in memory and, if it pickles, on disk."""
+        with self._lock:
+            self._remember(key, value)
+        self._save(key, value)
+
+    def get(self, key: str, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Return the result of ``fn(*args, **kwargs)`` for *key*, computing it on a miss."""
+        cache_key = key_for(key, fn, args, kwargs)
+        hit, value = self.lookup(cache_key)
+        if not hit:
+            value = fn(*args, **kwargs)
+            self.store(cache_key, value)
+        return value
+
+    async def get_async(self, key: str, fn: Callable, args: tuple, kwargs: dict, run: Callable[[], Awaitable]) -> Any:
+        """Like :meth:`get`, computing a miss by awaiting ``run()``.
+
+        Sessions asking for a key that is being computed wait for that
+        computation instead of starting their own. Pickling and disk I/O
+        run in the loop's default executor.
+        """
+        cache_key = key_for(key, fn, args, kwargs)
+        loop = asyncio.get_running_loop()
+        while (pending := self._pending.get(cache_key)) is not None:
+            try:
+                value = await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                continue  # the computing session went away; take over
+            with self._lock:
+                self._stats["memory_hits"] += 1
+            return value
+        hit, value = self._recall(cache_key)
+        if hit:
+            return value
+        future = self._pending[cache_key] = loop.create_future()
+        try:
+            hit, value = await loop.run_in_executor(None, self._load, cache_key)
+            if not hit:
+                value = await run()
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                future.exception()  # retrieved: waiters re-raise it, nobody else needs to
+            raise
+        finally:
+            del self._pending[cache_key]
+        future.set_result(value)
+        if not hit:
+            with self._lock:
+                self._remember(cache_key, value)
+            await loop.run_in_executor(None, self._save, cache_key, value)
+        return value
+
+    def stats(self) -> dict[str, int]:
+        """Hit, miss and eviction counters, and the size of each tier."""
+        with self._lock:
+            return {**self._stats, "entries": len(self._memory), "disk_bytes": self._disk_usage()}
+
+    def clear(self) -> None:
+        """Drop every result from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            if self.directory is not None and self.directory.is_dir():
+                for path in self.directory.glob("*.pkl"):
+                    self._remove(path)
+            self._disk_bytes = 0
+
+    def _path(self, key: str) -> Path | None:
+        return self.directory / f"{key}.pkl" if self.directory is not None else None
+
+    def _recall(self, key: str) -> tuple[bool, Any]:
+        with self._lock:
+            if key not in self._memory:
+                return False, None
+            self._memory.move_to_end(key)
+            self._stats["memory_hits"] += 1
+            return True, self._memory[key]
+
+    def _load(self, key: str) -> tuple[bool, Any]:
+        """Read *key* from the disk tier into memory, counting a disk hit or a miss."""
+        path = self._path(key)
+        if path is not None and path.exists():
+            try:
+                value = pickle.loads(path.read_bytes())
+                os.utime(path)
+            except Exception:
+                self._remove(path)
+            else:
+                with self._lock:
+                    self._stats["disk_hits"] += 1
+                    self._remember(key, value)
+                return True, value
+        with self._lock:
+            self._stats["misses"] += 1
+        return False, None
+
+    def _save(self, key: str, value: Any) -> None:
+        """Write *value* to the disk tier if it pickles and fits."""
+        path = self._path(key)
+        if path is None:
+            return
+        try:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return
+        if len(data) > self.max_bytes:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        with self._lock:
+            usage = self._disk_usage()
+            old = path.stat().st_size if path.exists() else 0
+            os.replace(tmp, path)
+            self._disk_bytes = usage + len(data) - old
+            self._trim_disk()
+
+    def _remember(self, key: str, value: Any) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _disk_usage(self) -> int:
+        if self._disk_bytes is None:
+            files = self.directory.glob("*.pkl") if self.directory is not None and self.directory.is_dir() else ()
+            self._disk_bytes = sum(path.stat().st_size for path in files)
+        return self._disk_bytes
+
+    def _trim_disk(self) -> None:
+        if self._disk_usage() <= self.max_bytes:
+            return
+        files = sorted(self.directory.glob("*.pkl"), key=lambda path: path.stat().st_mtime_ns)
+        for path in files:
+            if self._disk_bytes <= self.max_bytes:
+                break
+            self._remove(path)
+            self._stats["evictions"] += 1
+
+    def _remove(self, path: Path) -> None:
+        with self._lock:
+            try:
+                size = path.stat().st_size
+                path.unlink()
+            except OSError:
+                return
+            if self._disk_bytes is not None:
+                self._disk_bytes -= size
+
+
+def cache_for(directory: Path | None) -> ResultCache:
+    """The process-wide store for *directory* (memory only for None).
+
+    Shared by every session and kept across hot reloads.
+    """
+    if directory is not None:
+        directory = directory.resolve()
+    store = _stores.get(directory)
+    if store is None:
+        store = _stores[directory] = ResultCache(directory)
+    return store
+
+
+def cached(fn: Callable | None = None, *, key: str | None = None) -> Callable:
+    """Decorator memoizing a function in the store next to the file defining it::
+
+        @cached
+        def train(epochs):
+            ...
+
+    Calls with the same arguments return the stored result, across
+    sessions, hot reloads and restarts, until the function's code (or the
+    deck-local code it uses) changes. Works on coroutine functions too.
+
+    A plain function may compute, pickle and read files, so it must not
+    be called on the event loop, where it would stall every session: it
+    raises RuntimeError there. Run it with ``await ctx.compute(fn, ...)``,
+    or make it ``async def``.
+    """
+    def decorator(fn: Callable) -> Callable:
+        name = key or fn.__qualname__
+        store = cache_for(Path(fn.__code__.co_filename).parent / CACHE_DIR)
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                return await store.get_async(name, fn, args, kwargs, lambda: fn(*args, **kwargs))
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if _on_event_loop():
+                    raise RuntimeError(
+                        f"@cached {fn.__qualname__}() would block the event loop; "
+                        f"use await ctx.compute({fn.__name__}, ...) or make it async def"
+                    )
+                return store.get(name, fn, *args, **kwargs)
+        return wrapper
+
+    if fn is not None:
+        return decorator(fn)
+    return decorator
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def cache_info() -> dict[str, dict[str, int]]:
+    """Return :meth:`ResultCache.stats` for every store, by directory."""
+    return {str(directory or "memory"): store.stats() for directory, store in _stores.items()}
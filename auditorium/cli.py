@@ -2,14 +2,19 @@ from __future__ import annotations
 
 import asyncio
 import importlib.util
+import json
+import os
 import signal
 import sys
+import time
 from pathlib import Path
 
 import typer
 import uvicorn
 
 from auditorium.console import console
+from auditorium.cache import CACHE_DIR
+from auditorium.reload import local_modules
 
 app = typer.Typer(name="auditorium", help="Python-scripted live slide framework")
 
@@ -28,8 +33,16 @@ def main(
     pass
 
 
-def _load_deck(deck_path: Path):
-    """Import a deck.py file and find the Deck instance."""
+# Deck directory -> modules imported from it while loading the deck
+_deck_modules: dict[str, set[str]] = {}
+
+
+def _load_deck(deck_path: Path, overrides: dict | None = None):
+    """Import a deck.py file and find the Deck instance.
+
+    *overrides* maps Deck attribute names to values that replace whatever
+    the deck file configured (used for CLI flags).
+    """
     from auditorium.deck import Deck
 
     module_name = f"_deck_{id(deck_path)}"
@@ -41,17 +54,30 @@ def _load_deck(deck_path: Path):
     deck_dir = str(deck_path.parent.resolve())
     if deck_dir not in sys.path:
         sys.path.insert(0, deck_dir)
-    spec.loader.exec_module(module)
+    # Re-import helper modules the previous load pulled in from the deck's
+    # directory, so edits to them take effect on hot reload
+    for name in _deck_modules.pop(deck_dir, ()):
+        sys.modules.pop(name, None)
+    before = set(sys.modules)
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        _deck_modules[deck_dir] = local_modules(set(sys.modules) - before, Path(deck_dir))
     for attr in dir(module):
         obj = getattr(module, attr)
         if isinstance(obj, Deck):
+            for name, value in (overrides or {}).items():
+                setattr(obj, name, value)
+            if obj.cache_dir is None:
+                obj.cache_dir = deck_path.parent / CACHE_DIR
+            obj.build_index()
             return obj
     console.print(f"[red]Error:[/] no Deck instance found in {deck_path}")
     raise typer.Exit(1)
 
 
-def _print_banner(deck, host: str, port: int) -> None:
-    """Print a startup banner with deck info."""
+def _print_banner(deck, host: str, port: int, assets=None) -> None:
+    """Print a startup banner with deck info and static asset savings."""
     from rich.panel import Panel
     from rich.text import Text
 
@@ -64,10 +90,26 @@ def _print_banner(deck, host: str, port: int) -> None:
     body.append("\n")
     body.append("URL:    ", style="dim")
     body.append(f"http://{host}:{port}", style="bold cyan")
+    if assets is not None:
+        stats = assets.stats()
+        body.append("\n")
+        body.append("Assets: ", style="dim")
+        body.append(
+            f"{stats['files']} files, {_format_bytes(stats['raw'])} → "
+            f"{_format_bytes(stats['compressed'])} compressed "
+        )
+        body.append(f"(saves {_format_bytes(stats['saved'])})", style="green")
 
     console.print(Panel(body, title="[bold]Auditorium[/]", border_style="dim"))
 
 
+def _format_bytes(n: int) -> str:
+    for unit in ("B", "KB", "MB"):
+        if n < 1024 or unit == "MB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+
 @app.command()
 def run(
     deck_path: Path = typer.Argument(..., help="Path to the deck.py file"),
@@ -76,6 +118,14 @@ def run(
     open_browser: bool = typer.Option(True, "--open/--no-open", help="Open browser automatically"),
     presenter: bool = typer.Option(False, "--presenter", help="Also open presenter view"),
     watch: bool = typer.Option(True, "--watch/--no-watch", help="Watch for file changes and hot-reload"),
+    batch: bool | None = typer.Option(None, "--batch/--no-batch", help="Batch mutations between steps into one frame (default: deck setting)"),
+    ack_window: int | None = typer.Option(None, "--ack-window", min=1, help="Max unacknowledged mutations per session (default: deck setting)"),
+    broadcast: bool | None = typer.Option(None, "--broadcast/--no-broadcast", help="Run slides once for the presenter and mirror them to all viewers (default: deck setting)"),
+    server_highlight: bool | None = typer.Option(None, "--server-highlight/--client-highlight", help="Highlight code blocks with Pygments on the server instead of in the browser (default: deck setting)"),
+    speculate: bool | None = typer.Option(None, "--speculate/--no-speculate", help="Pre-run the next slide up to its first step while the current one waits (default: deck setting)"),
+    deflate: bool = typer.Option(True, "--deflate/--no-deflate", help="Offer permessage-deflate WebSocket compression"),
+    trace: Path | None = typer.Option(None, "--trace", help="Write a Chrome trace per session to this directory and report keypress-to-paint latency on exit"),
+    workers: int = typer.Option(1, "-w", "--workers", min=1, help="Worker processes to shard sessions across, joined by a local pub/sub bus"),
 ) -> None:
     """Run a presentation deck."""
     deck_path = deck_path.resolve()
@@ -83,33 +133,95 @@ def run(
         console.print(f"[red]Error:[/] {deck_path} not found")
         raise typer.Exit(1)
 
-    deck = _load_deck(deck_path)
-    from auditorium.server import create_app
+    # CLI overrides of deck settings, re-applied on every hot reload
+    overrides: dict = {}
+    if batch is not None:
+        overrides["batch_mutations"] = batch
+    if ack_window is not None:
+        overrides["ack_window"] = ack_window
+    if broadcast is not None:
+        overrides["broadcast"] = broadcast
+    if speculate is not None:
+        overrides["speculate"] = speculate
+    if server_highlight is not None:
+        overrides["server_highlight"] = server_highlight
+
+    if workers > 1 and trace is not None:
+        console.print("[red]Error:[/] --trace needs a single worker")
+        raise typer.Exit(1)
 
-    application = create_app(deck)
-    _print_banner(deck, host, port)
+    deck = _load_deck(deck_path, overrides)
+    if workers > 1:
+        # Each worker builds its own app, so skip the asset summary rather than build one here
+        _print_banner(deck, host, port)
+    else:
+        from auditorium.server import create_app
 
-    if watch:
-        _setup_watcher(application, deck_path)
+        application = create_app(deck, trace_dir=trace.resolve() if trace else None)
+        _print_banner(deck, host, port, application.state.assets)
+        if watch:
+            _setup_watcher(application, deck_path, overrides)
 
     if open_browser:
         import webbrowser
         import threading
 
         def _open():
-            import time
             time.sleep(0.5)
-            webbrowser.open(f"http://{host}:{port}")
+            # In broadcast mode this tab leads; other viewers just follow
+            lead = "?lead=1" if deck.broadcast else ""
+            webbrowser.open(f"http://{host}:{port}/{lead}")
             if presenter:
                 time.sleep(0.3)
                 webbrowser.open(f"http://{host}:{port}/presenter")
 
         threading.Thread(target=_open, daemon=True).start()
 
-    _start_live_status(application, deck)
+    if workers > 1:
+        console.print(f"  [dim]{workers} workers · hot reload and live status are off[/]")
+        _run_workers(deck_path, overrides, host, port, workers, deflate)
+        return
+
+    _start_live_status(application)
+
+    if trace is None:
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+    # Otherwise shut down gracefully, so traces get written
+    uvicorn.run(application, host=host, port=port, log_level="warning", ws_per_message_deflate=deflate)
+    if trace is not None:
+        _print_latency_summary(application, trace)
+
+
+def _run_workers(deck_path: Path, overrides: dict, host: str, port: int, workers: int, deflate: bool) -> None:
+    """Serve from several worker processes joined by a local broker."""
+    import shutil
+    import tempfile
+    from auditorium.bus import start_broker
+
+    runtime = Path(tempfile.mkdtemp(prefix="auditorium-"))
+    bus_path = runtime / "bus.sock"
+    start_broker(bus_path)
+    # Workers are fresh processes that build their app from these
+    os.environ.update(
+        AUDITORIUM_DECK=str(deck_path),
+        AUDITORIUM_OVERRIDES=json.dumps(overrides),
+        AUDITORIUM_BUS=str(bus_path),
+    )
+    try:
+        uvicorn.run(
+            "auditorium.cli:_worker_app", factory=True, workers=workers,
+            host=host, port=port, log_level="warning", ws_per_message_deflate=deflate,
+        )
+    finally:
+        shutil.rmtree(runtime, ignore_errors=True)
+
+
+def _worker_app():
+    """App factory for each ``--workers`` process."""
+    from auditorium.server import create_app
 
-    signal.signal(signal.SIGINT, signal.SIG_DFL)
-    uvicorn.run(application, host=host, port=port, log_level="warning")
+    deck = _load_deck(Path(os.environ["AUDITORIUM_DECK"]), json.loads(os.environ["AUDITORIUM_OVERRIDES"]))
+    return create_app(deck, bus_path=Path(os.environ["AUDITORIUM_BUS"]))
 
 
 @app.command()
@@ -121,6 +233,9 @@ def record(
     slide_delay: float = typer.Option(3.0, "-d", "--slide-delay", help="Seconds to linger on completed slide before advancing"),
     live: bool = typer.Option(False, "--live", help="Launch visible browser for manual recording"),
     port: int = typer.Option(0, help="Server port (0 = random)"),
+    virtual: bool = typer.Option(False, "--virtual", help="Render each state once and encode with ffmpeg, faster than real time"),
+    fps: int = typer.Option(30, "--fps", min=1, help="Frame rate of virtual-time recordings"),
+    jobs: int = typer.Option(1, "-j", "--jobs", min=1, help="Pages rendering and segments encoding in parallel (with --virtual)"),
 ) -> None:
     """Record a presentation to video."""
     deck_path = deck_path.resolve()
@@ -128,6 +243,16 @@ def record(
         console.print(f"[red]Error:[/] {deck_path} not found")
         raise typer.Exit(1)
 
+    if virtual and live:
+        console.print("[red]Error:[/] [bold]--virtual[/] can't be combined with [bold]--live[/].")
+        raise typer.Exit(1)
+
+    if jobs > 1 and not virtual:
+        # Real-time segments start with page-load frames that can't be cut
+        # losslessly, so they wouldn't join seamlessly
+        console.print("[red]Error:[/] [bold]--jobs[/] requires [bold]--virtual[/].")
+        raise typer.Exit(1)
+
     if port == 0:
         import socket
         with socket.socket() as s:
@@ -135,7 +260,7 @@ def record(
             port = s.getsockname()[1]
 
     from auditorium.recorder import record as do_record
-    asyncio.run(do_record(deck_path, output, resolution, auto_step, slide_delay, live, port))
+    asyncio.run(do_record(deck_path, output, resolution, auto_step, slide_delay, live, port, virtual, fps, jobs))
 
 
 @app.command()
@@ -146,6 +271,8 @@ def export(
     resolution: str = typer.Option("1920x1080", "-r", "--resolution", help="Viewport size, e.g. 1280x720"),
     step_by_step: bool = typer.Option(False, "-s", "--step-by-step", help="One page/frame per step instead of per slide"),
     port: int = typer.Option(0, help="Server port (0 = random)"),
+    jobs: int = typer.Option(1, "-j", "--jobs", min=1, help="Number of browser pages exporting slides in parallel"),
+    engine: str = typer.Option("auto", "--engine", help="Export engine: browser, native (HTML only, no Chromium), or auto"),
 ) -> None:
     """Export presentation to PDF, HTML, or PNG."""
     deck_path = deck_path.resolve()
@@ -157,6 +284,10 @@ def export(
         console.print(f"[red]Error:[/] unknown format [bold]'{fmt}'[/]. Use pdf, html, or png.")
         raise typer.Exit(1)
 
+    if engine not in ("auto", "browser", "native"):
+        console.print(f"[red]Error:[/] unknown engine [bold]'{engine}'[/]. Use auto, browser, or native.")
+        raise typer.Exit(1)
+
     if output is None:
         stem = deck_path.stem
         if fmt == "png":
@@ -171,73 +302,123 @@ def export(
             port = s.getsockname()[1]
 
     from auditorium.exporter import export_deck
-    asyncio.run(export_deck(deck_path, output, fmt, resolution, step_by_step, port))
+    asyncio.run(export_deck(deck_path, output, fmt, resolution, step_by_step, port, jobs, engine))
 
 
-def _start_live_status(application, deck) -> None:
-    """Start a background thread that displays live session status."""
-    import threading
-    from rich.live import Live
-    from rich.table import Table
+def _start_live_status(application) -> None:
+    """Show live server status, read from the metrics registry.
 
-    def _render():
-        table = Table(show_header=True, header_style="dim", box=None, padding=(0, 1))
-        table.add_column("Session", style="dim", width=8)
-        table.add_column("Slide", width=20)
-        table.add_column("Status", width=10)
+    Snapshots are taken inside the event loop once a second, so nothing
+    walks the sessions from another thread; Rich only renders the table.
+    """
+    from rich.live import Live
 
-        sessions = getattr(application.state, "sessions", {})
-        if not sessions:
-            table.add_row("", "[dim]No connections[/]", "")
-        else:
-            for i, (sid, session) in enumerate(sessions.items()):
-                slide_idx = session.current_slide
-                total = len(deck.slides) if deck else 0
-                slide_name = ""
-                if deck and slide_idx < len(deck.slides):
-                    slide_name = deck.slides[slide_idx].name
-                task_status = "idle"
-                if session.slide_task and not session.slide_task.done():
-                    task_status = "[green]running[/]"
-                elif session.step_event:
-                    task_status = "[yellow]waiting[/]"
-                table.add_row(
-                    f"#{i + 1}",
-                    f"{slide_idx + 1}/{total} [dim]{slide_name}[/]",
-                    task_status,
-                )
-        return table
-
-    def _run():
-        import time
-        # Wait for server to start
-        time.sleep(1)
-        with Live(_render(), console=console, refresh_per_second=2, transient=True) as live:
+    async def _run() -> None:
+        metrics = application.state.metrics
+        before, then = metrics.collect(), time.monotonic()
+        with Live(_status_table(application, before, {}), console=console, transient=True) as live:
             while True:
-                time.sleep(0.5)
-                live.update(_render())
-
-    thread = threading.Thread(target=_run, daemon=True)
-    thread.start()
-
+                await asyncio.sleep(1.0)
+                now = metrics.collect()
+                elapsed = time.monotonic() - then
+                rates = {
+                    name: (now[name] - before[name]) / elapsed
+                    for name in ("auditorium_mutations_total", "auditorium_bytes_sent_total")
+                }
+                live.update(_status_table(application, now, rates))
+                before, then = now, time.monotonic()
+
+    @application.on_event("startup")
+    async def _start() -> None:
+        application.state.live_status = asyncio.create_task(_run())
+
+    @application.on_event("shutdown")
+    async def _stop() -> None:
+        application.state.live_status.cancel()
+
+
+def _status_table(application, snapshot: dict, rates: dict):
+    from rich.table import Table
 
-def _setup_watcher(application, deck_path: Path) -> None:
-    """Set up a file watcher that hot-reloads the deck on changes."""
+    deck = application.state.deck
+    total = len(deck.slides) if deck else 0
+    table = Table(show_header=True, header_style="dim", box=None, padding=(0, 1))
+    table.add_column("Session", style="dim", width=8)
+    table.add_column("Slide", width=20)
+    table.add_column("Status", width=10)
+
+    slides = snapshot["auditorium_session_slide"]
+    states = snapshot["auditorium_session_state"]
+    if not slides:
+        table.add_row("", "[dim]No connections[/]", "")
+    for i, (sid, slide_idx) in enumerate(slides.items()):
+        slide_name = deck.slides[slide_idx].name if deck and slide_idx < total else ""
+        status = ("idle", "[green]running[/]", "[yellow]waiting[/]")[states.get(sid, 0)]
+        table.add_row(f"#{i + 1}", f"{slide_idx + 1}/{total} [dim]{slide_name}[/]", status)
+
+    ack = snapshot["auditorium_ack_latency_seconds"]
+    latency = f"{ack['p50'] * 1000:.1f}/{ack['p95'] * 1000:.1f} ms" if ack["count"] else "—"
+    table.caption = (
+        f"{snapshot['auditorium_sessions_active']} active · "
+        f"{rates.get('auditorium_mutations_total', 0):.0f} mut/s · "
+        f"{_format_bytes(rates.get('auditorium_bytes_sent_total', 0))}/s · "
+        f"ack p50/p95 {latency} · "
+        f"{snapshot['auditorium_pending_acks']} pending · "
+        f"{snapshot['auditorium_reloads_total']:.0f} reloads"
+    )
+    return table
+
+
+def _print_latency_summary(application, trace_dir: Path) -> None:
+    """Print keypress-to-paint percentiles per slide from the traced sessions."""
+    from rich.table import Table
+    from auditorium.trace import latency_summary, percentile
+
+    latencies = latency_summary(application.state.tracers)
+    if not latencies:
+        console.print(f"[dim]No keypresses traced · traces in {trace_dir}[/]")
+        return
+    table = Table(title="Keypress to paint (ms)", header_style="dim", box=None, padding=(0, 1))
+    table.add_column("Slide")
+    for column in ("n", "p50", "p95", "max"):
+        table.add_column(column, justify="right")
+    for slide, values in latencies.items():
+        table.add_row(
+            slide, str(len(values)),
+            f"{percentile(values, 0.5):.1f}", f"{percentile(values, 0.95):.1f}", f"{max(values):.1f}",
+        )
+    console.print(table)
+    console.print(f"[dim]Traces in {trace_dir} · open in ui.perfetto.dev or chrome://tracing[/]")
+
+
+def _setup_watcher(application, deck_path: Path, overrides: dict | None = None) -> None:
+    """Set up a file watcher that hot-reloads the deck on changes.
+
+    Python changes reload the deck module (and deck-local helpers);
+    markdown changes only restart sessions whose slide read the file.
+    Either way, sessions whose current slide didn't change keep running.
+    """
     import threading
     from watchfiles import watch as watch_files
 
     def _watch():
         watch_dir = deck_path.parent
-        for _changes in watch_files(watch_dir, watch_filter=_python_filter):
+        for changes in watch_files(watch_dir, watch_filter=_deck_filter):
+            changed = {Path(path).resolve() for _, path in changes}
             console.print("[yellow]⟳[/] Change detected, reloading...")
             try:
-                new_deck = _load_deck(deck_path)
+                new_deck = None
+                if any(path.suffix == ".py" for path in changed):
+                    new_deck = _load_deck(deck_path, overrides)
                 loop = getattr(application.state, "loop", None)
                 if loop and loop.is_running():
                     from auditorium.server import reload_deck
-                    asyncio.run_coroutine_threadsafe(
-                        reload_deck(application, new_deck), loop
+                    future = asyncio.run_coroutine_threadsafe(
+                        reload_deck(application, new_deck, changed), loop
                     )
+                    restarted = future.result()
+                    sessions = len(application.state.sessions)
+                    console.print(f"[green]✓[/] Reloaded, restarted {restarted} of {sessions} sessions")
             except Exception as e:
                 console.print(f"[red]Reload error:[/] {e}")
 
@@ -245,6 +426,6 @@ def _setup_watcher(application, deck_path: Path) -> None:
     thread.start()
 
 
-def _python_filter(change, path: str) -> bool:
-    """Only watch Python files."""
-    return path.endswith(".py")
+def _deck_filter(change, path: str) -> bool:
+    """Only watch Python and markdown files."""
+    return path.endswith((".py", ".md")) and "__pycache__" not in path
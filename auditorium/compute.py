@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import multiprocessing
+import os
+import runpy
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from multiprocessing.connection import Connection
+from typing import Any, Callable
+
+
+@dataclass(frozen=True)
+class DeckFunction:
+    """Picklable stand-in for a function defined in a deck file.
+
+    Decks are loaded under generated module names that worker processes
+    cannot import, so the function travels as its file and qualified name
+    and the worker runs the whole file to find it, top-level side effects
+    included. Only needed where processes are spawned rather than forked
+    (macOS, Windows): a forked process already has the function.
+    """
+
+    path: str
+    qualname: str
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        obj: Any = _deck_globals(self.path, os.stat(self.path).st_mtime_ns)
+        name, *attrs = self.qualname.split(".")
+        obj = obj[name]
+        for attr in attrs:
+            obj = getattr(obj, attr)
+        return obj(*args, **kwargs)
+
+
+@functools.lru_cache(maxsize=8)
+def _deck_globals(path: str, mtime: int) -> dict[str, Any]:
+    return runpy.run_path(path, run_name="__auditorium_compute__")
+
+
+def portable(fn: Callable) -> Callable:
+    """Return *fn*, or a :class:`DeckFunction` if pickle can't find it by name."""
+    module = sys.modules.get(getattr(fn, "__module__", None) or "")
+    target: Any = module
+    for attr in getattr(fn, "__qualname__", "").split("."):
+        target = getattr(target, attr, None)
+    if target is fn or not hasattr(fn, "__code__") or "<locals>" in fn.__qualname__:
+        # Importable, or not a plain function: left for pickle to handle or reject
+        return fn
+    return DeckFunction(fn.__code__.co_filename, fn.__qualname__)
+
+
+def _call_in_process(conn: Connection, fn: Callable, args: tuple, kwargs: dict) -> None:
+    try:
+        result = (True, fn(*args, **kwargs))
+    except BaseException as e:
+        result = (False, e)
+    try:
+        conn.send(result)
+    except Exception as e:
+        # Unpicklable result or exception
+        conn.send((False, TypeError(f"compute result can't be sent back: {e}")))
+    conn.close()
+
+
+class ComputePool:
+    """Threads and processes for ``ctx.compute``, created on first use.
+
+    *workers* caps the threads and the concurrent processes; None uses the
+    CPU count. Threads suit code that releases the GIL (numpy, I/O);
+    processes suit pure Python, at the cost of pickling arguments and
+    results. Each process call gets its own process, so cancelling it
+    (leaving the slide) can terminate it instead of letting stale work
+    hold a worker.
+    """
+
+    def __init__(self, workers: int | None = None) -> None:
+        self.workers = workers
+        self._threads: ThreadPoolExecutor | None = None
+        # Limits concurrent process calls; bound to the loop that created it
+        self._process_slots: tuple[asyncio.AbstractEventLoop, asyncio.Semaphore] | None = None
+
+    def executor(self) -> ThreadPoolExecutor:
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="auditorium-compute")
+        return self._threads
+
+    async def run(self, fn: Callable, *args: Any, process: bool = False, **kwargs: Any) -> Any:
+        """Run ``fn(*args, **kwargs)`` in a thread or process and return its result.
+
+        Cancelling the caller drops the call if it has not started yet. A
+        running process call is terminated; a running thread call finishes
+        in the background and its result is discarded.
+        """
+        if process:
+            return await self._run_process(fn, args, kwargs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor(), functools.partial(fn, *args, **kwargs))
+
+    async def _run_process(self, fn: Callable, args: tuple, kwargs: dict) -> Any:
+        loop = asyncio.get_running_loop()
+        if self._process_slots is None or self._process_slots[0] is not loop:
+            self._process_slots = loop, asyncio.Semaphore(self.workers or os.cpu_count() or 1)
+        context = multiprocessing.get_context()
+        if context.get_start_method() != "fork":
+            fn = portable(fn)
+        async with self._process_slots[1]:
+            reader, writer = context.Pipe(duplex=False)
+            worker = context.Process(target=_call_in_process, args=(writer, fn, args, kwargs), daemon=True)
+            worker.start()
+            writer.close()
+            ready = loop.create_future()
+            loop.add_reader(reader.fileno(), lambda: ready.done() or ready.set_result(None))
+            try:
+                await ready
+                try:
+                    ok, value = reader.recv()
+                except EOFError:
+                    raise ChildProcessError(f"compute process exited with code {worker.exitcode}") from None
+            finally:
+                loop.remove_reader(reader.fileno())
+                reader.close()
+                if worker.is_alive():
+                    worker.terminate()
+                # Reap it off the loop; it has sent its result or been killed
+                loop.run_in_executor(None, worker.join)
+        if not ok:
+            raise value
+        return value
+
+    def shutdown(self) -> None:
+        """Stop the threads without waiting, dropping calls not yet started.
+
+        Running process calls finish; the next calls get fresh slots, sized
+        from *workers*.
+        """
+        if self._threads is not None:
+            self._threads.shutdown(wait=False, cancel_futures=True)
+        self._threads = None
+        self._process_slots = None
+
+
+@functools.cache
+def default_pool() -> ComputePool:
+    """The process-wide pool for sessions that have none (e.g. native export)."""
+    return ComputePool()
@@ -1,6 +1,10 @@
 from __future__ import annotations
 
+import textwrap
+from bisect import bisect_right
+from collections.abc import Iterable, Sequence
 from dataclasses import dataclass, field
+from pathlib import Path
 from typing import Callable, Any
 
 
@@ -16,13 +20,161 @@ class SlideInfo:
         return self.title or self.func.__name__
 
 
+@dataclass(frozen=True)
+class SlideMeta:
+    """Presenter metadata for a slide, computed once per deck load.
+
+    Slides from lazy sources get theirs on first use instead.
+    """
+    ordinal: int
+    title: str
+    notes_html: str
+    excerpt: str
+
+
+def _excerpt(doc: str | None) -> str:
+    """Return the first paragraph of a docstring, joined into one line."""
+    if not doc:
+        return ""
+    para = []
+    for line in textwrap.dedent(doc).strip().split("\n"):
+        if line.strip() == "" and para:
+            break
+        if line.strip():
+            para.append(line.strip())
+    return " ".join(para)
+
+
+class SlideSource:
+    """A run of generated slides, materialized one by one as they are needed.
+
+    *source* is an iterable (or a zero-argument callable returning one,
+    called on first use) yielding slide functions or ``(title, func)`` pairs.
+    *count* must be known upfront so the deck length is available without
+    running the generator.
+    """
+
+    def __init__(self, source: Iterable | Callable[[], Iterable], count: int, order: float | None) -> None:
+        self.count = count
+        self.order = order
+        self._source = source
+        self._iterator = None
+        self._items: list[SlideInfo] = []
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> SlideInfo:
+        if self._iterator is None:
+            self._iterator = iter(self._source() if callable(self._source) else self._source)
+        while len(self._items) <= index:
+            try:
+                item = next(self._iterator)
+            except StopIteration:
+                raise IndexError(
+                    f"slide source yielded {len(self._items)} slides, expected {self.count}"
+                ) from None
+            title = None
+            if isinstance(item, tuple):
+                title, item = item
+            self._items.append(SlideInfo(func=item, title=title, order=self.order))
+        return self._items[index]
+
+
+class SlideSequence(Sequence[SlideInfo]):
+    """Slides in presentation order, with O(1) lookup by position and name.
+
+    Lazy sources count towards the length but are only expanded when one
+    of their slides is accessed. Name lookup covers slides registered with
+    ``@deck.slide``, and generated slides once they have been expanded;
+    until then they are addressed by position.
+    """
+
+    def __init__(self, entries: list[SlideInfo | SlideSource]) -> None:
+        self._entries = entries
+        self._starts: list[int] = []
+        self._names: dict[str, int] = {}
+        # Slides of each lazy source (by entry) already in _names
+        self._expanded: dict[int, int] = {}
+        total = 0
+        for entry in entries:
+            self._starts.append(total)
+            if isinstance(entry, SlideSource):
+                total += len(entry)
+            else:
+                self._names.setdefault(entry.name, total)
+                total += 1
+        self._len = total
+        self._eager = not any(isinstance(entry, SlideSource) for entry in entries)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._len))]
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("slide index out of range")
+        if self._eager:
+            return self._entries[index]
+        k = bisect_right(self._starts, index) - 1
+        entry = self._entries[k]
+        if isinstance(entry, SlideSource):
+            slide = entry[index - self._starts[k]]
+            self._index_expanded(k, entry)
+            return slide
+        return entry
+
+    def _index_expanded(self, k: int, source: SlideSource) -> None:
+        """Add the names of the slides *source* has produced since last time."""
+        done = self._expanded.get(k, 0)
+        for offset, slide in enumerate(source._items[done:], start=done):
+            self._names.setdefault(slide.name, self._starts[k] + offset)
+        self._expanded[k] = len(source._items)
+
+    def find(self, name: str) -> int | None:
+        """Return the position of the slide with this name or title."""
+        return self._names.get(name)
+
+
 class Deck:
     """Top-level object holding slides and presentation metadata."""
 
-    def __init__(self, title: str = "Untitled", extra_css: str | None = None) -> None:
+    def __init__(
+        self,
+        title: str = "Untitled",
+        extra_css: str | None = None,
+        *,
+        batch_mutations: bool = False,
+        ack_window: int = 1,
+        broadcast: bool = False,
+        speculate: bool = False,
+        compute_workers: int | None = None,
+        cache_dir: str | Path | None = None,
+        server_highlight: bool = False,
+    ) -> None:
         self.title = title
         self.extra_css = extra_css
-        self._slides: list[SlideInfo] = []
+        # Send mutations between timing boundaries as one acked frame
+        self.batch_mutations = batch_mutations
+        # Max mutations in flight per session before send_mutation blocks
+        self.ack_window = max(1, ack_window)
+        # Run each slide once for the presenter and mirror it to every viewer
+        self.broadcast = broadcast
+        # Run the next slide up to its first step while the current one waits
+        self.speculate = speculate
+        # Size of each ctx.compute pool (threads, processes); None for the default
+        self.compute_workers = compute_workers
+        # On-disk tier of ctx.cached; `auditorium run` defaults it to next to the deck file
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        # Highlight md() code blocks with Pygments instead of highlight.js in the browser
+        self.server_highlight = server_highlight
+        self._slides: list[SlideInfo | SlideSource] = []
+        self._sequence: SlideSequence | None = None
+        self._metadata: dict[int, SlideMeta] = {}
+        self._fingerprints: dict[int, str] = {}
 
     def slide(
         self,
@@ -33,22 +185,109 @@ class Deck:
     ) -> Callable:
         """Decorator to register an async function as a slide."""
         def decorator(fn: Callable) -> Callable:
-            self._slides.append(SlideInfo(func=fn, title=title, order=order))
+            self._register(SlideInfo(func=fn, title=title, order=order))
             return fn
 
         if func is not None:
             return decorator(func)
         return decorator
 
+    def generate(
+        self,
+        source: Iterable | Callable[[], Iterable] | None = None,
+        *,
+        count: int,
+        order: float | None = None,
+    ) -> Any:
+        """Register *count* generated slides, produced lazily from *source*.
+
+        Works as a decorator on a generator function, which is not called
+        until one of its slides is first needed::
+
+            @deck.generate(count=10_000)
+            def numbers():
+                for i in range(10_000):
+                    async def slide(ctx, i=i):
+                        await ctx.md(f"# {i}")
+                    yield f"Number {i}", slide
+
+        The whole run is placed as one unit, by *order* like ``@deck.slide``.
+        """
+        def decorator(src: Iterable | Callable[[], Iterable]) -> Any:
+            self._register(SlideSource(src, count, order))
+            return src
+
+        if source is not None:
+            return decorator(source)
+        return decorator
+
+    def _register(self, entry: SlideInfo | SlideSource) -> None:
+        self._slides.append(entry)
+        self._sequence = None
+        self._metadata = {}
+        self._fingerprints = {}
+
     @property
-    def slides(self) -> list[SlideInfo]:
+    def slides(self) -> SlideSequence:
         """Return slides in presentation order.
 
         Slides with explicit order come first (sorted by order),
         then slides without explicit order in registration order.
+        The ordering is cached until the next registration.
+        """
+        if self._sequence is None:
+            ordered = [s for s in self._slides if s.order is not None]
+            unordered = [s for s in self._slides if s.order is None]
+            ordered.sort(key=lambda s: s.order)
+            self._sequence = SlideSequence(ordered + unordered)
+        return self._sequence
+
+    def find(self, name: str) -> int | None:
+        """Return the index of the slide with this name or title, if any."""
+        return self.slides.find(name)
+
+    def meta(self, index: int) -> SlideMeta:
+        """Return notes HTML, excerpt, title and ordinal for a slide.
+
+        Precomputed by :meth:`build_index`; generated slides are filled in
+        on first use.
+        """
+        meta = self._metadata.get(index)
+        if meta is None:
+            meta = self._metadata[index] = _build_meta(index, self.slides[index])
+        return meta
+
+    def fingerprint(self, index: int) -> str:
+        """Return a hash of a slide's code and the deck-local code it uses.
+
+        Hot reload compares it across deck versions to tell which slides
+        actually changed. Computed on first use and kept for this deck.
         """
-        ordered = [(i, s) for i, s in enumerate(self._slides) if s.order is not None]
-        unordered = [(i, s) for i, s in enumerate(self._slides) if s.order is None]
-        ordered.sort(key=lambda x: x[1].order)
-        unordered.sort(key=lambda x: x[0])
-        return [s for _, s in ordered] + [s for _, s in unordered]
+        fingerprint = self._fingerprints.get(index)
+        if fingerprint is None:
+            from auditorium.reload import fingerprint as compute
+            fingerprint = self._fingerprints[index] = compute(self.slides[index].func)
+        return fingerprint
+
+    def build_index(self) -> None:
+        """Render notes and excerpts for every registered slide upfront.
+
+        Slide transitions then do no markdown work. Generated slides are
+        skipped so that large lazy decks still load instantly.
+        """
+        slides = self.slides
+        for entry, start in zip(slides._entries, slides._starts):
+            if isinstance(entry, SlideInfo) and start not in self._metadata:
+                self._metadata[start] = _build_meta(start, entry)
+
+
+def _build_meta(index: int, slide: SlideInfo) -> SlideMeta:
+    from auditorium.render import render_markdown
+
+    doc = slide.func.__doc__
+    return SlideMeta(
+        ordinal=index,
+        title=slide.name,
+        notes_html=render_markdown(doc) if doc else "",
+        excerpt=_excerpt(doc),
+    )
@@ -0,0 +1,354 @@
+from __future__ import annotations
+
+import functools
+import html
+import re
+from html.parser import HTMLParser
+
+VOID_ELEMENTS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "source", "track", "wbr",
+})
+RAW_TEXT_ELEMENTS = frozenset({"script", "style"})
+# Start tags that end an open <p>, as in the HTML parsing algorithm
+CLOSES_P = frozenset({
+    "address", "article", "aside", "blockquote", "details", "div", "dl", "fieldset",
+    "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6",
+    "header", "hgroup", "hr", "main", "menu", "nav", "ol", "p", "pre", "section",
+    "summary", "table", "ul", "li", "dd", "dt",
+})
+# Start tag -> (open elements it ends, elements that stop the search)
+IMPLIED_END = {
+    "li": ({"li"}, {"ul", "ol"}),
+    "dt": ({"dt", "dd"}, {"dl"}),
+    "dd": ({"dt", "dd"}, {"dl"}),
+    "tr": ({"tr"}, {"table", "thead", "tbody", "tfoot"}),
+    "td": ({"td", "th"}, {"tr", "table"}),
+    "th": ({"td", "th"}, {"tr", "table"}),
+    "thead": ({"thead", "tbody", "tfoot"}, {"table"}),
+    "tbody": ({"thead", "tbody", "tfoot"}, {"table"}),
+    "tfoot": ({"thead", "tbody", "tfoot"}, {"table"}),
+    "option": ({"option"}, {"select", "datalist"}),
+}
+# Elements a <p> can't be closed across
+P_SCOPE = frozenset({"button", "table", "td", "th", "caption", "object", "template"})
+
+
+class UnsupportedSelector(ValueError):
+    """Raised for CSS selectors the server-side DOM cannot evaluate."""
+
+
+class Element:
+    """A minimal DOM element: tag, ordered attributes and children.
+
+    Children are ``Element`` instances or plain strings (unescaped text).
+    """
+
+    __slots__ = ("tag", "attrs", "children", "parent")
+
+    def __init__(self, tag: str, attrs: dict[str, str | None] | None = None) -> None:
+        self.tag = tag
+        self.attrs: dict[str, str | None] = dict(attrs or {})
+        self.children: list[Element | str] = []
+        self.parent: Element | None = None
+
+    @property
+    def id(self) -> str | None:
+        return self.attrs.get("id")
+
+    @property
+    def classes(self) -> list[str]:
+        return (self.attrs.get("class") or "").split()
+
+    def add_class(self, *names: str) -> None:
+        classes = self.classes
+        classes += [n for n in names if n and n not in classes]
+        self.attrs["class"] = " ".join(classes)
+
+    def remove_class(self, *names: str) -> None:
+        self.attrs["class"] = " ".join(c for c in self.classes if c not in names)
+
+    def append(self, child: Element | str) -> None:
+        if isinstance(child, Element):
+            if child.parent is not None:
+                child.parent.children.remove(child)
+            child.parent = self
+        self.children.append(child)
+
+    def remove(self) -> None:
+        if self.parent is not None:
+            self.parent.children.remove(self)
+            self.parent = None
+
+    def elements(self):
+        """Yield descendant elements in document order."""
+        for child in self.children:
+            if isinstance(child, Element):
+                yield child
+                yield from child.elements()
+
+    def query(self, selector: str) -> Element | None:
+        """Return the first descendant matching *selector*, like ``querySelector``."""
+        groups = _parse_selector(selector)
+        for el in self.elements():
+            if any(_matches(el, group) for group in groups):
+                return el
+        return None
+
+    def set_inner_html(self, markup: str) -> None:
+        for child in self.children:
+            if isinstance(child, Element):
+                child.parent = None
+        self.children = []
+        for node in parse_fragment(markup):
+            self.append(node)
+
+    def inner_html(self) -> str:
+        if self.tag in RAW_TEXT_ELEMENTS:
+            return "".join(c for c in self.children if isinstance(c, str))
+        return "".join(
+            c.outer_html() if isinstance(c, Element) else html.escape(c, quote=False)
+            for c in self.children
+        )
+
+    def outer_html(self) -> str:
+        attrs = "".join(
+            f" {k}" if v is None else f' {k}="{html.escape(v)}"'
+            for k, v in self.attrs.items()
+        )
+        if self.tag in VOID_ELEMENTS:
+            return f"<{self.tag}{attrs}>"
+        return f"<{self.tag}{attrs}>{self.inner_html()}</{self.tag}>"
+
+
+class _FragmentParser(HTMLParser):
+    """Builds a fragment tree the way a browser's ``innerHTML`` would.
+
+    Covers the implied end tags markdown and hand-written slides rely on
+    (``<p>``, ``<li>``, ``<dt>``/``<dd>``, table rows and cells,
+    ``<option>``), not the full HTML tree construction rules (there is no
+    implied ``<tbody>``, for one).
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.root = Element("#fragment")
+        self.stack = [self.root]
+
+    def handle_starttag(self, tag, attrs):
+        self._close_implied(tag)
+        el = Element(tag, dict(attrs))
+        self.stack[-1].append(el)
+        if tag not in VOID_ELEMENTS:
+            self.stack.append(el)
+
+    def handle_startendtag(self, tag, attrs):
+        self._close_implied(tag)
+        self.stack[-1].append(Element(tag, dict(attrs)))
+
+    def handle_endtag(self, tag):
+        # Close up to the matching open element; stray end tags are ignored
+        for i in range(len(self.stack) - 1, 0, -1):
+            if self.stack[i].tag == tag:
+                del self.stack[i:]
+                return
+        if tag == "p":
+            # A stray </p> becomes an empty paragraph
+            self.stack[-1].append(Element("p"))
+
+    def _close_implied(self, tag: str) -> None:
+        if tag in CLOSES_P:
+            self._close({"p"}, P_SCOPE)
+        if tag in IMPLIED_END:
+            closes, bounds = IMPLIED_END[tag]
+            self._close(closes, bounds)
+
+    def _close(self, tags: set[str], bounds: frozenset[str] | set[str]) -> None:
+        """Pop up to and including the innermost open element in *tags*."""
+        for i in range(len(self.stack) - 1, 0, -1):
+            open_tag = self.stack[i].tag
+            if open_tag in tags:
+                del self.stack[i:]
+                return
+            if open_tag in bounds:
+                return
+
+    def handle_data(self, data):
+        self.stack[-1].append(data)
+
+
+def parse_fragment(markup: str) -> list[Element | str]:
+    """Parse an HTML fragment into a list of top-level nodes."""
+    parser = _FragmentParser()
+    parser.feed(markup)
+    parser.close()
+    nodes = parser.root.children
+    for node in nodes:
+        if isinstance(node, Element):
+            node.parent = None
+    return nodes
+
+
+# --- Selectors ---
+#
+# Supports what slides realistically use: tag, #id, .class, [attr],
+# [attr=value] and *, combined with descendant (space) and child (>)
+# combinators, and comma-separated groups. Anything else (pseudo-classes,
+# sibling combinators) raises UnsupportedSelector.
+
+_COMPOUND = re.compile(
+    r"""(?P<tag>\*|[a-zA-Z][\w-]*)?
+        (?P<rest>(?:\#[\w-]+|\.[\w-]+|\[[\w-]+(?:=(?:"[^"]*"|'[^']*'|[^\]]*))?\])*)""",
+    re.VERBOSE,
+)
+_PART = re.compile(r"""\#([\w-]+)|\.([\w-]+)|\[([\w-]+)(?:=("[^"]*"|'[^']*'|[^\]]*))?\]""")
+
+
+def _parse_compound(text: str) -> tuple:
+    match = _COMPOUND.fullmatch(text)
+    if not text or match is None:
+        raise UnsupportedSelector(text)
+    tag = match.group("tag")
+    ids, classes, attrs = [], [], []
+    for id_, cls, attr, value in _PART.findall(match.group("rest")):
+        if id_:
+            ids.append(id_)
+        elif cls:
+            classes.append(cls)
+        else:
+            attrs.append((attr, value.strip("\"'") if value else None))
+    return (None if tag in (None, "*") else tag.lower(), ids, classes, attrs)
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_selector(selector: str) -> list[list[tuple]]:
+    groups = []
+    for group in selector.split(","):
+        tokens = re.sub(r"\s*>\s*", " > ", group.strip()).split()
+        if not tokens:
+            raise UnsupportedSelector(selector)
+        # Stored right-to-left: [(compound, combinator-to-the-left), ...]
+        chain, combinator = [], " "
+        for token in tokens:
+            if token == ">":
+                combinator = ">"
+                continue
+            chain.append((_parse_compound(token), combinator))
+            combinator = " "
+        groups.append(chain[::-1])
+    return groups
+
+
+def _matches_compound(el: Element, compound: tuple) -> bool:
+    tag, ids, classes, attrs = compound
+    if tag is not None and el.tag != tag:
+        return False
+    if any(el.id != i for i in ids):
+        return False
+    el_classes = el.classes
+    if any(c not in el_classes for c in classes):
+        return False
+    for name, value in attrs:
+        if name not in el.attrs or (value is not None and el.attrs[name] != value):
+            return False
+    return True
+
+
+def _matches(el: Element, chain: list[tuple]) -> bool:
+    (compound, combinator), rest = chain[0], chain[1:]
+    if not _matches_compound(el, compound):
+        return False
+    if not rest:
+        return True
+    # *combinator* links this compound to the next one on its left
+    parent = el.parent
+    if combinator == ">":
+        return parent is not None and _is_element(parent) and _matches(parent, rest)
+    while parent is not None and _is_element(parent):
+        if _matches(parent, rest):
+            return True
+        parent = parent.parent
+    return False
+
+
+def _is_element(node: Element) -> bool:
+    """False for the synthetic document/fragment containers."""
+    return not node.tag.startswith("#")
+
+
+class SlideDom:
+    """Server-side model of ``#slide-root``.
+
+    Applies mutations with the same semantics as ``applyMutation`` in the
+    browser client, so its snapshot reproduces what the audience sees
+    (before client-side math and code rendering).
+    """
+
+    ROOT_CLASS = "aud-slide-root"
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        """Empty the slide root, like the client's ``resetRoot``."""
+        self.document = Element("#document")
+        self.root = Element("div", {"id": "slide-root", "class": self.ROOT_CLASS})
+        self.document.append(self.root)
+        self.targets: list[tuple[str | None, Element]] = [(None, self.root)]
+
+    def query(self, selector: str) -> Element | None:
+        return self.document.query(selector)
+
+    def apply(self, mutation: dict) -> None:
+        """Apply one mutation dict as produced by ``SlideContext``."""
+        action = mutation.get("action")
+        if action == "append":
+            target = self.query(mutation["target"]) if mutation.get("target") else self.targets[-1][1]
+            wrapper = Element("div")
+            wrapper.set_inner_html(mutation["html"])
+            el = next((c for c in wrapper.children if isinstance(c, Element)), wrapper)
+            if mutation.get("element_id"):
+                el.attrs["id"] = mutation["element_id"]
+            if target is not None:
+                target.append(el)
+        elif action == "remove":
+            el = self.query(mutation["selector"])
+            if el is not None:
+                el.remove()
+        elif action == "replace":
+            el = self.query(mutation["selector"])
+            if el is not None:
+                el.set_inner_html(mutation["html"])
+        elif action == "set_class":
+            el = self.query(mutation["selector"])
+            if el is not None:
+                el.add_class(*mutation["cls"].split(" "))
+        elif action == "remove_class":
+            el = self.query(mutation["selector"])
+            if el is not None:
+                el.remove_class(*mutation["cls"].split(" "))
+        elif action == "push_target":
+            el = self.query(mutation["selector"])
+            if el is not None:
+                self.targets.append((mutation["selector"], el))
+        elif action == "pop_target":
+            if len(self.targets) > 1:
+                self.targets.pop()
+
+    def snapshot(self) -> dict:
+        """Return the root's markup, classes and open insertion targets."""
+        return {
+            "html": self.root.inner_html(),
+            "classes": self.root.attrs.get("class") or "",
+            "targets": [selector for selector, _ in self.targets[1:]],
+        }
+
+    def load(self, snapshot: dict) -> None:
+        """Rebuild the DOM from a :meth:`snapshot`, like the client's ``applySnapshot``."""
+        self.reset()
+        self.root.set_inner_html(snapshot["html"])
+        self.root.attrs["class"] = snapshot.get("classes") or self.ROOT_CLASS
+        for selector in snapshot.get("targets", []):
+            el = self.query(selector)
+            if el is not None:
+                self.targets.append((selector, el))
@@ -1,15 +1,34 @@
 from __future__ import annotations
 
 import asyncio
-import base64
+import importlib.util
+import re
 import shutil
 import tempfile
+from dataclasses import dataclass, field
 from pathlib import Path
 
 import typer
 import uvicorn
 
+from auditorium.assets import stylesheet_bundle, used_features
 from auditorium.console import console
+from auditorium.dom import UnsupportedSelector
+from auditorium.server import Session
+
+# CSS that kills all animations/transitions so exports capture
+# final state without mid-animation artifacts.
+DISABLE_ANIM_CSS = """
+    *, *::before, *::after {
+        animation-duration: 0s !important;
+        animation-delay: 0s !important;
+        transition-duration: 0s !important;
+        transition-delay: 0s !important;
+    }
+"""
+
+# A code block the server did not highlight (see render.highlight_code)
+_UNHIGHLIGHTED = re.compile(r"<pre[^>]*>\s*<code(?![^>]*data-highlighted)")
 
 
 async def export_deck(
@@ -19,13 +38,29 @@ async def export_deck(
     resolution: str,
     step_by_step: bool,
     port: int,
+    jobs: int = 1,
+    engine: str = "auto",
 ) -> None:
     """Export a presentation to PDF, HTML, or PNG.
 
-    The *step_by_step* parameter is accepted for forward compatibility but is
-    not yet implemented -- the current version always captures the final DOM
-    state of each slide.
+    With *step_by_step*, one frame is captured per ``step()``/``sleep()``
+    boundary instead of only the final state of each slide. *jobs* pages
+    export slides concurrently; output order does not depend on it.
+
+    *engine* is ``browser`` (Chromium via playwright), ``native`` (HTML
+    only, built from the server-side DOM mirror without a browser), or
+    ``auto``, which uses native for HTML when playwright is missing.
     """
+    if engine == "auto":
+        has_playwright = importlib.util.find_spec("playwright") is not None
+        engine = "native" if fmt == "html" and not has_playwright else "browser"
+    if engine == "native":
+        if fmt != "html":
+            console.print(f"[red]Error:[/] the native engine only exports HTML, not {fmt.upper()}.")
+            raise typer.Exit(1)
+        await _export_native(deck_path, output, resolution, step_by_step)
+        return
+
     try:
         from playwright.async_api import async_playwright
     except ImportError:
@@ -39,7 +74,8 @@ async def export_deck(
     from auditorium.cli import _load_deck
     from auditorium.server import STATIC_DIR, create_app
 
-    deck = _load_deck(deck_path)
+    # Every capture page drives its own slides
+    deck = _load_deck(deck_path, {"broadcast": False})
     app = create_app(deck)
     total = len(deck.slides)
 
@@ -56,26 +92,19 @@ async def export_deck(
     try:
         async with async_playwright() as p:
             browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page(viewport={"width": width, "height": height})
 
             if fmt == "png":
                 output.mkdir(parents=True, exist_ok=True)
 
-            slide_doms: list[dict] = []
+            # One isolated context per job, each with its own server sessions
+            jobs = max(1, min(jobs, total))
+            pages = []
+            for _ in range(jobs):
+                context = await browser.new_context(viewport={"width": width, "height": height})
+                pages.append(await context.new_page())
 
             from rich.progress import Progress, BarColumn, TextColumn, TimeElapsedColumn, TimeRemainingColumn
 
-            # CSS that kills all animations/transitions so exports capture
-            # final state without mid-animation artifacts.
-            DISABLE_ANIM_CSS = """
-                *, *::before, *::after {
-                    animation-duration: 0s !important;
-                    animation-delay: 0s !important;
-                    transition-duration: 0s !important;
-                    transition-delay: 0s !important;
-                }
-            """
-
             with Progress(
                 TextColumn("[bold]{task.description}"),
                 BarColumn(),
@@ -85,63 +114,20 @@ async def export_deck(
                 console=console,
             ) as progress:
                 task = progress.add_task(f"Exporting {fmt.upper()}", total=total)
-                for i in range(total):
-                    if step_by_step:
-                        # Step-by-step: no auto_step (steps block), instant_sleep.
-                        # We drive each step via keypress and capture between each.
-                        url = f"http://127.0.0.1:{port}/?instant_sleep=1&slide_delay=9999&_s={i}#slide-{i}"
-                        await page.goto(url, wait_until="load")
-                        await page.add_style_tag(content=DISABLE_ANIM_CSS)
-
-                        step_idx = 0
-                        while True:
-                            # Wait for DOM to settle
-                            await page.wait_for_timeout(200)
-
-                            # Check if slide already completed
-                            done = await page.evaluate(
-                                "() => window.__auditorium_slide_complete === true"
-                            )
-                            # Capture current state
-                            await _capture(page, fmt, output, slide_doms, i, step_idx)
-                            step_idx += 1
-
-                            if done:
-                                break
-
-                            # Advance one step/sleep boundary by sending a keypress
-                            await page.keyboard.press("ArrowRight")
-                            # Wait for the step/sleep to resolve and new content to render.
-                            # Use a short poll: either step_count changes, slide completes,
-                            # or we timeout after 2s (handles slides that finish between
-                            # steps without sending step_complete).
-                            prev_count = await page.evaluate(
-                                "() => window.__auditorium_step_count || 0"
-                            )
-                            try:
-                                await page.wait_for_function(
-                                    f"() => (window.__auditorium_step_count || 0) > {prev_count} "
-                                    f"|| window.__auditorium_slide_complete === true",
-                                    timeout=2000,
-                                )
-                            except Exception:
-                                # Timeout is OK — slide may have completed between checks
-                                pass
+                results: dict[int, list[dict]] = {}
+                indices = iter(range(total))
 
-                        progress.update(task, advance=1)
-                    else:
-                        # Default: auto_step=0 + instant_sleep — everything runs
-                        # instantly, capture final state.
-                        url = f"http://127.0.0.1:{port}/?auto_step=0&instant_sleep=1&slide_delay=9999&_s={i}#slide-{i}"
-                        await page.goto(url, wait_until="load")
-                        await page.add_style_tag(content=DISABLE_ANIM_CSS)
-                        await page.wait_for_function(
-                            "() => window.__auditorium_slide_complete === true",
-                            timeout=120000,
-                        )
-                        await _capture(page, fmt, output, slide_doms, i, None)
+                async def worker(page) -> None:
+                    # Pull slide indices from the shared iterator until exhausted
+                    for i in indices:
+                        results[i] = await _export_slide(page, port, i, fmt, output, step_by_step)
                         progress.update(task, advance=1)
 
+                await asyncio.gather(*(worker(page) for page in pages))
+
+            # Reassemble in deck order, whatever order the jobs finished in
+            slide_doms = [dom for i in range(total) for dom in results[i]]
+
             await browser.close()
 
         if fmt == "html":
@@ -159,31 +145,159 @@ async def export_deck(
         shutil.rmtree(tmpdir, ignore_errors=True)
 
 
+async def _export_slide(
+    page,
+    port: int,
+    i: int,
+    fmt: str,
+    output: Path,
+    step_by_step: bool,
+) -> list[dict]:
+    """Run slide *i* on *page* and capture it, returning its DOM frames."""
+    slide_doms: list[dict] = []
+    # The server pushes a capture event whenever the slide settles at a
+    # boundary (step, sleep, or its end); the client publishes it once
+    # fonts are loaded and the frame is painted. No fixed sleeps needed.
+    if step_by_step:
+        # Step-by-step: no auto_step (steps block), instant_sleep.
+        # We drive each step via keypress and capture between each.
+        url = f"http://127.0.0.1:{port}/?instant_sleep=1&capture=1&slide_delay=9999&_s={i}#slide-{i}"
+        await page.goto(url, wait_until="load")
+        await page.add_style_tag(content=DISABLE_ANIM_CSS)
+
+        step_idx = 0
+        while True:
+            boundary = await _wait_for_capture(page, step_idx)
+            await _capture(page, fmt, output, slide_doms, i, step_idx, boundary)
+            step_idx += 1
+            if boundary["final"]:
+                break
+            # Advance one step/sleep boundary by sending a keypress
+            await page.keyboard.press("ArrowRight")
+    else:
+        # Default: auto_step=0 + instant_sleep — everything runs
+        # instantly, capture final state.
+        url = f"http://127.0.0.1:{port}/?auto_step=0&instant_sleep=1&capture=1&slide_delay=9999&_s={i}#slide-{i}"
+        await page.goto(url, wait_until="load")
+        await page.add_style_tag(content=DISABLE_ANIM_CSS)
+        handle = await page.wait_for_function(
+            "() => window.__auditorium_capture && window.__auditorium_capture.final",
+            timeout=120000,
+        )
+        await handle.dispose()
+        await _capture(page, fmt, output, slide_doms, i, None, {"boundary": "initial", "duration": 0})
+    return slide_doms
+
+
+@dataclass
+class _CaptureSession(Session):
+    """A socketless session that snapshots its mirror at capture points.
+
+    Acks and sleeps are instant. In step-by-step mode every boundary is
+    recorded and then released at once, as if a key had been pressed.
+    """
+
+    frames: list[dict] = field(default_factory=list)
+
+    async def capture(self, final: bool = False) -> None:
+        if final or self.auto_step is None:
+            snapshot = self.snapshot()
+            if snapshot is None:
+                raise UnsupportedSelector("slide uses selectors the native engine cannot follow")
+            self.frames.append({
+                "html": snapshot["html"],
+                "classes": snapshot["classes"],
+                **self.boundary,
+            })
+        if not final and self.step_event is not None:
+            self.step_event.set()
+
+
+async def _export_native(
+    deck_path: Path,
+    output: Path,
+    resolution: str,
+    step_by_step: bool,
+) -> None:
+    """Export HTML by running every slide in-process, without a browser."""
+    from auditorium.cli import _load_deck
+    from auditorium.server import STATIC_DIR
+
+    deck = _load_deck(deck_path, {"broadcast": False})
+    width, height = _parse_resolution(resolution)
+    slide_doms: list[dict] = []
+
+    for i, slide in enumerate(deck.slides):
+        try:
+            slide_doms += await _capture_native(slide, step_by_step, deck.server_highlight)
+        except UnsupportedSelector as e:
+            console.print(
+                f"[red]Error:[/] slide {i + 1} ([bold]{slide.name}[/]): {e}. "
+                "Export it with [bold]--engine browser[/]."
+            )
+            raise typer.Exit(1)
+
+    _build_html(slide_doms, output, width, height, STATIC_DIR, scripts=True)
+    console.print(f"[green]✓[/] HTML saved to [bold]{output}[/]")
+
+
+async def _capture_native(slide, step_by_step: bool, highlight: bool = False) -> list[dict]:
+    """Run one slide on a fresh capture session and return its frames."""
+    from auditorium.slide import SlideContext
+
+    # Same knobs as the browser engine's capture URLs
+    session = _CaptureSession(
+        ws=None,
+        auto_step=None if step_by_step else 0,
+        instant_sleep=True,
+        highlight=highlight,
+    )
+    try:
+        await slide.func(SlideContext(session))
+        await session.flush()
+    except UnsupportedSelector:
+        raise
+    except Exception as e:
+        # Keep what the slide drew before failing, as a live client would
+        console.print(f"[yellow]⚠[/] slide [bold]{slide.name}[/] raised {e!r}")
+    await session.capture(final=True)
+    return session.frames
+
+
 def _build_html(
     slide_doms: list[dict],
     output: Path,
     width: int,
     height: int,
     static_dir: Path,
+    scripts: bool = False,
 ) -> None:
-    """Build a self-contained HTML file with all slides and a JS navigator."""
-    theme_css = (static_dir / "theme.css").read_text()
-    katex_css = _inline_katex_fonts(
-        (static_dir / "vendor" / "katex" / "katex.min.css").read_text(),
-        static_dir / "vendor" / "katex" / "fonts",
-    )
-    hljs_css = (static_dir / "vendor" / "hljs" / "styles" / "github.min.css").read_text()
-
-    # Inline Google Fonts as base64 data URLs
-    font_faces = ""
-    for font_file in sorted((static_dir / "fonts").glob("*.woff2")):
-        b64 = base64.b64encode(font_file.read_bytes()).decode()
-        name = font_file.stem.replace("-latin", "").replace("-", " ").title()
-        font_faces += (
-            f"@font-face {{ font-family: '{name}'; "
-            f"src: url(data:font/woff2;base64,{b64}) format('woff2'); "
-            f"font-weight: 300 700; font-display: block; }}\n"
-        )
+    """Build a self-contained HTML file with all slides and a JS navigator.
+
+    With *scripts*, KaTeX and highlight.js are inlined and run on load,
+    for frames whose math and code were never rendered by a browser.
+    """
+    features = used_features(slide_doms)
+    styles = stylesheet_bundle(static_dir, features)
+
+    render_js = ""
+    vendor = static_dir / "vendor"
+    if scripts and "math" in features:
+        for script in ("katex/katex.min.js", "katex/contrib/auto-render.min.js"):
+            render_js += f"<script>{(vendor / script).read_text()}</script>\n"
+        render_js += """<script>
+renderMathInElement(document.body, {
+    delimiters: [
+        { left: '$$', right: '$$', display: true },
+        { left: '$', right: '$', display: false },
+    ],
+    throwOnError: false,
+});
+</script>
+"""
+    if scripts and "code" in features and any(_UNHIGHLIGHTED.search(dom["html"]) for dom in slide_doms):
+        render_js += f"<script>{(vendor / 'hljs' / 'highlight.min.js').read_text()}</script>\n"
+        render_js += "<script>document.querySelectorAll('pre code:not([data-highlighted])').forEach(block => hljs.highlightElement(block));</script>\n"
 
     slides_html = ""
     slide_num = 0
@@ -208,10 +322,7 @@ def _build_html(
 <meta name="viewport" content="width=device-width, initial-scale=1.0">
 <title>Exported Presentation</title>
 <style>
-{font_faces}
-{theme_css}
-{katex_css}
-{hljs_css}
+{styles}
 .export-slide {{
     width: 100vw;
     height: 100vh;
@@ -232,7 +343,7 @@ body {{ margin: 0; background: #fff; overflow: hidden; }}
 <body>
 {slides_html}
 <div id="counter">1 / {len(slide_doms)}</div>
-<script>
+{render_js}<script>
 (function() {{
     const slides = document.querySelectorAll('.export-slide');
     const counter = document.getElementById('counter');
@@ -308,12 +419,7 @@ async def _build_pdf(
     """Build a vector PDF by rendering slides in a print-optimized page."""
     from playwright.async_api import async_playwright
 
-    theme_css = (static_dir / "theme.css").read_text()
-    katex_css = _inline_katex_fonts(
-        (static_dir / "vendor" / "katex" / "katex.min.css").read_text(),
-        static_dir / "vendor" / "katex" / "fonts",
-    )
-    hljs_css = (static_dir / "vendor" / "hljs" / "styles" / "github.min.css").read_text()
+    styles = stylesheet_bundle(static_dir, used_features(slide_doms))
 
     slides_html = ""
     for i, dom in enumerate(slide_doms):
@@ -332,7 +438,7 @@ async def _build_pdf(
     )
     print_html = (
         f'<!DOCTYPE html><html><head><meta charset="UTF-8">'
-        f"<style>{theme_css}\n{katex_css}\n{hljs_css}\n{no_anim}\nbody {{ margin: 0; }}</style>"
+        f"<style>{styles}\n{no_anim}\nbody {{ margin: 0; }}</style>"
         f"</head><body>{slides_html}</body></html>"
     )
 
@@ -354,30 +460,28 @@ async def _build_pdf(
         await browser.close()
 
 
-def _inline_katex_fonts(katex_css: str, font_dir: Path) -> str:
-    """Replace KaTeX font url() references with base64 data URIs."""
-    import re
-
-    def _replace(match: re.Match) -> str:
-        font_path = font_dir / match.group(1)
-        if font_path.exists():
-            b64 = base64.b64encode(font_path.read_bytes()).decode()
-            ext = font_path.suffix.lstrip(".")
-            mime = {"woff2": "font/woff2", "woff": "font/woff", "ttf": "font/ttf"}.get(ext, "font/woff2")
-            return f"url(data:{mime};base64,{b64})"
-        return match.group(0)
-
-    result = re.sub(r'url\(fonts/([^)]+)\)', _replace, katex_css)
-    # Remove remaining non-inlined font references (woff/ttf fallbacks we don't have)
-    result = re.sub(r',\s*url\(fonts/[^)]+\)\s*format\([^)]+\)', '', result)
-    result = re.sub(r'url\(fonts/[^)]+\)\s*format\([^)]+\)\s*,?', '', result)
-    return result
+async def _wait_for_capture(page, seen: int) -> dict:
+    """Wait for the client to publish a capture event after *seen* ones."""
+    handle = await page.wait_for_function(
+        "(seen) => (window.__auditorium_captures || 0) > seen && window.__auditorium_capture",
+        arg=seen,
+        timeout=120000,
+    )
+    boundary = await handle.json_value()
+    await handle.dispose()
+    return boundary
 
 
-async def _capture(page, fmt: str, output: Path, slide_doms: list[dict], slide_idx: int, step_idx: int | None) -> None:
+async def _capture(
+    page,
+    fmt: str,
+    output: Path,
+    slide_doms: list[dict],
+    slide_idx: int,
+    step_idx: int | None,
+    boundary: dict,
+) -> None:
     """Capture the current DOM state as PNG or DOM dict with boundary metadata."""
-    # Let the browser finish any remaining layout/paint work
-    await page.wait_for_timeout(100)
     if fmt == "png":
         suffix = f"-step{step_idx + 1:02d}" if step_idx is not None else ""
         await page.screenshot(path=str(output / f"slide-{slide_idx + 1:03d}{suffix}.png"))
@@ -385,15 +489,11 @@ async def _capture(page, fmt: str, output: Path, slide_doms: list[dict], slide_i
         dom = await page.evaluate(
             """() => {
             const root = document.getElementById('slide-root');
-            const boundary = window.__auditorium_last_boundary || {type: 'initial'};
-            return {
-                html: root.innerHTML,
-                classes: root.className,
-                boundary: boundary.type,
-                duration: boundary.duration || 0,
-            };
+            return {html: root.innerHTML, classes: root.className};
         }"""
         )
+        dom["boundary"] = boundary["boundary"]
+        dom["duration"] = boundary["duration"]
         slide_doms.append(dom)
 
 
@@ -22,20 +22,16 @@ class Region:
 
     async def __aenter__(self) -> Region:
         self._ctx._target_stack.append(self.id)
-        await self._ctx._session.send({
-            "type": "mutation",
+        await self._ctx._session.post_mutation({
             "action": "push_target",
             "selector": f"#{self.id}",
-            "id": str(uuid.uuid4()),
         })
         return self
 
     async def __aexit__(self, *exc) -> None:
         self._ctx._target_stack.pop()
-        await self._ctx._session.send({
-            "type": "mutation",
+        await self._ctx._session.post_mutation({
             "action": "pop_target",
-            "id": str(uuid.uuid4()),
         })
 
 
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import math
+from bisect import bisect_left
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    from auditorium.server import Session
+
+# Seconds; suits sub-millisecond local acks up to slow mobile links
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+# Seconds; slides include the time spent waiting on steps
+DURATION_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+class Counter:
+    """A monotonically increasing value."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str) -> None:
+        self.name = name
+        self.help = help
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def samples(self) -> list[tuple[str, dict[str, str], float]]:
+        return [(self.name, {}, self.value)]
+
+    def collect(self) -> float:
+        return self.value
+
+
+class Gauge:
+    """A value read from *fn* at collection time.
+
+    With *label*, *fn* returns a dict mapping label values to values; with
+    a tuple of labels, the dict is keyed by tuples of label values.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, fn: Callable, label: str | tuple[str, ...] | None = None) -> None:
+        self.name = name
+        self.help = help
+        self.fn = fn
+        self.label = label
+
+    def samples(self) -> list[tuple[str, dict[str, str], float]]:
+        if self.label is None:
+            return [(self.name, {}, float(self.fn()))]
+        if isinstance(self.label, str):
+            return [(self.name, {self.label: str(k)}, float(v)) for k, v in self.fn().items()]
+        return [
+            (self.name, {label: str(part) for label, part in zip(self.label, k)}, float(v))
+            for k, v in self.fn().items()
+        ]
+
+    def collect(self) -> float | dict:
+        return self.fn()
+
+
+class Histogram:
+    """Observations counted into cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: tuple[float, ...]) -> None:
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate the *q* quantile by interpolating within its bucket."""
+        if not self.count:
+            return math.nan
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+    def samples(self) -> list[tuple[str, dict[str, str], float]]:
+        out = []
+        cumulative = 0
+        for bound, n in zip((*self.buckets, math.inf), self.counts):
+            cumulative += n
+            le = "+Inf" if bound == math.inf else repr(bound)
+            out.append((f"{self.name}_bucket", {"le": le}, cumulative))
+        out.append((f"{self.name}_sum", {}, self.sum))
+        out.append((f"{self.name}_count", {}, self.count))
+        return out
+
+    def collect(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+class Registry:
+    """A set of metrics, rendered in the Prometheus text format."""
+
+    def __init__(self) -> None:
+        self.metrics: list[Counter | Gauge | Histogram] = []
+
+    def counter(self, name: str, help: str) -> Counter:
+        return self._add(Counter(name, help))
+
+    def gauge(self, name: str, help: str, fn: Callable, label: str | tuple[str, ...] | None = None) -> Gauge:
+        return self._add(Gauge(name, help, fn, label))
+
+    def histogram(self, name: str, help: str, buckets: tuple[float, ...]) -> Histogram:
+        return self._add(Histogram(name, help, buckets))
+
+    def _add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def collect(self) -> dict[str, float | dict]:
+        """Return a snapshot of every metric's current value."""
+        return {m.name: m.collect() for m in self.metrics}
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                if labels:
+                    rendered = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                    name = f"{name}{{{rendered}}}"
+                lines.append(f"{name} {_format(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class ServerMetrics(Registry):
+    """Everything the server records, for ``/metrics`` and the live view.
+
+    Metrics are only touched from the event loop, so they need no locks.
+    *sessions* returns the app's sessions by id when collecting.
+    """
+
+    def __init__(self, sessions: Callable[[], dict[str, Session]] = dict) -> None:
+        super().__init__()
+        self.mutations = self.counter(
+            "auditorium_mutations_total", "DOM mutations sent, counting each one in a batch")
+        self.bytes_sent = self.counter(
+            "auditorium_bytes_sent_total", "WebSocket payload bytes sent, followers included")
+        self.ack_latency = self.histogram(
+            "auditorium_ack_latency_seconds", "Time from sending a mutation to its ack", LATENCY_BUCKETS)
+        self.slide_duration = self.histogram(
+            "auditorium_slide_duration_seconds", "Time from starting a slide to its end, steps included",
+            DURATION_BUCKETS)
+        self.reloads = self.counter("auditorium_reloads_total", "Hot reloads applied")
+        self.reload_restarts = self.counter(
+            "auditorium_reload_restarts_total", "Sessions restarted by hot reloads")
+        self.gauge(
+            "auditorium_sessions", "Sessions, including disconnected ones awaiting resume",
+            lambda: len(sessions()))
+        self.gauge(
+            "auditorium_sessions_active", "Sessions with a connected client",
+            lambda: sum(s.ws is not None for s in sessions().values()))
+        self.gauge(
+            "auditorium_followers", "Broadcast followers",
+            lambda: sum(len(s.followers) for s in sessions().values()))
+        self.gauge(
+            "auditorium_pending_acks", "Mutations sent and not yet acknowledged",
+            lambda: sum(len(s.pending_acks) for s in sessions().values()))
+        self.gauge(
+            "auditorium_session_slide", "Current slide index of each session",
+            lambda: {sid: s.current_slide for sid, s in sessions().items()}, label="session")
+        self.gauge(
+            "auditorium_session_state", "Session state: 0 idle, 1 running, 2 waiting at a step",
+            lambda: {sid: session_state(s) for sid, s in sessions().items()}, label="session")
+        self.gauge(
+            "auditorium_result_cache", "ctx.cached counters and sizes, summed over stores",
+            result_cache_totals, label="stat")
+        self.gauge(
+            "auditorium_render_cache", "Markdown render, highlight and file cache counters and sizes",
+            render_cache_stats, label=("cache", "stat"))
+
+
+def result_cache_totals() -> dict[str, int]:
+    """Sum :func:`auditorium.cache.cache_info` over every store."""
+    from auditorium.cache import cache_info
+
+    totals: dict[str, int] = {}
+    for stats in cache_info().values():
+        for name, value in stats.items():
+            totals[name] = totals.get(name, 0) + value
+    return totals
+
+
+def render_cache_stats() -> dict[tuple[str, str], int]:
+    """Flatten :func:`auditorium.render.cache_info` by cache and stat."""
+    from auditorium.render import cache_info
+
+    return {
+        (cache, name): value
+        for cache, stats in cache_info().items()
+        for name, value in stats.items()
+        if value is not None
+    }
+
+
+def session_state(session: Session) -> int:
+    """0 when the slide is done, 1 while it runs, 2 while it waits for a step."""
+    if session.slide_task is None or session.slide_task.done():
+        return 0
+    return 2 if session.step_event is not None else 1
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(int(value)) if float(value).is_integer() else repr(float(value))
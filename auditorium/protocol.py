@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+try:
+    import msgpack
+except ImportError:  # optional: pip install auditorium[msgpack]
+    msgpack = None
+
+if TYPE_CHECKING:
+    from fastapi import WebSocket
+
+# Server-to-client encodings, most compact first. "json" sends messages
+# as dicts; "compact" sends them as opcode arrays in JSON text frames;
+# "msgpack" sends the same arrays in binary frames.
+CODECS: tuple[str, ...] = ("msgpack", "compact", "json") if msgpack else ("compact", "json")
+
+# Opcode of any message without its own, sent as the plain dict
+MESSAGE = 0
+BATCH = 8
+
+# Mutation action -> (opcode, fields in wire order). Trailing None fields
+# are dropped; the client's decoder is static/protocol.js.
+MUTATIONS: dict[str, tuple[int, tuple[str, ...]]] = {
+    "append": (1, ("html", "element_id", "target", "fragment", "ref")),
+    "remove": (2, ("selector",)),
+    "replace": (3, ("selector", "html", "fragment", "ref")),
+    "set_class": (4, ("selector", "cls")),
+    "remove_class": (5, ("selector", "cls")),
+    "push_target": (6, ("selector",)),
+    "pop_target": (7, ()),
+}
+_ACTIONS = {op: (action, fields) for action, (op, fields) in MUTATIONS.items()}
+
+# HTML at least this long is sent once per client and then by reference
+FRAGMENT_MIN_SIZE = 256
+# Most fragments a client may ask the server to track
+FRAGMENT_CAPACITY_LIMIT = 4096
+
+
+def negotiate(offered: list[str] | None) -> str:
+    """Pick the first codec the client offers that the server supports."""
+    for codec in offered or ():
+        if codec in CODECS:
+            return codec
+    return "json"
+
+
+def encode(message: dict, codec: str) -> str | bytes:
+    """Encode a message for a client using *codec*."""
+    if codec == "json":
+        return json.dumps(message)
+    packed = pack(message)
+    if codec == "msgpack":
+        return msgpack.packb(packed)
+    return json.dumps(packed, separators=(",", ":"))
+
+
+def decode(data: str | bytes) -> dict:
+    """Decode a frame in any codec back into a message dict."""
+    if isinstance(data, bytes):
+        return unpack(msgpack.unpackb(data))
+    message = json.loads(data)
+    return unpack(message) if isinstance(message, list) else message
+
+
+async def send(ws: WebSocket, payload: str | bytes) -> None:
+    """Send an encoded message as a text or binary frame."""
+    if isinstance(payload, bytes):
+        await ws.send_bytes(payload)
+    else:
+        await ws.send_text(payload)
+
+
+def pack(message: dict) -> list:
+    """Turn a message into its compact array form.
+
+    Mutations become ``[opcode, id, *fields]`` and batches
+    ``[BATCH, id, [[opcode, *fields], ...]]``; anything else is
+    ``[MESSAGE, message]``.
+    """
+    kind = message.get("type")
+    if kind == "mutation" and message.get("action") in MUTATIONS:
+        return _pack_mutation(message, with_id=True)
+    if kind == "batch":
+        return [BATCH, message.get("id"), [_pack_mutation(m, with_id=False) for m in message["mutations"]]]
+    return [MESSAGE, message]
+
+
+def unpack(packed: list) -> dict:
+    """Inverse of :func:`pack`."""
+    op = packed[0]
+    if op == MESSAGE:
+        return packed[1]
+    if op == BATCH:
+        return {"type": "batch", "id": packed[1], "mutations": [_unpack_mutation(m, with_id=False) for m in packed[2]]}
+    return _unpack_mutation(packed, with_id=True)
+
+
+class Fragments:
+    """The HTML fragments one client holds, by content hash.
+
+    The client keeps the last *capacity* fragments it was sent, evicting
+    the least recently used (``static/protocol.js``). This replays the
+    same stores and lookups in the same order, so it always knows which
+    fragments the client can resolve.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = max(0, min(capacity, FRAGMENT_CAPACITY_LIMIT))
+        self.held: OrderedDict[str, None] = OrderedDict()
+
+    def compact(self, message: dict) -> dict:
+        """Return *message* with repeated fragments replaced by references.
+
+        A fragment the client lacks goes out in full, tagged ``fragment``
+        for the client to keep; one it holds goes out as ``ref`` without
+        its HTML. *message* itself is left untouched.
+        """
+        kind = message.get("type")
+        if kind == "mutation":
+            return self._compact(message)
+        if kind == "batch":
+            mutations = [self._compact(m) for m in message["mutations"]]
+            if any(new is not old for new, old in zip(mutations, message["mutations"])):
+                return {**message, "mutations": mutations}
+        return message
+
+    def _compact(self, mutation: dict) -> dict:
+        html = mutation.get("html")
+        if not self.capacity or html is None or len(html) < FRAGMENT_MIN_SIZE:
+            return mutation
+        key = hashlib.blake2b(html.encode(), digest_size=8).hexdigest()
+        if key in self.held:
+            self.held.move_to_end(key)
+            compacted = {name: value for name, value in mutation.items() if name != "html"}
+            compacted["ref"] = key
+            return compacted
+        self.held[key] = None
+        if len(self.held) > self.capacity:
+            self.held.popitem(last=False)
+        return {**mutation, "fragment": key}
+
+
+def _pack_mutation(mutation: dict, with_id: bool) -> list:
+    if mutation.get("action") not in MUTATIONS:
+        return [MESSAGE, mutation]
+    op, fields = MUTATIONS[mutation["action"]]
+    values = [mutation.get(name) for name in fields]
+    while values and values[-1] is None:
+        values.pop()
+    return [op, mutation.get("id"), *values] if with_id else [op, *values]
+
+
+def _unpack_mutation(packed: list, with_id: bool) -> dict:
+    if packed[0] == MESSAGE:
+        return packed[1]
+    action, fields = _ACTIONS[packed[0]]
+    values = packed[2:] if with_id else packed[1:]
+    mutation = {"type": "mutation", "action": action, **dict(zip(fields, values))}
+    if with_id:
+        mutation["id"] = packed[1]
+    return mutation
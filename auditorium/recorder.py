@@ -9,6 +9,7 @@ import typer
 import uvicorn
 
 from auditorium.console import console
+from auditorium.protocol import decode
 
 
 async def record(
@@ -19,8 +20,25 @@ async def record(
     slide_delay: float,
     live: bool,
     port: int,
+    virtual: bool = False,
+    fps: int = 30,
+    jobs: int = 1,
 ) -> None:
-    """Record a presentation to video."""
+    """Record a presentation to video.
+
+    By default the browser is filmed in real time, so ``auto_step`` and
+    ``slide_delay`` are actually waited out. With *virtual*, slides run
+    with instant steps and sleeps; each settled state is screenshotted
+    once and held for its authored duration when ffmpeg encodes the
+    video at *fps*. Recording then takes as long as rendering the
+    states, not as long as the talk. CSS animations are not captured.
+    Virtual recordings render slides on *jobs* pages at once and encode
+    as many segments in parallel, joined without re-encoding.
+    """
+    if virtual and shutil.which("ffmpeg") is None:
+        console.print("[red]Error:[/] Virtual-time recording requires [bold]ffmpeg[/] on PATH.")
+        raise typer.Exit(1)
+
     try:
         from playwright.async_api import async_playwright
     except ImportError:
@@ -34,7 +52,8 @@ async def record(
     from auditorium.cli import _load_deck
     from auditorium.server import create_app
 
-    deck = _load_deck(deck_path)
+    # Every capture page drives its own slides
+    deck = _load_deck(deck_path, {"broadcast": False})
     app = create_app(deck)
 
     config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
@@ -45,11 +64,40 @@ async def record(
         await asyncio.sleep(0.05)
 
     width, height = _parse_resolution(resolution)
+    total = len(deck.slides)
     tmpdir = tempfile.mkdtemp(prefix="auditorium-record-")
 
     try:
         async with async_playwright() as p:
             browser = await p.chromium.launch(headless=not live)
+
+            if virtual:
+                jobs = max(1, min(jobs, total))
+                pages = []
+                for _ in range(jobs):
+                    context = await browser.new_context(viewport={"width": width, "height": height})
+                    pages.append(await context.new_page())
+
+                results: dict[int, list[tuple[Path, float]]] = {}
+                indices = iter(range(total))
+                with _progress() as progress:
+                    task = progress.add_task("Rendering", total=total)
+
+                    async def worker(page) -> None:
+                        # Each page has its own session; slides are independent
+                        for i in indices:
+                            results[i] = await _record_slide(page, port, i, Path(tmpdir), auto_step, slide_delay)
+                            progress.update(task, advance=1)
+
+                    await asyncio.gather(*(worker(page) for page in pages))
+                await browser.close()
+
+                states = [state for i in range(total) for state in results[i]]
+                with console.status("Encoding video..."):
+                    await _encode_segments(_quantize(states, fps), output, fps, Path(tmpdir), jobs)
+                console.print(f"[green]✓[/] Video saved to [bold]{output}[/]")
+                return
+
             context = await browser.new_context(
                 viewport={"width": width, "height": height},
                 record_video_dir=tmpdir,
@@ -59,41 +107,28 @@ async def record(
             url = f"http://127.0.0.1:{port}/"
             if not live:
                 url += f"?auto_step={auto_step}&slide_delay={slide_delay}"
-            await page.goto(url)
 
             if live:
+                await page.goto(url)
                 console.print("Recording [bold]live[/]. Navigate with keypresses. Close the browser to stop.")
                 await page.wait_for_event("close", timeout=0)
             else:
-                from rich.progress import Progress, BarColumn, TextColumn, TimeElapsedColumn, TimeRemainingColumn
-
-                total = len(deck.slides)
-                with Progress(
-                    TextColumn("[bold]{task.description}"),
-                    BarColumn(),
-                    TextColumn("{task.completed}/{task.total} slides"),
-                    TimeElapsedColumn(),
-                    TimeRemainingColumn(),
-                    console=console,
-                ) as progress:
+                with _progress() as progress:
                     task = progress.add_task("Recording", total=total)
-                    last_slide = -1
-                    while True:
-                        finished = await page.evaluate(
-                            "() => window.__auditorium_finished === true"
-                        )
-                        if finished:
-                            progress.update(task, completed=total)
-                            break
-                        current = await page.evaluate(
-                            "() => { const el = document.getElementById('slide-indicator'); "
-                            "if (!el) return 0; const m = el.textContent.match(/(\\d+)/); "
-                            "return m ? parseInt(m[1]) : 0; }"
-                        )
-                        if current > last_slide:
-                            progress.update(task, completed=current)
-                            last_slide = current
-                        await asyncio.sleep(0.3)
+                    finished = asyncio.Event()
+
+                    def on_frame(payload) -> None:
+                        # Progress comes from the server's own messages, no polling
+                        msg = decode(payload)
+                        if msg.get("type") == "slide":
+                            progress.update(task, completed=msg["index"])
+                        elif msg.get("type") == "finished":
+                            finished.set()
+
+                    page.on("websocket", lambda ws: ws.on("framereceived", on_frame))
+                    await page.goto(url)
+                    await finished.wait()
+                    progress.update(task, completed=total)
 
             await context.close()
             await browser.close()
@@ -112,6 +147,157 @@ async def record(
         shutil.rmtree(tmpdir, ignore_errors=True)
 
 
+def _progress():
+    from rich.progress import Progress, BarColumn, TextColumn, TimeElapsedColumn, TimeRemainingColumn
+
+    return Progress(
+        TextColumn("[bold]{task.description}"),
+        BarColumn(),
+        TextColumn("{task.completed}/{task.total} slides"),
+        TimeElapsedColumn(),
+        TimeRemainingColumn(),
+        console=console,
+    )
+
+
+async def _record_slide(
+    page,
+    port: int,
+    i: int,
+    frames_dir: Path,
+    auto_step: float,
+    slide_delay: float,
+) -> list[tuple[Path, float]]:
+    """Screenshot every settled state of slide *i* with how long it is shown.
+
+    Runs the slide like a step-by-step export: steps and sleeps block
+    until a keypress, and each capture event says which boundary led to
+    the state. A state is held until the next boundary would fire in a
+    real-time recording (``auto_step`` for steps, the authored duration
+    for sleeps), and the final state for ``slide_delay``.
+    """
+    from auditorium.exporter import DISABLE_ANIM_CSS, _wait_for_capture
+
+    url = f"http://127.0.0.1:{port}/?instant_sleep=1&capture=1&_s={i}#slide-{i}"
+    await page.goto(url, wait_until="load")
+    await page.add_style_tag(content=DISABLE_ANIM_CSS)
+
+    shots: list[Path] = []
+    holds: list[float] = []
+    seen = 0
+    while True:
+        boundary = await _wait_for_capture(page, seen)
+        seen += 1
+        if shots:
+            holds.append(auto_step if boundary["boundary"] == "step" else boundary["duration"])
+        shot = frames_dir / f"slide-{i + 1:04d}-{seen:03d}.png"
+        await page.screenshot(path=str(shot))
+        shots.append(shot)
+        if boundary["final"]:
+            break
+        await page.keyboard.press("ArrowRight")
+    holds.append(slide_delay)
+    return [(shot, hold) for shot, hold in zip(shots, holds) if hold > 0]
+
+
+# Encoder settings by output container; others use ffmpeg's defaults
+_CODECS = {
+    ".webm": ["-c:v", "libvpx-vp9", "-b:v", "0", "-crf", "32", "-deadline", "realtime", "-cpu-used", "8"],
+    ".mp4": ["-c:v", "libx264", "-preset", "veryfast", "-crf", "23", "-movflags", "+faststart"],
+}
+
+
+def _quantize(states: list[tuple[Path, float]], fps: int) -> list[tuple[Path, int]]:
+    """Turn hold times into frame counts on the whole recording's timeline.
+
+    Rounding cumulative times (not each hold) keeps the total exact, and
+    makes every state boundary land on the same frame however the video
+    is later split into segments.
+    """
+    frames: list[tuple[Path, int]] = []
+    elapsed = 0.0
+    start = 0
+    for shot, hold in states:
+        elapsed += hold
+        end = round(elapsed * fps)
+        if end > start:
+            frames.append((shot, end - start))
+        start = max(start, end)
+    return frames
+
+
+async def _encode_segments(
+    frames: list[tuple[Path, int]],
+    output: Path,
+    fps: int,
+    workdir: Path,
+    jobs: int,
+) -> None:
+    """Encode *frames* as up to *jobs* segments in parallel, then join them.
+
+    Segments share codec settings and are cut on frame boundaries of the
+    quantized timeline, so the concat demuxer can join them with
+    ``-c copy`` into the same video a single encode would produce.
+    """
+    if not frames:
+        console.print("[red]Error:[/] nothing to encode: every state has a zero duration.")
+        raise typer.Exit(1)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    jobs = max(1, min(jobs, len(frames)))
+    if jobs == 1:
+        await _encode(frames, output, fps, workdir / "frames.ffconcat")
+        return
+
+    # Split into runs of roughly equal length (in frames, not states)
+    total = sum(count for _, count in frames)
+    chunks: list[list[tuple[Path, int]]] = [[] for _ in range(jobs)]
+    elapsed = 0
+    for frame in frames:
+        chunks[min(jobs - 1, elapsed * jobs // total)].append(frame)
+        elapsed += frame[1]
+    segments = []
+    for k, chunk in enumerate(c for c in chunks if c):
+        segments.append((workdir / f"segment-{k:03d}{output.suffix}", chunk))
+
+    await asyncio.gather(*(
+        _encode(chunk, segment, fps, workdir / f"segment-{k:03d}.ffconcat")
+        for k, (segment, chunk) in enumerate(segments)
+    ))
+    playlist = workdir / "segments.ffconcat"
+    playlist.write_text(
+        "ffconcat version 1.0\n" + "".join(f"file '{segment.as_posix()}'\n" for segment, _ in segments)
+    )
+    await _ffmpeg("-f", "concat", "-safe", "0", "-i", str(playlist), "-c", "copy", str(output))
+
+
+async def _encode(frames: list[tuple[Path, int]], output: Path, fps: int, playlist: Path) -> None:
+    """Encode still frames, each shown for a number of frames, into a video."""
+    # concat demuxer: the last file is listed twice so its duration applies
+    lines = ["ffconcat version 1.0"]
+    for shot, count in frames:
+        lines += [f"file '{shot.as_posix()}'", f"duration {count / fps:.9f}"]
+    lines.append(f"file '{frames[-1][0].as_posix()}'")
+    playlist.write_text("\n".join(lines) + "\n")
+
+    await _ffmpeg(
+        "-f", "concat", "-safe", "0", "-i", str(playlist),
+        "-vf", f"fps={fps},format=yuv420p",
+        *_CODECS.get(output.suffix.lower(), []),
+        str(output),
+    )
+
+
+async def _ffmpeg(*args: str) -> None:
+    proc = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-y", "-loglevel", "error", *args,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    _, stderr = await proc.communicate()
+    if proc.returncode != 0:
+        console.print(f"[red]Error:[/] ffmpeg failed:\n{stderr.decode(errors='replace')}")
+        raise typer.Exit(1)
+
+
 def _parse_resolution(resolution: str) -> tuple[int, int]:
     """Parse '1920x1080' into (1920, 1080)."""
     parts = resolution.lower().split("x")
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import hashlib
+import sys
+import types
+from pathlib import Path
+from typing import Callable
+
+# Constants hashed by value; anything else is compared by type only
+_PLAIN = (str, bytes, int, float, complex, bool, type(None))
+
+
+def is_local(filename: str | None, root: Path) -> bool:
+    """Whether *filename* belongs to the deck under *root* (not an installed package)."""
+    if not filename:
+        return False
+    path = Path(filename).resolve()
+    return path.is_relative_to(root) and "site-packages" not in path.parts
+
+
+def local_modules(names, root: Path) -> set[str]:
+    """Return the modules among *names* whose source lives under *root*."""
+    return {
+        name for name in names
+        if name in sys.modules and is_local(getattr(sys.modules[name], "__file__", None), root)
+    }
+
+
+def fingerprint(func: Callable) -> str:
+    """Hash a slide function and the deck-local code it depends on.
+
+    Covers the function's bytecode, constants and nested functions, its
+    defaults and closure, and every global it references: deck-local
+    functions and classes are hashed recursively (also behind decorators
+    that set ``__wrapped__``), deck-local modules by
+    source file, plain constants by value. Line numbers are left out, so
+    editing one slide doesn't change the fingerprints of those below it.
+    """
+    root = Path(func.__code__.co_filename).resolve().parent
+    h = hashlib.sha256()
+    _hash_function(h, func, root, set())
+    return h.hexdigest()[:16]
+
+
+def _hash_function(h, func: types.FunctionType, root: Path, seen: set[int]) -> None:
+    if id(func) in seen:
+        return
+    seen.add(id(func))
+    code = func.__code__
+    _hash_code(h, code)
+    _hash_value(h, func.__defaults__, root, seen)
+    _hash_value(h, func.__kwdefaults__, root, seen)
+    for cell in func.__closure__ or ():
+        try:
+            _hash_value(h, cell.cell_contents, root, seen)
+        except ValueError:  # empty cell
+            h.update(b"<empty>")
+    for name in sorted(_global_names(code)):
+        if name in func.__globals__:
+            h.update(name.encode())
+            _hash_value(h, func.__globals__[name], root, seen)
+
+
+def _hash_code(h, code: types.CodeType) -> None:
+    h.update(code.co_code)
+    h.update(repr(code.co_names).encode())
+    h.update(repr(code.co_varnames).encode())
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _hash_code(h, const)
+        else:
+            h.update(repr(const).encode())
+
+
+def _global_names(code: types.CodeType) -> set[str]:
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _global_names(const)
+    return names
+
+
+def _hash_value(h, value, root: Path, seen: set[int]) -> None:
+    if isinstance(value, _PLAIN):
+        h.update(repr(value).encode())
+    elif isinstance(value, (tuple, list)):
+        h.update(type(value).__name__.encode())
+        for item in value:
+            _hash_value(h, item, root, seen)
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            h.update(repr(key).encode())
+            _hash_value(h, item, root, seen)
+    elif isinstance(value, types.FunctionType) and is_local(value.__code__.co_filename, root):
+        _hash_function(h, value, root, seen)
+    elif isinstance(value, types.FunctionType) and hasattr(value, "__wrapped__"):
+        # A decorator defined elsewhere (e.g. @cached): hash what it wraps
+        h.update(f"{value.__module__}.{value.__code__.co_qualname}".encode())
+        _hash_value(h, value.__wrapped__, root, seen)
+    elif isinstance(value, types.ModuleType) and is_local(getattr(value, "__file__", None), root):
+        h.update(hashlib.sha256(Path(value.__file__).read_bytes()).digest())
+    elif isinstance(value, type) and is_local(_class_file(value), root):
+        if id(value) in seen:
+            return
+        seen.add(id(value))
+        h.update(value.__qualname__.encode())
+        for name, attr in sorted(vars(value).items()):
+            if isinstance(attr, (types.FunctionType, *_PLAIN)):
+                h.update(name.encode())
+                _hash_value(h, attr, root, seen)
+    elif isinstance(value, (types.FunctionType, types.ModuleType, type)):
+        h.update(f"{getattr(value, '__module__', '')}.{getattr(value, '__qualname__', value.__name__)}".encode())
+    else:
+        h.update(type(value).__qualname__.encode())
+
+
+def _class_file(cls: type) -> str | None:
+    """Source file of a class, also for classes in the (unregistered) deck module."""
+    module = sys.modules.get(cls.__module__)
+    if getattr(module, "__file__", None):
+        return module.__file__
+    for attr in vars(cls).values():
+        if isinstance(attr, types.FunctionType):
+            return attr.__code__.co_filename
+    return None
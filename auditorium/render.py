@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import functools
+import html
+import re
+import textwrap
+from collections import OrderedDict
+from pathlib import Path
+
+import markdown
+from markdown.extensions import Extension
+from markdown.extensions.fenced_code import FencedBlockPreprocessor
+from markdown.preprocessors import Preprocessor
+
+try:
+    import pygments
+    from pygments.formatters import HtmlFormatter
+    from pygments.lexers import get_lexer_by_name
+    from pygments.util import ClassNotFound
+except ImportError:  # optional: pip install auditorium[highlight]
+    pygments = None
+
+# Extensions used for slide content and presenter notes
+MARKDOWN_EXTENSIONS: tuple[str, ...] = ("fenced_code", "tables")
+
+# Max distinct (text, extensions) pairs kept in the process-wide render cache
+RENDER_CACHE_SIZE = 1024
+# Max distinct (language, source) code blocks kept highlighted
+HIGHLIGHT_CACHE_SIZE = 512
+# Max markdown files kept read, least recently used evicted first
+FILE_CACHE_SIZE = 256
+
+_file_cache: OrderedDict[Path, tuple[int, str]] = OrderedDict()
+_file_stats = {"hits": 0, "misses": 0}
+
+
+_TOKEN_SPAN = re.compile(r'<span class="([\w-]+)">([^<]*)</span>')
+
+
+@functools.cache
+def _formatter() -> HtmlFormatter:
+    return HtmlFormatter(nowrap=True)
+
+
+@functools.lru_cache(maxsize=HIGHLIGHT_CACHE_SIZE)
+def highlight_code(language: str, source: str) -> str | None:
+    """Highlight a code block with Pygments, memoized by language and source.
+
+    Returns a ``<pre><code>`` block marked as already highlighted, with
+    Pygments token classes styled by ``static/highlight.css``, or None
+    when Pygments is not installed or doesn't know *language*.
+    """
+    if pygments is None:
+        return None
+    try:
+        lexer = get_lexer_by_name(language)
+    except ClassNotFound:
+        return None
+    formatter = _formatter()
+    code = pygments.highlight(source, lexer, formatter)
+    # Tokens the style leaves plain (names, punctuation) and whitespace don't need a span
+    code = _TOKEN_SPAN.sub(
+        lambda m: m.group(0) if m.group(1) != "w" and m.group(1) in formatter.class2style else m.group(2), code,
+    )
+    return (
+        f'<pre><code class="language-{html.escape(language)} hljs aud-hl" data-highlighted="yes">'
+        f'{code}</code></pre>'
+    )
+
+
+class _HighlightPreprocessor(Preprocessor):
+    """Swap fenced blocks with a language for their highlighted HTML.
+
+    Runs before ``fenced_code``, which still handles blocks without a
+    language (or one Pygments doesn't know) for the client to highlight.
+    """
+
+    def run(self, lines: list[str]) -> list[str]:
+        def replace(match: re.Match) -> str:
+            language = match.group("lang")
+            if not language and match.group("attrs"):
+                classes = re.findall(r"\.([\w#.+-]+)", match.group("attrs"))
+                language = classes[0] if classes else None
+            block = highlight_code(language, match.group("code")) if language else None
+            if block is None:
+                return match.group(0)
+            return f"\n\n{self.md.htmlStash.store(block)}\n\n"
+
+        text = FencedBlockPreprocessor.FENCED_BLOCK_RE.sub(replace, "\n".join(lines))
+        return text.split("\n")
+
+
+class _HighlightExtension(Extension):
+    def extendMarkdown(self, md: markdown.Markdown) -> None:
+        # fenced_code_block is registered at 25
+        md.preprocessors.register(_HighlightPreprocessor(md), "auditorium_highlight", 26)
+
+
+@functools.cache
+def _markdown(extensions: tuple[str, ...], highlight: bool = False) -> markdown.Markdown:
+    """Return the shared Markdown instance for an extension set."""
+    return markdown.Markdown(extensions=[*extensions, *([_HighlightExtension()] if highlight else [])])
+
+
+@functools.lru_cache(maxsize=RENDER_CACHE_SIZE)
+def _render(text: str, extensions: tuple[str, ...], highlight: bool = False) -> str:
+    md = _markdown(extensions, highlight)
+    try:
+        return md.convert(text)
+    finally:
+        md.reset()
+
+
+def render_markdown(text: str, extensions: tuple[str, ...] = MARKDOWN_EXTENSIONS, highlight: bool = False) -> str:
+    """Dedent and render markdown to HTML, memoized across all sessions.
+
+    With *highlight*, fenced code blocks with a language are highlighted
+    here (see :func:`highlight_code`) instead of by the client.
+    """
+    return _render(textwrap.dedent(text).strip(), tuple(extensions), highlight)
+
+
+def read_markdown_file(path: str | Path) -> str:
+    """Read a markdown file, reusing the cached text until its mtime changes."""
+    path = Path(path).resolve()
+    mtime = path.stat().st_mtime_ns
+    cached = _file_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        _file_stats["hits"] += 1
+        _file_cache.move_to_end(path)
+        return cached[1]
+    _file_stats["misses"] += 1
+    text = path.read_text()
+    _file_cache[path] = (mtime, text)
+    _file_cache.move_to_end(path)
+    if len(_file_cache) > FILE_CACHE_SIZE:
+        _file_cache.popitem(last=False)
+    return text
+
+
+def cache_info() -> dict[str, dict[str, int]]:
+    """Return hit/miss counters for the render, highlight and file caches."""
+    return {
+        **{
+            name: {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize}
+            for name, info in (("render", _render.cache_info()), ("highlight", highlight_code.cache_info()))
+        },
+        "files": {
+            **_file_stats,
+            "size": len(_file_cache),
+            "maxsize": FILE_CACHE_SIZE,
+        },
+    }
+
+
+def clear_cache() -> None:
+    """Drop all cached renders and file contents and reset the counters."""
+    _render.cache_clear()
+    highlight_code.cache_clear()
+    _file_cache.clear()
+    _file_stats.update(hits=0, misses=0)
@@ -2,140 +2,770 @@ from __future__ import annotations
 
 import asyncio
 import json
+import re
+import time
 import uuid
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Callable
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-from fastapi.responses import HTMLResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse, Response
+
+from auditorium.assets import IMMUTABLE, Asset, StaticAssets
+from auditorium.bus import Bus
+from auditorium.cache import ResultCache, cache_for
+from auditorium.compute import ComputePool
+from auditorium.dom import SlideDom, UnsupportedSelector
+from auditorium.metrics import ServerMetrics
+from auditorium.protocol import Fragments, encode, negotiate, send
+from auditorium.trace import Tracer
 
 if TYPE_CHECKING:
     from auditorium.deck import Deck
+    from auditorium.slide import SlideContext
 
 STATIC_DIR = Path(__file__).parent / "static"
 
+# Seconds a disconnected session keeps running, waiting for its client to resume it
+RESUME_GRACE = 30.0
+# Mirrored mutations kept as a plain log before being compacted into the DOM
+MIRROR_LOG_LIMIT = 256
+# Queued frames after which a slow broadcast follower is resynced from the mirror
+FOLLOWER_QUEUE_LIMIT = 512
+# Session key of the shared session that runs slides in broadcast mode
+STAGE_ID = "stage"
+# Messages only leading (presenter) followers receive
+PRESENTER_ONLY = frozenset({"notes", "next_preview"})
+# Message types describing the current slide, replayed to late joiners
+SLIDE_INFO = ("slide", "notes", "next_preview")
+# Worker that runs the broadcast stage when serving with several workers
+PRIMARY_WORKER = 0
+# Session ids of multi-worker servers name their worker: w<n>.<uuid>
+_WORKER_PREFIX = re.compile(r"w(\d+)\.")
+
+
+class Follower:
+    """A socket receiving a copy of a session's message stream.
+
+    Frames are queued and written by a background task, so a slow follower
+    never delays the session or other followers; its acks are ignored.
+    One that falls too far behind is resynced from the session's mirror.
+    """
+
+    def __init__(self, ws: WebSocket, session: Session, lead: bool = False, codec: str = "json") -> None:
+        self.ws = ws
+        self.session = session
+        self.lead = lead
+        self.codec = codec
+        self.queue: asyncio.Queue[str | bytes] = asyncio.Queue()
+        self.task = asyncio.create_task(self._pump())
+
+    def push(self, message: dict, encoded: dict[str, str | bytes]) -> None:
+        """Queue *message*, reusing its encoding in *encoded* (by codec) if any."""
+        if not self.lead and message.get("type") in PRESENTER_ONLY:
+            return
+        if self.queue.qsize() >= FOLLOWER_QUEUE_LIMIT:
+            # The message is already in the mirror, so a resync covers it
+            self.push_state()
+            return
+        payload = encoded.get(self.codec)
+        if payload is None:
+            payload = encoded[self.codec] = encode(message, self.codec)
+        self.queue.put_nowait(payload)
+
+    def push_state(self) -> None:
+        """Replace anything queued with the session's current state."""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        for message in self.session.state_messages(presenter=self.lead) or []:
+            self.queue.put_nowait(encode(message, self.codec))
+
+    async def _pump(self) -> None:
+        while True:
+            payload = await self.queue.get()
+            try:
+                await send(self.ws, payload)
+            except Exception:
+                return
+            self.session.metrics.bytes_sent.inc(len(payload))
+
+    def close(self) -> None:
+        self.task.cancel()
+
+
+class BusFollower:
+    """Publishes the stage's stream to the other workers' replicas."""
+
+    lead = True
+
+    def __init__(self, bus: Bus) -> None:
+        self.bus = bus
+
+    def push(self, message: dict, encoded: dict[str, str | bytes]) -> None:
+        payload = encoded.get("json")
+        if payload is None:
+            payload = encoded["json"] = encode(message, "json")
+        self.bus.publish("stage", payload.encode())
+
+    def push_state(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class RelaySocket:
+    """A client connected to another worker, reached through the bus.
+
+    Stands in for the WebSocket on the worker owning the session: frames
+    it sends go back to the client's worker, which feeds it the client's
+    messages until the client disconnects.
+    """
+
+    def __init__(self, bus: Bus, relay: str) -> None:
+        self.bus = bus
+        self.channel = f"relay:{relay}"
+        self.inbox: asyncio.Queue[str | None] = asyncio.Queue()
+
+    async def receive_text(self) -> str:
+        data = await self.inbox.get()
+        if data is None:
+            raise WebSocketDisconnect()
+        return data
+
+    async def send_text(self, text: str) -> None:
+        self.bus.publish(self.channel, text.encode())
+
+    async def send_bytes(self, data: bytes) -> None:
+        self.bus.publish(self.channel, data, binary=True)
+
 
 @dataclass
 class Session:
-    """Per-client session holding independent slide state."""
+    """Per-client session holding independent slide state.
+
+    The session mirrors every DOM mutation it sends, so a client whose
+    socket drops can reconnect and get the current state in one frame
+    while the slide keeps running (``ws`` is None in between).
+    """
 
-    ws: WebSocket
+    ws: WebSocket | None
     slide_task: asyncio.Task | None = None
     current_slide: int = 0
     step_event: asyncio.Event | None = None
     numeric_buffer: str = ""
-    pending_acks: dict[str, asyncio.Event] = field(default_factory=dict)
+    pending_acks: dict[int, asyncio.Event] = field(default_factory=dict)
+    ack_sent: dict[int, float] = field(default_factory=dict)
+    # Id of the last message sent for acking; short ints, increasing per session
+    message_id: int = 0
+    codec: str = "json"
+    # The fragment cache of the client on ``ws``, if it keeps one
+    fragments: Fragments | None = None
     auto_step: float | None = None
     slide_delay: float = 3.0
     instant_sleep: bool = False
+    batch_mutations: bool = False
+    highlight: bool = False
+    batch: list[dict] = field(default_factory=list)
+    ack_window: int = 1
+    mirror: SlideDom = field(default_factory=SlideDom)
+    mirror_log: list[dict] = field(default_factory=list)
+    mirror_ok: bool = True
+    expiry: asyncio.TimerHandle | None = None
+    slide_info: dict[str, dict] = field(default_factory=dict)
+    followers: set[Follower] = field(default_factory=set)
+    capture_boundaries: bool = False
+    boundary: dict = field(default_factory=lambda: {"boundary": "initial", "duration": 0})
+    captures: int = 0
+    fingerprint: str = ""
+    files_read: set[Path] = field(default_factory=set)
+    metrics: ServerMetrics = field(default_factory=ServerMetrics)
+    tracer: Tracer | None = None
+    compute: ComputePool | None = None
+    cache: ResultCache | None = None
+    # Steps the current slide has reached, and a hook called while it waits at one
+    steps: int = 0
+    at_step: Callable[[], None] | None = None
+    speculation: SpeculativeSession | None = None
 
     async def send(self, message: dict) -> None:
-        """Send a JSON message to this session's client."""
+        """Send a message to this session's client and followers.
+
+        Mutations are recorded in the mirror even while disconnected.
+        The message is encoded once per codec however many followers
+        there are. Fragments the client already holds are sent to it by
+        reference; followers always get the full message.
+        """
+        self._record(message)
+        kind = message.get("type")
+        if kind == "mutation":
+            self.metrics.mutations.inc()
+        elif kind == "batch":
+            self.metrics.mutations.inc(len(message["mutations"]))
+        if self.ws is None and not self.followers:
+            return
+        tracer = self.tracer
+        start = tracer.now() if tracer else 0.0
+        outgoing = message
+        if self.ws is not None and self.fragments is not None:
+            outgoing = self.fragments.compact(message)
+        payload = encode(outgoing, self.codec)
+        if tracer:
+            tracer.span("encode", start, type=kind, bytes=len(payload))
+        encoded = {self.codec: payload} if outgoing is message else {}
+        for follower in self.followers:
+            follower.push(message, encoded)
+        if self.ws is None:
+            return
+        start = tracer.now() if tracer else 0.0
         try:
-            await self.ws.send_text(json.dumps(message))
+            await send(self.ws, payload)
         except Exception:
-            pass
+            return
+        if tracer:
+            tracer.span("send", start, type=kind)
+        self.metrics.bytes_sent.inc(len(payload))
 
     async def send_mutation(self, mutation: dict) -> None:
-        """Send a mutation and wait for acknowledgment."""
-        mutation_id = str(uuid.uuid4())
-        mutation["id"] = mutation_id
+        """Send a mutation, waiting for acks only when the window is full.
+
+        With the default ``ack_window`` of 1 this waits for the mutation's
+        own ack. In batching mode the mutation is queued instead, and goes out with
+        the rest of the batch on the next :meth:`flush`.
+        """
+        mutation["type"] = "mutation"
+        if self.batch_mutations:
+            self.batch.append(mutation)
+            return
+        if self.tracer is None:
+            await self._send_acked(mutation)
+            return
+        start = self.tracer.now()
+        await self._send_acked(mutation)
+        self.tracer.span(f"mutation {mutation['action']}", start)
+
+    async def post_mutation(self, mutation: dict) -> None:
+        """Send a mutation without waiting for acknowledgment."""
         mutation["type"] = "mutation"
-        event = asyncio.Event()
-        self.pending_acks[mutation_id] = event
+        if self.batch_mutations:
+            self.batch.append(mutation)
+            return
         await self.send(mutation)
+
+    async def flush(self) -> None:
+        """Send queued mutations as one batch frame and wait for all acks.
+
+        Called at every timing boundary (``step``, ``sleep``, slide end), so
+        everything issued before the boundary is on screen when it returns.
+        """
+        start = self.tracer.now() if self.tracer else 0.0
+        if self.batch:
+            mutations, self.batch = self.batch, []
+            await self._send_acked({"type": "batch", "mutations": mutations})
+        await self._drain_acks(0)
+        if self.tracer:
+            self.tracer.span("flush", start)
+
+    async def _send_acked(self, message: dict) -> None:
+        """Send a message tagged with a fresh id, keeping the ack window.
+
+        Blocks only while more than ``ack_window - 1`` earlier messages are
+        still unacknowledged, so up to ``ack_window`` can be in flight.
+        """
+        if self.ws is None:
+            # Nobody to ack; the mirror is what the client will get on resume
+            await self.send(message)
+            return
+        self.message_id += 1
+        message_id = message["id"] = self.message_id
+        self.pending_acks[message_id] = asyncio.Event()
+        self.ack_sent[message_id] = time.perf_counter()
+        if self.tracer:
+            self.tracer.sent(message_id)
+        await self.send(message)
+        await self._drain_acks(self.ack_window - 1)
+
+    def ack(self, message_id: int, client: dict | None = None) -> None:
+        """Release a pending ack and record its round trip.
+
+        *client* holds the client's receive/apply timestamps when tracing.
+        """
+        event = self.pending_acks.pop(message_id, None)
+        if event is not None:
+            event.set()
+        sent = self.ack_sent.pop(message_id, None)
+        if sent is not None:
+            acked = time.perf_counter()
+            self.metrics.ack_latency.observe(acked - sent)
+            if self.tracer and client:
+                self.tracer.ack(message_id, sent, acked, client)
+
+    async def _drain_acks(self, limit: int) -> None:
+        """Wait until at most *limit* acks are outstanding, oldest first."""
+        while len(self.pending_acks) > limit:
+            await next(iter(self.pending_acks.values())).wait()
+
+    async def capture(self, final: bool = False) -> None:
+        """Tell a capturing client the slide has settled at a boundary.
+
+        Sent when the slide blocks at ``step``/``sleep`` and when it ends,
+        after all earlier mutations are acked. It carries the boundary that
+        led to this state, so exporters wait on events rather than timers.
+        """
+        if not self.capture_boundaries:
+            return
+        self.captures += 1
+        await self.send({"type": "capture", "seq": self.captures, "final": final, **self.boundary})
+
+    def _record(self, message: dict) -> None:
+        """Append DOM-changing messages to the mirror log."""
+        kind = message.get("type")
+        if kind in SLIDE_INFO:
+            self.slide_info[kind] = message
+        elif kind == "mutation":
+            self.mirror_log.append(message)
+        elif kind == "batch":
+            self.mirror_log.extend(message["mutations"])
+        elif kind in ("clear", "reload"):
+            self.mirror_log.clear()
+            self.mirror.reset()
+            self.mirror_ok = True
+            return
+        elif kind == "snapshot":
+            self.mirror_log.clear()
+            self.mirror.load(message)
+            self.mirror_ok = True
+            return
+        else:
+            return
+        if len(self.mirror_log) >= MIRROR_LOG_LIMIT:
+            self._compact()
+
+    def _compact(self) -> None:
+        """Fold the mirror log into the mirrored DOM."""
+        log, self.mirror_log = self.mirror_log, []
+        if not self.mirror_ok:
+            return
         try:
-            await event.wait()
-        except asyncio.CancelledError:
-            self.pending_acks.pop(mutation_id, None)
-            raise
+            for mutation in log:
+                self.mirror.apply(mutation)
+        except UnsupportedSelector:
+            # The slide used a selector the mirror can't follow
+            self.mirror_ok = False
+
+    def snapshot(self) -> dict | None:
+        """Return the mirrored slide DOM, or None if it can't be trusted."""
+        self._compact()
+        return self.mirror.snapshot() if self.mirror_ok else None
+
+    def state_messages(self, presenter: bool = True) -> list[dict] | None:
+        """Messages that bring a fresh client up to the current slide state.
+
+        Returns None if the mirror can't be trusted.
+        """
+        snapshot = self.snapshot()
+        if snapshot is None:
+            return None
+        kinds = SLIDE_INFO if presenter else ("slide",)
+        info = [self.slide_info[k] for k in kinds if k in self.slide_info]
+        return info + [{"type": "snapshot", **snapshot}]
+
+    def detach(self) -> None:
+        """Drop the client socket but keep the slide running.
+
+        Outstanding acks are released, and later mutations only go to
+        the mirror until a client resumes the session.
+        """
+        self.ws = None
+        acks, self.pending_acks = self.pending_acks, {}
+        self.ack_sent.clear()
+        for event in acks.values():
+            event.set()
 
     def cancel_slide(self) -> None:
-        """Cancel the current slide task if running."""
+        """Cancel the current slide task if running.
+
+        Outstanding acks are released too, so nothing stays blocked on
+        them even if it isn't the cancelled task.
+        """
         if self.slide_task and not self.slide_task.done():
             self.slide_task.cancel()
         self.slide_task = None
         self.step_event = None
+        self.batch.clear()
+        acks, self.pending_acks = self.pending_acks, {}
+        self.ack_sent.clear()
+        for event in acks.values():
+            event.set()
+        self.discard_speculation()
+
+    def discard_speculation(self) -> None:
+        """Cancel the speculative run of the next slide, if any."""
+        if self.speculation is not None:
+            self.speculation.cancel_slide()
+            self.speculation = None
+
+
+@dataclass
+class SpeculativeSession(Session):
+    """Runs the next slide ahead of time, before anyone is looking.
+
+    Messages are recorded instead of sent, and the slide is held at its
+    first timing boundary (``step``, ``sleep`` or its end) until the
+    presenter advances to it and :func:`_adopt_speculation` hands it the
+    real session, or until it is discarded.
+    """
+
+    recorded: list[dict] = field(default_factory=list)
+    context: SlideContext | None = None
+    # Set at the first boundary (or if the slide ends early), then on adoption
+    ready: asyncio.Event = field(default_factory=asyncio.Event)
+    adopted: asyncio.Event = field(default_factory=asyncio.Event)
+
+    async def send(self, message: dict) -> None:
+        self.recorded.append(message)
+
+    async def send_mutation(self, mutation: dict) -> None:
+        mutation["type"] = "mutation"
+        self.recorded.append(mutation)
+
+    post_mutation = send_mutation
 
+    async def flush(self) -> None:
+        self.ready.set()
+        await self.adopted.wait()
 
-def create_app(deck: Deck | None = None) -> FastAPI:
+
+def create_app(deck: Deck | None = None, trace_dir: Path | None = None, bus_path: Path | None = None) -> FastAPI:
+    """Build the app serving *deck*.
+
+    With *trace_dir*, every session is traced end to end and written there
+    as a Chrome trace file when it ends or the server shuts down. With
+    *bus_path*, the app is one of several workers joined by the broker
+    listening there (see :func:`_join_bus`).
+    """
     app = FastAPI()
     app.state.deck = deck
     app.state.sessions: dict[str, Session] = {}
+    app.state.metrics = ServerMetrics(lambda: app.state.sessions)
+    app.state.trace_dir = trace_dir
+    app.state.tracers: list[Tracer] = []
+    app.state.compute = ComputePool(deck.compute_workers if deck else None)
+    app.state.cache = cache_for(deck.cache_dir if deck else None)
+    # Steps each slide (by index and fingerprint) took when it last ran to its end
+    app.state.step_counts: dict[tuple[int, str], int] = {}
+    app.state.bus = None
+    app.state.worker = None
 
     @app.on_event("startup")
     async def _capture_loop() -> None:
         app.state.loop = asyncio.get_running_loop()
+        if bus_path is not None:
+            await _join_bus(app, bus_path)
 
     @app.on_event("shutdown")
     async def _cleanup_sessions() -> None:
         for session in list(app.state.sessions.values()):
             session.cancel_slide()
+            for follower in session.followers:
+                follower.close()
+            if session.tracer:
+                session.tracer.write(trace_dir)
         app.state.sessions.clear()
+        app.state.compute.shutdown()
+        if app.state.bus:
+            app.state.bus.close()
+
+    # Static assets and shell pages live in memory, precompressed
+    assets = app.state.assets = StaticAssets(STATIC_DIR)
+    index_page = assets.page("index.html")
+    presenter_page = assets.page("presenter.html")
 
     @app.get("/")
-    async def index() -> HTMLResponse:
-        html = (STATIC_DIR / "index.html").read_text()
-        return HTMLResponse(html)
+    async def index(request: Request) -> Response:
+        return _asset_response(request, assets, index_page)
 
     @app.get("/presenter")
-    async def presenter() -> HTMLResponse:
-        html = (STATIC_DIR / "presenter.html").read_text()
-        return HTMLResponse(html)
+    async def presenter(request: Request) -> Response:
+        return _asset_response(request, assets, presenter_page)
+
+    @app.get("/metrics")
+    async def metrics() -> PlainTextResponse:
+        return PlainTextResponse(
+            app.state.metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+        )
 
     # Serve all static assets (CSS, JS, fonts, vendor libs)
-    app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
+    @app.api_route("/static/{name:path}", methods=["GET", "HEAD"])
+    async def static(name: str, request: Request) -> Response:
+        asset = assets.get(name)
+        if asset is None:
+            return Response(status_code=404)
+        # Pages link assets as ?v=<hash>, which can never change content
+        immutable = request.query_params.get("v") == asset.version
+        return _asset_response(request, assets, asset, immutable)
 
     @app.websocket("/ws")
     async def websocket_endpoint(ws: WebSocket) -> None:
         await ws.accept()
-        session_id = str(uuid.uuid4())
-        session = Session(ws=ws)
-        app.state.sessions[session_id] = session
-        try:
-            # Wait for the client's hello message with its current slide
+        await _serve_client(app, ws)
+
+    return app
+
+
+async def _serve_client(app: FastAPI, ws: WebSocket | RelaySocket) -> None:
+    """Serve one client socket, local or relayed from another worker."""
+    session_id: str | None = None
+    session: Session | None = None
+    try:
+        # Wait for the client's hello message with its current slide
+        data = await ws.receive_text()
+        msg = json.loads(data)
+        is_hello = msg.get("type") == "hello"
+        owner = _owner(app, msg if is_hello else {})
+        if owner is not None:
+            await _relay(app, ws, owner, data)
+            return
+        if app.state.deck and app.state.deck.broadcast:
+            await _serve_broadcast(app, ws, msg if is_hello else {})
+            return
+
+        if is_hello and msg.get("session"):
+            session_id = msg["session"]
+            session = await _resume_session(app, session_id, ws, msg)
+
+        if session is None:
+            session_id = str(uuid.uuid4())
+            if app.state.bus:
+                session_id = f"w{app.state.worker}.{session_id}"
+            session = _new_session(app, ws, msg if is_hello else {})
+            app.state.sessions[session_id] = session
+            _trace_session(app, session, session_id)
+            await session.send({"type": "session", "id": session_id})
+            await _start_session(app, session)
+
+        # Message loop
+        while True:
             data = await ws.receive_text()
             msg = json.loads(data)
-            if msg.get("type") == "hello":
-                session.current_slide = msg.get("slide", 0)
-                auto_step = msg.get("auto_step")
-                if auto_step is not None:
-                    session.auto_step = float(auto_step)
-                slide_delay = msg.get("slide_delay")
-                if slide_delay is not None:
-                    session.slide_delay = float(slide_delay)
-                if msg.get("instant_sleep"):
-                    session.instant_sleep = True
-
-            # Start the slide for this session
-            if app.state.deck:
-                # Clamp to valid range
-                total = len(app.state.deck.slides)
-                session.current_slide = max(0, min(session.current_slide, total - 1))
-                await asyncio.sleep(0.05)
-                session.slide_task = asyncio.create_task(
-                    _run_slide(app, session)
+            if msg["type"] == "ack":
+                session.ack(msg["id"], msg.get("t"))
+            elif msg["type"] == "keypress":
+                if session.tracer:
+                    session.tracer.keypress(msg["key"], msg.get("t"))
+                await _handle_keypress(app, session, msg["key"])
+            elif msg["type"] == "paint" and session.tracer:
+                session.tracer.paint(msg["ids"], msg["t"])
+    except (WebSocketDisconnect, asyncio.CancelledError):
+        pass
+    finally:
+        # A session taken over by a newer socket is no longer ours to detach
+        if session is not None and session.ws is ws:
+            session.detach()
+            if session.capture_boundaries:
+                # Export and recording pages never come back for their session
+                _expire_session(app, session_id)
+            else:
+                session.expiry = asyncio.get_running_loop().call_later(
+                    RESUME_GRACE, _expire_session, app, session_id
                 )
 
-            # Message loop
-            while True:
-                data = await ws.receive_text()
-                msg = json.loads(data)
-                if msg["type"] == "ack":
-                    event = session.pending_acks.pop(msg["id"], None)
-                    if event:
-                        event.set()
-                elif msg["type"] == "keypress":
-                    await _handle_keypress(app, session, msg["key"])
-        except (WebSocketDisconnect, asyncio.CancelledError):
-            pass
-        finally:
-            session.cancel_slide()
-            app.state.sessions.pop(session_id, None)
 
-    return app
+def _asset_response(request: Request, assets: StaticAssets, asset: Asset, immutable: bool = False) -> Response:
+    """Serve the best encoding of *asset*, or 304 if the client has it."""
+    body, encoding = assets.select(asset, request.headers.get("accept-encoding", ""))
+    headers = {
+        "ETag": asset.etag(encoding),
+        "Vary": "Accept-Encoding",
+        "Cache-Control": IMMUTABLE if immutable else "no-cache",
+    }
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    if_none_match = request.headers.get("if-none-match", "")
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    if headers["ETag"] in tags or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type=asset.media_type, headers=headers)
+
+
+async def _resume_session(app: FastAPI, session_id: str, ws: WebSocket, hello: dict) -> Session | None:
+    """Reattach a client to its running session and push the current DOM.
+
+    The slide function is not restarted: it keeps waiting at whatever
+    step it reached. Returns None if the session is unknown (e.g. the
+    server restarted), in which case the caller starts a fresh one.
+    """
+    session = app.state.sessions.get(session_id)
+    if session is None:
+        return None
+    if session.expiry is not None:
+        session.expiry.cancel()
+        session.expiry = None
+    if session.ws is not None:
+        # The old socket hasn't noticed it is dead yet (e.g. laptop sleep)
+        session.detach()
+    session.ws = ws
+    session.codec = negotiate(hello.get("codecs"))
+    session.fragments = _fragments(hello)
+    await session.send({"type": "session", "id": session_id})
+    if session.tracer:
+        await session.send({"type": "trace"})
+
+    messages = session.state_messages()
+    if not app.state.deck or messages is None:
+        await _go_to_slide(app, session, session.current_slide)
+        return session
+    for message in messages:
+        await session.send(message)
+    return session
+
+
+def _trace_session(app: FastAPI, session: Session, session_id: str) -> None:
+    """Attach a tracer to a new session if the app is tracing."""
+    if app.state.trace_dir is not None:
+        session.tracer = Tracer(session_id)
+        app.state.tracers.append(session.tracer)
+
+
+def _fragments(hello: dict) -> Fragments | None:
+    """Model of the client's fragment cache, for clients that announce one."""
+    capacity = hello.get("fragments")
+    return Fragments(int(capacity)) if capacity else None
+
+
+def _new_session(app: FastAPI, ws: WebSocket | None, hello: dict) -> Session:
+    """Create a session configured from the deck and the client's hello."""
+    deck = app.state.deck
+    session = Session(
+        ws=ws, metrics=app.state.metrics, codec=negotiate(hello.get("codecs")), fragments=_fragments(hello),
+        compute=app.state.compute, cache=app.state.cache,
+    )
+    if deck:
+        session.batch_mutations = deck.batch_mutations
+        session.ack_window = deck.ack_window
+        session.highlight = deck.server_highlight
+    _apply_hello(app, session, hello)
+    session.at_step = lambda: _speculate(app, session, at_step=True)
+    return session
+
+
+def _apply_hello(app: FastAPI, session: Session, hello: dict) -> None:
+    """Apply a client's starting slide and playback overrides to a session."""
+    deck = app.state.deck
+    slide = hello.get("slide", 0)
+    if isinstance(slide, str):
+        # Named jump, e.g. #slide-intro
+        slide = deck.find(slide) if deck else None
+    session.current_slide = slide or 0
+    auto_step = hello.get("auto_step")
+    if auto_step is not None:
+        session.auto_step = float(auto_step)
+    slide_delay = hello.get("slide_delay")
+    if slide_delay is not None:
+        session.slide_delay = float(slide_delay)
+    if hello.get("instant_sleep"):
+        session.instant_sleep = True
+    if hello.get("capture"):
+        session.capture_boundaries = True
+
+
+async def _start_session(app: FastAPI, session: Session) -> None:
+    """Start running the session's current slide."""
+    if session.tracer:
+        # Client starts reporting apply and paint timestamps
+        await session.send({"type": "trace"})
+    if app.state.deck:
+        # Clamp to valid range
+        total = len(app.state.deck.slides)
+        session.current_slide = max(0, min(session.current_slide, total - 1))
+        await asyncio.sleep(0.05)
+        session.slide_task = asyncio.create_task(
+            _run_slide(app, session)
+        )
+
+
+async def _serve_broadcast(app: FastAPI, ws: WebSocket, hello: dict) -> None:
+    """Serve one socket in broadcast mode.
+
+    A single stage session runs each slide once. The first leading client
+    (the presenter view, or a tab opened with ``?lead=1``) is its primary
+    socket and acks its mutations; every other socket is a follower fed a
+    copy of the stage's stream, starting from the current state. Only
+    leading clients may navigate.
+    """
+    stage = app.state.sessions.get(STAGE_ID)
+    if stage is None:
+        # Configured from the deck alone: a follower's hello must not steer the audience
+        stage = app.state.sessions[STAGE_ID] = _new_session(app, None, {})
+        _trace_session(app, stage, STAGE_ID)
+        if app.state.bus:
+            stage.followers.add(BusFollower(app.state.bus))
+    lead = bool(hello.get("lead"))
+    follower: Follower | None = None
+
+    # Other workers only hold a replica of the stage, fed over the bus
+    if lead and stage.ws is None and app.state.worker in (None, PRIMARY_WORKER):
+        stage.ws = ws
+        stage.codec = negotiate(hello.get("codecs"))
+        stage.fragments = _fragments(hello)
+        if stage.slide_task is None:
+            _apply_hello(app, stage, hello)
+            await _start_session(app, stage)
+        else:
+            messages = stage.state_messages()
+            if messages is None:
+                await _go_to_slide(app, stage, stage.current_slide)
+            else:
+                for message in messages:
+                    await send(ws, encode(message, stage.codec))
+            if stage.tracer:
+                await send(ws, encode({"type": "trace"}, stage.codec))
+    else:
+        follower = Follower(ws, stage, lead=lead, codec=negotiate(hello.get("codecs")))
+        stage.followers.add(follower)
+        follower.push_state()
+
+    try:
+        while True:
+            data = await ws.receive_text()
+            msg = json.loads(data)
+            if msg["type"] == "ack":
+                if stage.ws is ws:
+                    stage.ack(msg["id"], msg.get("t"))
+            elif msg["type"] == "keypress" and lead:
+                if stage.tracer:
+                    stage.tracer.keypress(msg["key"], msg.get("t"))
+                await _handle_keypress(app, stage, msg["key"])
+            elif msg["type"] == "paint" and stage.ws is ws and stage.tracer:
+                stage.tracer.paint(msg["ids"], msg["t"])
+    finally:
+        if follower is not None:
+            follower.close()
+            stage.followers.discard(follower)
+        elif stage.ws is ws:
+            # The stage keeps running until a leading client comes back
+            stage.detach()
+
+
+def _expire_session(app: FastAPI, session_id: str) -> None:
+    """Drop a session whose client did not come back within the grace period."""
+    session = app.state.sessions.get(session_id)
+    if session is not None and session.ws is None:
+        session.cancel_slide()
+        app.state.sessions.pop(session_id, None)
+        if session.tracer:
+            session.tracer.write(app.state.trace_dir)
+
+
+async def _send_presenter_info(deck: Deck, session: Session, index: int) -> None:
+    """Send notes and next slide preview, precomputed at deck load."""
+    await session.send({"type": "notes", "html": deck.meta(index).notes_html})
+    if index < len(deck.slides) - 1:
+        next_meta = deck.meta(index + 1)
+        await session.send({"type": "next_preview", "title": next_meta.title, "excerpt": next_meta.excerpt})
+    else:
+        await session.send({"type": "next_preview", "title": None, "excerpt": ""})
 
 
 async def _run_slide(app: FastAPI, session: Session) -> None:
@@ -145,47 +775,44 @@ async def _run_slide(app: FastAPI, session: Session) -> None:
     if not deck or index >= len(deck.slides):
         return
     try:
+        session.boundary = {"boundary": "initial", "duration": 0}
+        session.captures = 0
+        session.fingerprint = deck.fingerprint(index)
+        session.files_read = set()
+        session.steps = 0
         await session.send({"type": "clear"})
         await session.send({"type": "slide", "index": index, "total": len(deck.slides)})
 
         slide_fn = deck.slides[index]
 
-        # Send presenter notes (docstring rendered as markdown)
-        notes_html = ""
-        if slide_fn.func.__doc__:
-            import textwrap
-            import markdown
-            notes_html = markdown.markdown(
-                textwrap.dedent(slide_fn.func.__doc__).strip(),
-                extensions=["fenced_code", "tables"],
-            )
-        await session.send({"type": "notes", "html": notes_html})
-
-        # Send next slide preview
-        if index < len(deck.slides) - 1:
-            next_fn = deck.slides[index + 1]
-            next_excerpt = ""
-            if next_fn.func.__doc__:
-                import textwrap
-                lines = textwrap.dedent(next_fn.func.__doc__).strip().split("\n")
-                para = []
-                for line in lines:
-                    if line.strip() == "" and para:
-                        break
-                    if line.strip():
-                        para.append(line.strip())
-                next_excerpt = " ".join(para)
-            await session.send({"type": "next_preview", "title": next_fn.name, "excerpt": next_excerpt})
-        else:
-            await session.send({"type": "next_preview", "title": None, "excerpt": ""})
+        await _send_presenter_info(deck, session, index)
 
         # Execute the slide body (docstring is NOT rendered as content)
         from auditorium.slide import SlideContext
         ctx = SlideContext(session)
+        speculative = isinstance(session, SpeculativeSession)
+        if speculative:
+            session.context = ctx
+        tracer = session.tracer
+        if tracer:
+            tracer.slide_started(index, slide_fn.name)
+        started = time.perf_counter()
+        trace_start = tracer.now() if tracer else 0.0
         await slide_fn.func(ctx)
+        await ctx._session.flush()
+        # Once adopted, a speculative run carries on with the real session
+        session = ctx._session
+        if not speculative:
+            # A speculative run's time includes waiting to be adopted
+            session.metrics.slide_duration.observe(time.perf_counter() - started)
+        if tracer:
+            tracer.span(f"slide {index + 1} {slide_fn.name}", trace_start)
 
         # Signal that the slide function has finished (for exporters)
         await session.send({"type": "slide_complete", "index": index})
+        await session.capture(final=True)
+        app.state.step_counts[index, session.fingerprint] = session.steps
+        _speculate(app, session)
 
         # Auto-advance in recording mode
         if session.auto_step is not None:
@@ -212,41 +839,271 @@ async def _handle_keypress(app: FastAPI, session: Session, key: str) -> None:
         else:
             await _go_to_slide(app, session, session.current_slide + 1)
     elif key == "PageDown":
-        session.cancel_slide()
         await _go_to_slide(app, session, session.current_slide + 1)
     elif key == "ArrowLeft":
-        session.cancel_slide()
         await _go_to_slide(app, session, session.current_slide - 1)
     elif key == "r":
-        session.cancel_slide()
         await _go_to_slide(app, session, session.current_slide)
     elif key.isdigit():
         session.numeric_buffer += key
     elif key == "Enter" and session.numeric_buffer:
         target = int(session.numeric_buffer) - 1
         session.numeric_buffer = ""
-        session.cancel_slide()
         await _go_to_slide(app, session, target)
 
 
 async def _go_to_slide(app: FastAPI, session: Session, index: int) -> None:
-    """Navigate a session to a specific slide index."""
+    """Navigate a session to a specific slide index.
+
+    Going to the slide that is being run speculatively adopts that run;
+    any other jump discards it.
+    """
     deck = app.state.deck
     if not deck:
         return
     index = max(0, min(index, len(deck.slides) - 1))
+    spec, session.speculation = session.speculation, None
     session.current_slide = index
     session.cancel_slide()
+    if spec is not None and spec.current_slide == index:
+        session.slide_task = asyncio.create_task(_adopt_speculation(session, spec))
+        return
+    if spec is not None:
+        spec.cancel_slide()
     session.slide_task = asyncio.create_task(_run_slide(app, session))
 
 
-async def reload_deck(app: FastAPI, new_deck) -> None:
-    """Hot-reload: swap the deck and restart all sessions at their current slide."""
-    app.state.deck = new_deck
-    total = len(new_deck.slides)
-    for session in list(app.state.sessions.values()):
+# --- Speculation ---
+
+
+def _speculate(app: FastAPI, session: Session, at_step: bool = False) -> None:
+    """Start running the slide after the session's current one ahead of time.
+
+    Called when the current slide ends, and *at_step* whenever it waits at
+    a step; then it only speculates at the slide's last step, as counted
+    the last time the slide ran to its end. Recording and capturing
+    sessions never speculate.
+    """
+    deck = app.state.deck
+    index = session.current_slide + 1
+    if (
+        not deck
+        or not deck.speculate
+        or isinstance(session, SpeculativeSession)
+        or session.auto_step is not None
+        or session.capture_boundaries
+        or index >= len(deck.slides)
+        or session.speculation is not None and session.speculation.current_slide == index
+    ):
+        return
+    if at_step and app.state.step_counts.get((session.current_slide, session.fingerprint)) != session.steps:
+        return
+    session.discard_speculation()
+    spec = session.speculation = SpeculativeSession(
+        ws=None, current_slide=index, highlight=session.highlight, compute=session.compute, cache=session.cache,
+    )
+    spec.slide_task = asyncio.create_task(_run_slide(app, spec))
+    # A slide that fails before its first boundary is adopted as far as it got
+    spec.slide_task.add_done_callback(lambda _: spec.ready.set())
+
+
+async def _adopt_speculation(session: Session, spec: SpeculativeSession) -> None:
+    """Show a speculative run on *session* and let it continue there.
+
+    Waits for the run to reach its first boundary, then sends what it
+    recorded with the mutations in one batch frame, and hands the slide
+    the real session from there on.
+    """
+    try:
+        await spec.ready.wait()
+        session.boundary, session.captures, session.steps = spec.boundary, spec.captures, spec.steps
+        session.fingerprint, session.files_read = spec.fingerprint, spec.files_read
+        mutations: list[dict] = []
+        for message in spec.recorded:
+            if message["type"] == "mutation":
+                mutations.append(message)
+                continue
+            if mutations:
+                await session._send_acked({"type": "batch", "mutations": mutations})
+                mutations = []
+            await session.send(message)
+        if mutations:
+            await session._send_acked({"type": "batch", "mutations": mutations})
+        await session._drain_acks(0)
+    except asyncio.CancelledError:
+        spec.cancel_slide()
+        raise
+    if spec.context is not None:
+        spec.context._session = session
+    session.slide_task = spec.slide_task
+    spec.adopted.set()
+
+
+async def reload_deck(app: FastAPI, new_deck: Deck | None, changed: set[Path] | None = None) -> int:
+    """Hot-reload: swap in *new_deck* and restart the sessions it affects.
+
+    A session restarts at its current slide when that slide's fingerprint
+    changed, or when it read one of the *changed* files (``show_md``).
+    Pass ``new_deck=None`` when only such files changed. Other sessions
+    keep running and just get fresh slide info. Returns the number of
+    sessions restarted.
+
+    A *new_deck* without slides (e.g. saved mid-edit) is rejected with
+    ValueError and the running deck is kept.
+    """
+    if new_deck is not None:
+        if not len(new_deck.slides):
+            raise ValueError("the deck has no slides, keeping the previous version")
+        app.state.deck = new_deck
+        if new_deck.compute_workers != app.state.compute.workers:
+            # Running calls finish in the old pools; new ones go to the resized pools
+            app.state.compute.shutdown()
+            app.state.compute.workers = new_deck.compute_workers
+        app.state.cache = cache_for(new_deck.cache_dir)
+    deck = app.state.deck
+    total = len(deck.slides)
+    restarted = 0
+    for session in list(app.state.sessions.values()) if total else ():
+        index = max(0, min(session.current_slide, total - 1))
+        affected = (
+            index != session.current_slide
+            or session.fingerprint != deck.fingerprint(index)
+            or session.files_read & (changed or set())
+        )
+        if not affected:
+            # The next slide may have changed under its speculative run
+            session.discard_speculation()
+            if new_deck is not None:
+                # Slide count, notes or the next slide may still differ
+                await session.send({"type": "slide", "index": index, "total": total})
+                await _send_presenter_info(deck, session, index)
+            continue
+        restarted += 1
         session.cancel_slide()
-        session.current_slide = max(0, min(session.current_slide, total - 1))
+        session.current_slide = index
         await session.send({"type": "reload", "slide": session.current_slide})
         await asyncio.sleep(0.05)
         session.slide_task = asyncio.create_task(_run_slide(app, session))
+    app.state.metrics.reloads.inc()
+    app.state.metrics.reload_restarts.inc(restarted)
+    return restarted
+
+
+# --- Multiple workers ---
+
+
+async def _join_bus(app: FastAPI, path: Path) -> None:
+    """Connect this worker to the broker.
+
+    The worker serves sessions relayed to it by other workers (see
+    :func:`_relay`). In broadcast mode the primary worker runs the stage
+    and publishes its stream; every other worker keeps a replica of it
+    for its own followers, brought up to date on joining.
+
+    If the broker drops frames because this worker fell behind, relayed
+    clients are disconnected so they resume with a snapshot, and the
+    replica asks for the stage's state again.
+    """
+    bus = app.state.bus = await Bus.connect(path)
+    worker = app.state.worker = bus.worker
+    relays: dict[str, RelaySocket] = {}
+
+    def on_overflow() -> None:
+        for socket in list(relays.values()):
+            bus.publish(socket.channel, close=True)
+            socket.inbox.put_nowait(None)
+
+    bus.overflow_handlers.append(on_overflow)
+
+    async def on_relay(header: dict, payload: bytes) -> None:
+        relay = header["relay"]
+        if header["kind"] == "attach":
+            socket = relays[relay] = RelaySocket(bus, relay)
+            socket.inbox.put_nowait(payload.decode())
+            task = asyncio.create_task(_serve_client(app, socket))
+            task.add_done_callback(lambda _: relays.pop(relay, None))
+        elif relay in relays:
+            relays[relay].inbox.put_nowait(payload.decode() if header["kind"] == "client" else None)
+
+    bus.subscribe(f"worker:{worker}", on_relay)
+    deck = app.state.deck
+    if not (deck and deck.broadcast):
+        return
+    if worker == PRIMARY_WORKER:
+        async def on_sync(header: dict, payload: bytes) -> None:
+            stage = app.state.sessions.get(STAGE_ID)
+            for message in (stage.state_messages() if stage else None) or []:
+                bus.publish(f"stage:{header['worker']}", encode(message, "json").encode())
+
+        bus.subscribe("stage-sync", on_sync)
+        return
+
+    replica = app.state.sessions[STAGE_ID] = _new_session(app, None, {})
+
+    async def on_stage(header: dict, payload: bytes) -> None:
+        await replica.send(json.loads(payload))
+
+    bus.subscribe("stage", on_stage)
+    bus.subscribe(f"stage:{worker}", on_stage)
+    bus.overflow_handlers.append(lambda: bus.publish("stage-sync", worker=worker))
+    bus.publish("stage-sync", worker=worker)
+
+
+def _owner(app: FastAPI, hello: dict) -> int | None:
+    """The other worker that should serve this client, if any.
+
+    Resumed sessions go back to the worker that created them, and
+    broadcast leads to the primary worker, which runs the stage.
+    """
+    bus = app.state.bus
+    if bus is None:
+        return None
+    if app.state.deck and app.state.deck.broadcast:
+        owner = PRIMARY_WORKER if hello.get("lead") else None
+    else:
+        match = _WORKER_PREFIX.match(hello.get("session") or "")
+        owner = int(match.group(1)) if match else None
+    if owner == app.state.worker or owner not in bus.workers:
+        # A session whose worker is gone starts over here
+        return None
+    return owner
+
+
+async def _relay(app: FastAPI, ws: WebSocket, owner: int, hello: str) -> None:
+    """Pass a client's frames to and from the worker *owner* serving it.
+
+    The client is disconnected when frames on the way may have been
+    dropped by the broker, so it reconnects and resumes from a snapshot.
+    """
+    bus = app.state.bus
+    relay = uuid.uuid4().hex
+    outbox: asyncio.Queue[str | bytes | None] = asyncio.Queue()
+
+    async def on_frame(header: dict, payload: bytes) -> None:
+        if header.get("close"):
+            outbox.put_nowait(None)
+        else:
+            outbox.put_nowait(payload if header.get("binary") else payload.decode())
+
+    def on_overflow() -> None:
+        outbox.put_nowait(None)
+
+    async def pump() -> None:
+        # Off the bus reader, so a slow client never stalls other relays
+        while (payload := await outbox.get()) is not None:
+            await send(ws, payload)
+        await ws.close(code=1012)
+
+    bus.subscribe(f"relay:{relay}", on_frame)
+    bus.overflow_handlers.append(on_overflow)
+    pumping = asyncio.create_task(pump())
+    bus.publish(f"worker:{owner}", hello.encode(), kind="attach", relay=relay)
+    try:
+        while True:
+            data = await ws.receive_text()
+            bus.publish(f"worker:{owner}", data.encode(), kind="client", relay=relay)
+    finally:
+        pumping.cancel()
+        bus.overflow_handlers.remove(on_overflow)
+        bus.publish(f"worker:{owner}", kind="detach", relay=relay)
+        bus.unsubscribe(f"relay:{relay}")
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 import asyncio
-import textwrap
+import inspect
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
 
-import markdown
+from auditorium.cache import cache_for
+from auditorium.compute import default_pool
+from auditorium.render import read_markdown_file, render_markdown
 
 if TYPE_CHECKING:
     from auditorium.server import Session
@@ -66,23 +68,70 @@ class SlideContext:
 
     async def md(self, text: str, *, element_id: str | None = None) -> None:
         """Render markdown text and append it."""
-        html = markdown.markdown(
-            textwrap.dedent(text).strip(),
-            extensions=["fenced_code", "tables"],
-        )
+        tracer = self._session.tracer
+        start = tracer.now() if tracer else 0.0
+        html = render_markdown(text, highlight=self._session.highlight)
+        if tracer:
+            tracer.span("markdown", start, chars=len(text))
         await self.show(html, element_id=element_id)
 
     async def show_md(self, path: str | Path, *, element_id: str | None = None) -> None:
         """Load a markdown file and render it."""
-        text = Path(path).read_text()
+        # Hot reload restarts this slide when the file changes
+        self._session.files_read.add(Path(path).resolve())
+        text = read_markdown_file(path)
         await self.md(text, element_id=element_id)
 
+    # --- Computation ---
+
+    async def compute(self, fn: Callable, *args: Any, process: bool = False, **kwargs: Any) -> Any:
+        """Run ``fn(*args, **kwargs)`` off the event loop and return its result.
+
+        Runs in a thread, or in a worker process with ``process=True`` for
+        pure-Python code that holds the GIL (*fn* and its arguments must
+        then be picklable). Pool sizes come from ``Deck(compute_workers=N)``.
+        Leaving the slide drops the call if it has not started yet, and
+        terminates it if it is running in a process.
+        """
+        pool = self._session.compute or default_pool()
+        tracer = self._session.tracer
+        start = tracer.now() if tracer else 0.0
+        result = await pool.run(fn, *args, process=process, **kwargs)
+        if tracer:
+            tracer.span(f"compute {getattr(fn, '__name__', 'call')}", start, process=process)
+        return result
+
+    async def cached(self, key: str, fn: Callable, *args: Any, process: bool = False, **kwargs: Any) -> Any:
+        """Return ``fn(*args, **kwargs)``, memoized across sessions, reloads and restarts.
+
+        Results are kept in memory and in ``.auditorium-cache/`` next to
+        the deck, under a hash of *key*, the code of *fn* and the arguments,
+        so editing *fn* recomputes them. A miss runs like :meth:`compute`
+        (coroutine functions are awaited). The result is shared between
+        sessions, so don't mutate it.
+        """
+        store = self._session.cache or cache_for(None)
+
+        def run() -> Awaitable:
+            if inspect.iscoroutinefunction(fn):
+                return fn(*args, **kwargs)
+            return self.compute(fn, *args, process=process, **kwargs)
+
+        return await store.get_async(key, fn, args, kwargs, run)
+
     # --- Timing ---
 
     async def step(self) -> None:
         """Wait for a keypress to continue, or auto-advance if auto_step is set."""
+        await self._session.flush()
         event = asyncio.Event()
         self._session.step_event = event
+        self._session.steps += 1
+        await self._session.capture()
+        if self._session.at_step is not None:
+            self._session.at_step()
+        tracer = self._session.tracer
+        start = tracer.now() if tracer else 0.0
         if self._session.auto_step is not None:
             try:
                 await asyncio.wait_for(event.wait(), timeout=self._session.auto_step)
@@ -90,8 +139,9 @@ class SlideContext:
                 pass  # auto-advance
         else:
             await event.wait()
-        # Signal step completion (for step-by-step export)
-        await self._session.send({"type": "step_complete"})
+        if tracer:
+            tracer.span("step", start)
+        self._session.boundary = {"boundary": "step", "duration": 0}
 
     async def sleep(self, seconds: float) -> None:
         """Pause for a duration. Instant when instant_sleep is set (export mode).
@@ -100,17 +150,18 @@ class SlideContext:
         sleep acts like step — blocks for a keypress so the exporter can capture
         the state before and after each sleep boundary.
         """
+        await self._session.flush()
         if self._session.instant_sleep:
             if self._session.auto_step is None:
                 # Step-by-step export: treat sleep as a capture boundary.
-                # Send sleep_complete (not step_complete) so the exporter
-                # knows this is a timed boundary with the original duration.
-                # Set event BEFORE sending signal to avoid race with the
-                # exporter's keypress arriving before step_event is set.
+                # The frame after it is tagged as a timed boundary with the
+                # original duration. Set event BEFORE sending the capture
+                # signal to avoid racing the exporter's keypress.
                 event = asyncio.Event()
                 self._session.step_event = event
-                await self._session.send({"type": "sleep_complete", "duration": seconds})
+                await self._session.capture()
                 await event.wait()
+                self._session.boundary = {"boundary": "sleep", "duration": seconds}
             return
         await asyncio.sleep(seconds)
 
@@ -0,0 +1,154 @@
+// Decoder for the server's wire codecs (auditorium/protocol.py).
+// Frames are self-describing: binary frames are msgpack, text frames
+// are JSON holding either a message object or its compact array form.
+(function() {
+    const MESSAGE = 0;
+    const BATCH = 8;
+    // Opcode -> [action, fields in wire order]; keep in sync with MUTATIONS
+    const ACTIONS = {
+        1: ['append', ['html', 'element_id', 'target', 'fragment', 'ref']],
+        2: ['remove', ['selector']],
+        3: ['replace', ['selector', 'html', 'fragment', 'ref']],
+        4: ['set_class', ['selector', 'cls']],
+        5: ['remove_class', ['selector', 'cls']],
+        6: ['push_target', ['selector']],
+        7: ['pop_target', []],
+    };
+
+    function unpackMutation(packed, withId) {
+        if (packed[0] === MESSAGE) return packed[1];
+        const [action, fields] = ACTIONS[packed[0]];
+        const offset = withId ? 2 : 1;
+        const msg = { type: 'mutation', action: action };
+        if (withId) msg.id = packed[1];
+        for (let i = 0; i < fields.length; i++) {
+            if (packed[offset + i] !== undefined && packed[offset + i] !== null) msg[fields[i]] = packed[offset + i];
+        }
+        return msg;
+    }
+
+    // Fragments this socket was sent, least recently used first. The
+    // server models the same cache (Fragments in protocol.py), so both
+    // sides must store, touch and evict in exactly the same order.
+    const FRAGMENT_CAPACITY = 128;
+    let fragments = new Map();
+
+    function resolveFragment(msg) {
+        if (msg.ref !== undefined) {
+            msg.html = fragments.get(msg.ref);
+            fragments.delete(msg.ref);
+            fragments.set(msg.ref, msg.html);
+            delete msg.ref;
+        } else if (msg.fragment !== undefined) {
+            fragments.set(msg.fragment, msg.html);
+            if (fragments.size > FRAGMENT_CAPACITY) fragments.delete(fragments.keys().next().value);
+            delete msg.fragment;
+        }
+    }
+
+    function resolveFragments(msg) {
+        if (msg.type === 'mutation') resolveFragment(msg);
+        else if (msg.type === 'batch') msg.mutations.forEach(resolveFragment);
+        return msg;
+    }
+
+    // Called for every new socket, whose server side starts out empty too;
+    // the capacity goes in the hello
+    function resetFragments() {
+        fragments = new Map();
+        return FRAGMENT_CAPACITY;
+    }
+
+    function unpack(packed) {
+        if (packed[0] === MESSAGE) return packed[1];
+        if (packed[0] === BATCH) {
+            return { type: 'batch', id: packed[1], mutations: packed[2].map(m => unpackMutation(m, false)) };
+        }
+        return unpackMutation(packed, true);
+    }
+
+    const utf8 = new TextDecoder();
+
+    // The msgpack subset Python's msgpack.packb emits for our messages
+    function unpackb(buffer) {
+        const bytes = new Uint8Array(buffer);
+        const view = new DataView(buffer);
+        let pos = 0;
+
+        function str(length) {
+            const s = utf8.decode(bytes.subarray(pos, pos + length));
+            pos += length;
+            return s;
+        }
+        function array(length) {
+            const out = new Array(length);
+            for (let i = 0; i < length; i++) out[i] = read();
+            return out;
+        }
+        function map(length) {
+            const out = {};
+            for (let i = 0; i < length; i++) {
+                const key = read();
+                out[key] = read();
+            }
+            return out;
+        }
+        function bin(length) {
+            const out = bytes.slice(pos, pos + length);
+            pos += length;
+            return out;
+        }
+
+        function read() {
+            const b = bytes[pos++];
+            if (b <= 0x7f) return b;
+            if (b <= 0x8f) return map(b & 0x0f);
+            if (b <= 0x9f) return array(b & 0x0f);
+            if (b <= 0xbf) return str(b & 0x1f);
+            if (b >= 0xe0) return b - 0x100;
+            let v;
+            switch (b) {
+                case 0xc0: return null;
+                case 0xc2: return false;
+                case 0xc3: return true;
+                case 0xc4: v = bytes[pos]; pos += 1; return bin(v);
+                case 0xc5: v = view.getUint16(pos); pos += 2; return bin(v);
+                case 0xc6: v = view.getUint32(pos); pos += 4; return bin(v);
+                case 0xca: v = view.getFloat32(pos); pos += 4; return v;
+                case 0xcb: v = view.getFloat64(pos); pos += 8; return v;
+                case 0xcc: v = bytes[pos]; pos += 1; return v;
+                case 0xcd: v = view.getUint16(pos); pos += 2; return v;
+                case 0xce: v = view.getUint32(pos); pos += 4; return v;
+                case 0xcf: v = Number(view.getBigUint64(pos)); pos += 8; return v;
+                case 0xd0: v = view.getInt8(pos); pos += 1; return v;
+                case 0xd1: v = view.getInt16(pos); pos += 2; return v;
+                case 0xd2: v = view.getInt32(pos); pos += 4; return v;
+                case 0xd3: v = Number(view.getBigInt64(pos)); pos += 8; return v;
+                case 0xd9: v = bytes[pos]; pos += 1; return str(v);
+                case 0xda: v = view.getUint16(pos); pos += 2; return str(v);
+                case 0xdb: v = view.getUint32(pos); pos += 4; return str(v);
+                case 0xdc: v = view.getUint16(pos); pos += 2; return array(v);
+                case 0xdd: v = view.getUint32(pos); pos += 4; return array(v);
+                case 0xde: v = view.getUint16(pos); pos += 2; return map(v);
+                case 0xdf: v = view.getUint32(pos); pos += 4; return map(v);
+            }
+            throw new Error('[auditorium] unsupported msgpack type 0x' + b.toString(16));
+        }
+
+        return read();
+    }
+
+    function decode(data) {
+        if (typeof data !== 'string') return resolveFragments(unpack(unpackb(data)));
+        const msg = JSON.parse(data);
+        return resolveFragments(Array.isArray(msg) ? unpack(msg) : msg);
+    }
+
+    // Offered in the hello, most compact first; ?codec=json forces one
+    function codecs() {
+        const forced = new URLSearchParams(location.search).get('codec');
+        return forced ? [forced] : ['msgpack', 'compact', 'json'];
+    }
+
+    window.auditoriumProtocol = { decode: decode, codecs: codecs, resetFragments: resetFragments };
+})();
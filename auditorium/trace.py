@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+
+# Trace "threads", one row each in Perfetto / chrome://tracing
+SERVER = 1
+NETWORK = 2
+CLIENT = 3
+_THREAD_NAMES = {SERVER: "server", NETWORK: "network", CLIENT: "client"}
+
+
+class Tracer:
+    """Chrome trace events for one session, from slide code to paint.
+
+    Server spans use ``perf_counter``. Client timestamps (``performance.now()``
+    in ms) are placed on the server timeline from each ack, assuming the
+    network time of its round trip is split evenly between both ways.
+    """
+
+    def __init__(self, session_id: str) -> None:
+        self.session_id = session_id
+        self.origin = time.perf_counter()
+        self.events: list[dict] = [
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": name}}
+            for tid, name in _THREAD_NAMES.items()
+        ]
+        # Server µs minus client µs, from the latest ack
+        self.offset: float | None = None
+        self.slide = ""
+        # Keypress -> paint, in client time: pending key and ids sent since
+        self.key_time: float | None = None
+        self.key_ids: set[int] = set()
+        self.latencies: dict[str, list[float]] = {}
+
+    def now(self) -> float:
+        """Microseconds since the tracer started."""
+        return (time.perf_counter() - self.origin) * 1e6
+
+    def span(self, name: str, start: float, end: float | None = None, tid: int = SERVER, **args) -> None:
+        end = self.now() if end is None else end
+        self.events.append({
+            "name": name, "ph": "X", "pid": 1, "tid": tid,
+            "ts": start, "dur": max(0.0, end - start), "args": args,
+        })
+
+    def instant(self, name: str, ts: float | None = None, tid: int = SERVER, **args) -> None:
+        self.events.append({
+            "name": name, "ph": "i", "s": "t", "pid": 1, "tid": tid,
+            "ts": self.now() if ts is None else ts, "args": args,
+        })
+
+    def slide_started(self, index: int, name: str) -> None:
+        self.slide = f"{index + 1} {name}"
+
+    def keypress(self, key: str, client_time: float | None) -> None:
+        self.instant("keypress", key=key, slide=self.slide)
+        if client_time is not None:
+            self.key_time = client_time
+            self.key_ids = set()
+
+    def sent(self, message_id: int) -> None:
+        """Note an acked message going out, for keypress-to-paint matching."""
+        if self.key_time is not None:
+            self.key_ids.add(message_id)
+
+    def ack(self, message_id: int, sent: float, acked: float, client: dict) -> None:
+        """Place the client's receive/apply times for a message on the timeline.
+
+        *sent* and *acked* are server ``perf_counter`` values; *client* has
+        ``recv`` and ``applied`` in client milliseconds.
+        """
+        sent, acked = (sent - self.origin) * 1e6, (acked - self.origin) * 1e6
+        recv, applied = client["recv"] * 1000, client["applied"] * 1000
+        busy = max(0.0, applied - recv)
+        one_way = max(0.0, acked - sent - busy) / 2
+        arrived = sent + one_way
+        self.offset = arrived - recv
+        self.span("to client", sent, arrived, tid=NETWORK, id=message_id)
+        self.span("apply", arrived, arrived + busy, tid=CLIENT, id=message_id)
+        self.span("to server", arrived + busy, acked, tid=NETWORK, id=message_id)
+
+    def paint(self, ids: list[int], client_time: float) -> None:
+        if self.offset is not None:
+            self.instant("paint", client_time * 1000 + self.offset, tid=CLIENT, mutations=len(ids))
+        if self.key_time is not None and self.key_ids.intersection(ids):
+            self.latencies.setdefault(self.slide, []).append(client_time - self.key_time)
+            self.key_time = None
+            self.key_ids = set()
+
+    def write(self, directory: Path) -> Path:
+        """Write ``<session id>.json`` in Chrome trace format to *directory*."""
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{self.session_id}.json"
+        path.write_text(json.dumps({
+            "traceEvents": self.events,
+            "displayTimeUnit": "ms",
+            "otherData": {"session": self.session_id},
+        }))
+        return path
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of *values* (0 < q <= 1)."""
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(q * len(ordered)) - 1))]
+
+
+def latency_summary(tracers) -> dict[str, list[float]]:
+    """Merge keypress-to-paint latencies (ms) per slide across sessions."""
+    merged: dict[str, list[float]] = {}
+    for tracer in tracers:
+        for slide, values in tracer.latencies.items():
+            merged.setdefault(slide, []).extend(values)
+    return merged
@@ -0,0 +1,4 @@
+from __future__ import annotations
+
+# Importing the modules registers their benchmarks
+from benchmarks import bench_deck, bench_export, bench_pipeline  # noqa: F401
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import typer
+
+from auditorium.console import console
+from benchmarks import harness
+
+app = typer.Typer(name="benchmarks", help="Offline microbenchmarks for auditorium's hot paths")
+
+
+@app.command()
+def run(
+    patterns: list[str] = typer.Argument(None, help="Only run benchmarks matching these regular expressions"),
+    save: str | None = typer.Option(None, "--save", help="Store results as a baseline name or .json path"),
+    repeat: int = typer.Option(20, "-r", "--repeat", min=1, help="Timed repeats per benchmark"),
+) -> None:
+    """Run the benchmarks and print their timings."""
+    names = _select(patterns)
+    results = harness.run(names, repeat)
+    console.print(_results_table(results))
+    if save:
+        path = harness.baseline_path(save)
+        harness.save(results, path)
+        console.print(f"[dim]Saved to {path}[/]")
+
+
+@app.command()
+def compare(
+    base: str = typer.Argument(..., help="Baseline name or .json path"),
+    current: str | None = typer.Argument(None, help="Results to compare (default: run the benchmarks now)"),
+    threshold: float = typer.Option(0.1, "-t", "--threshold", help="Relative slowdown reported as a regression"),
+    repeat: int = typer.Option(20, "-r", "--repeat", min=1, help="Timed repeats per benchmark when running"),
+) -> None:
+    """Diff results against a baseline; exits 1 on regressions."""
+    base_meta, base_results = _load(base)
+    if current is None:
+        results = harness.run([name for name in harness.BENCHMARKS if name in base_results], repeat)
+    else:
+        _, results = _load(current)
+    ratios = harness.compare(base_results, results)
+    console.print(_compare_table(base_results, results, ratios, threshold))
+    console.print(f"[dim]Baseline: commit {base_meta.get('commit')} on {base_meta.get('machine')}, {base_meta.get('time')}[/]")
+    regressions = [name for name, ratio in ratios.items() if ratio > 1 + threshold]
+    if regressions:
+        console.print(f"[red]{len(regressions)} regression(s):[/] {', '.join(regressions)}")
+        raise typer.Exit(1)
+
+
+def _load(name: str) -> tuple[dict, dict[str, harness.Result]]:
+    path = harness.baseline_path(name)
+    if not path.exists():
+        console.print(f"[red]Error:[/] no baseline at {path}")
+        raise typer.Exit(1)
+    return harness.load(path)
+
+
+def _select(patterns: list[str] | None) -> list[str] | None:
+    if not patterns:
+        return None
+    names = harness.select(patterns)
+    if not names:
+        console.print(f"[red]Error:[/] no benchmark matches {' '.join(patterns)}")
+        raise typer.Exit(1)
+    return names
+
+
+def _format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def _results_table(results: dict[str, harness.Result]):
+    from rich.table import Table
+
+    table = Table(header_style="dim", box=None, padding=(0, 1))
+    table.add_column("Benchmark")
+    for column in ("median", "p95", "min", "per second"):
+        table.add_column(column, justify="right")
+    for name, result in results.items():
+        table.add_row(
+            name, _format_time(result.median), _format_time(result.p95),
+            _format_time(result.min), f"{result.per_second:,.0f}",
+        )
+    return table
+
+
+def _compare_table(base: dict, current: dict, ratios: dict[str, float], threshold: float):
+    from rich.table import Table
+
+    table = Table(header_style="dim", box=None, padding=(0, 1))
+    table.add_column("Benchmark")
+    for column in ("baseline", "current", "change"):
+        table.add_column(column, justify="right")
+    for name, ratio in ratios.items():
+        change = f"{(ratio - 1) * 100:+.1f}%"
+        if ratio > 1 + threshold:
+            change = f"[red]{change}[/]"
+        elif ratio < 1 - threshold:
+            change = f"[green]{change}[/]"
+        table.add_row(name, _format_time(base[name].median), _format_time(current[name].median), change)
+    for name in sorted(set(current) - set(ratios)):
+        table.add_row(name, "—", _format_time(current[name].median), "[dim]new[/]")
+    return table
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import itertools
+
+from auditorium import Deck
+from benchmarks.harness import benchmark
+
+SLIDES = 500
+
+
+def _deck(generated: bool = False) -> Deck:
+    deck = Deck()
+    if generated:
+        @deck.generate(count=SLIDES)
+        def numbers():
+            for i in range(SLIDES):
+                async def slide(ctx, i=i):
+                    await ctx.md(f"# {i}")
+                yield f"Number {i}", slide
+        return deck
+    for i in range(SLIDES):
+        async def slide(ctx, i=i):
+            await ctx.md(f"# {i}")
+        slide.__name__ = f"slide_{i}"
+        deck.slide(slide, order=i if i % 2 else None)
+    return deck
+
+
+@benchmark("deck.slides", number=10_000)
+def slides():
+    """``Deck.slides`` plus an indexed lookup, as on every navigation."""
+    deck = _deck()
+    indices = itertools.cycle(range(SLIDES))
+
+    def op():
+        deck.slides[next(indices)]
+    return op
+
+
+@benchmark("deck.slides.generated", number=10_000)
+def slides_generated():
+    """Same, on a generated deck whose slides materialize once."""
+    deck = _deck(generated=True)
+    for i in range(SLIDES):
+        deck.slides[i]
+    indices = itertools.cycle(range(SLIDES))
+
+    def op():
+        deck.slides[next(indices)]
+    return op
+
+
+@benchmark("deck.find", number=10_000)
+def find():
+    """Named slide lookup, as for ``#slide-<name>`` URLs."""
+    deck = _deck()
+    names = itertools.cycle([f"slide_{i}" for i in range(0, SLIDES, 7)])
+
+    def op():
+        deck.find(next(names))
+    return op
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import os
+import tempfile
+from pathlib import Path
+
+from auditorium.assets import _inline_katex_fonts
+from auditorium.exporter import _build_html
+from benchmarks.harness import benchmark
+
+SLIDES = 500
+STATIC_DIR = Path(__file__).parent.parent / "auditorium" / "static"
+KATEX_DIR = STATIC_DIR / "vendor" / "katex"
+
+# Keep the stylesheet bundle cache out of the user's cache directory
+os.environ.setdefault("XDG_CACHE_HOME", tempfile.mkdtemp(prefix="auditorium-bench-"))
+
+
+def _slide_doms(features: bool) -> list[dict]:
+    doms = []
+    for i in range(SLIDES):
+        html = f"<div><h2>Slide {i}</h2></div><div><p>Point {i} with some text.</p></div>"
+        if features and i % 5 == 0:
+            html += f"<div><p>$e^{{i\\pi}} + {i} = 0$</p></div>"
+        if features and i % 7 == 0:
+            html += f"<div><pre><code class=\"language-python\">print({i})</code></pre></div>"
+        boundary = "initial" if i % 3 == 0 else "step"
+        doms.append({"html": html, "classes": "", "boundary": boundary, "duration": 0})
+    return doms
+
+
+def _build(features: bool):
+    doms = _slide_doms(features)
+    output = Path(tempfile.mkdtemp(prefix="auditorium-bench-")) / "deck.html"
+    # Warm the bundle cache; the benchmark measures steady-state builds
+    _build_html(doms, output, 1920, 1080, STATIC_DIR)
+
+    def op():
+        _build_html(doms, output, 1920, 1080, STATIC_DIR)
+    return op
+
+
+@benchmark("export.build_html", number=5)
+def build_html():
+    """Plain 500-slide deck."""
+    return _build(features=False)
+
+
+@benchmark("export.build_html.features", number=5)
+def build_html_features():
+    """500 slides using math and code, so KaTeX and highlight.js are bundled."""
+    return _build(features=True)
+
+
+@benchmark("export.inline_katex_fonts", number=5)
+def inline_katex_fonts():
+    """Inlining KaTeX fonts as data URIs, done when a bundle isn't cached."""
+    css = (KATEX_DIR / "katex.min.css").read_text()
+
+    def op():
+        _inline_katex_fonts(css, KATEX_DIR / "fonts")
+    return op
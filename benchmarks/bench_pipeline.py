@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+
+from auditorium.protocol import CODECS, Fragments, encode
+from auditorium.render import clear_cache, pygments
+from auditorium.slide import SlideContext
+from benchmarks.harness import benchmark, fake_session
+
+WINDOW = 16
+BATCH = 50
+
+_MARKDOWN = """
+## Section {n}
+
+Some *emphasis*, a [link](https://example.com) and `inline code`.
+
+- first point
+- second point with **bold**
+
+| a | b |
+|---|---|
+| {n} | {n} |
+"""
+
+
+def _append(n: int) -> dict:
+    return {"action": "append", "html": f"<div>item {n}</div>", "element_id": None}
+
+
+@benchmark("pipeline.send_mutation", number=500)
+def send_mutation():
+    """One mutation and its ack round trip (default ack window of 1)."""
+    session = fake_session()
+    counter = itertools.count()
+
+    async def op():
+        await session.send_mutation(_append(next(counter)))
+    return op
+
+
+@benchmark("pipeline.send_mutation.window", number=50, items=WINDOW)
+def send_mutation_window():
+    """Mutations issued concurrently with a pipelined ack window."""
+    session = fake_session(ack_window=WINDOW)
+    counter = itertools.count()
+
+    async def op():
+        await asyncio.gather(*(session.send_mutation(_append(next(counter))) for _ in range(WINDOW)))
+        await session.flush()
+    return op
+
+
+@benchmark("pipeline.send_mutation.batched", number=20, items=BATCH)
+def send_mutation_batched():
+    """Mutations queued into one batch frame, flushed at a boundary."""
+    session = fake_session(batch_mutations=True)
+    counter = itertools.count()
+
+    async def op():
+        for _ in range(BATCH):
+            await session.send_mutation(_append(next(counter)))
+        await session.flush()
+    return op
+
+
+def _encode_benchmark(codec: str) -> None:
+    @benchmark(f"protocol.encode.{codec}", number=2000)
+    def encode_mutation():
+        """Encoding a typical ``md`` append mutation."""
+        mutation = {
+            "type": "mutation", "action": "append", "id": 42, "element_id": None, "target": "#cols-1a2b3c4d-0",
+            "html": "<div><h2>Section</h2>\n<p>Some <em>emphasis</em> and <code>code</code>.</p></div>",
+        }
+
+        def op():
+            encode(mutation, codec)
+        return op
+
+
+for _codec in CODECS:
+    _encode_benchmark(_codec)
+
+
+@benchmark("protocol.fragments", number=2000)
+def fragments():
+    """Referencing a 2 kB fragment the client already holds."""
+    held = Fragments(128)
+    mutation = {"type": "mutation", "action": "append", "id": 42, "html": "<div>" + "x" * 2048 + "</div>"}
+    held.compact(mutation)
+
+    def op():
+        held.compact(mutation)
+    return op
+
+
+@benchmark("slide.md", number=200)
+def md():
+    """``ctx.md`` with a render cache miss every call."""
+    clear_cache()
+    ctx = SlideContext(fake_session())
+    counter = itertools.count()
+
+    async def op():
+        await ctx.md(_MARKDOWN.format(n=next(counter)))
+    return op
+
+
+@benchmark("slide.md.cached", number=200)
+def md_cached():
+    """``ctx.md`` with the same text, served from the render cache."""
+    ctx = SlideContext(fake_session())
+    text = _MARKDOWN.format(n=0)
+
+    async def op():
+        await ctx.md(text)
+    return op
+
+
+if pygments is not None:
+    _LISTING = "```python\n" + "\n".join(f"def f{i}(x):\n    return x * {i}  # note" for i in range(100)) + "\n```"
+
+    @benchmark("slide.md.highlight", number=50)
+    def md_highlight():
+        """``ctx.md`` of a 200-line listing highlighted on the server.
+
+        Every call misses the render cache; the listing itself comes from
+        the highlight cache after the first call.
+        """
+        clear_cache()
+        ctx = SlideContext(fake_session(highlight=True))
+        counter = itertools.count()
+
+        async def op():
+            await ctx.md(f"## Listing {next(counter)}\n\n{_LISTING}")
+        return op
+
+
+@benchmark("layout.columns", number=200)
+def columns():
+    """A three-column container and entering each region."""
+    ctx = SlideContext(fake_session())
+
+    async def op():
+        for region in await ctx.columns(3):
+            async with region:
+                pass
+    return op
+
+
+@benchmark("layout.rows", number=200)
+def rows():
+    """Rows with fixed and proportional sizes."""
+    ctx = SlideContext(fake_session())
+
+    async def op():
+        await ctx.rows(["auto", 1, 2, "auto"])
+    return op
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+import json
+import math
+import platform
+import re
+import statistics
+import subprocess
+import time
+from dataclasses import asdict, dataclass
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Callable
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+# Registered benchmarks by name, in definition order
+BENCHMARKS: dict[str, Benchmark] = {}
+
+
+@dataclass
+class Benchmark:
+    """A named operation timed ``number`` times per repeat.
+
+    *setup* is called before every repeat and returns the operation (sync
+    or async), so state such as a session's mirror starts fresh each time.
+    One call of the operation may do *items* units of work.
+    """
+
+    name: str
+    setup: Callable[[], Callable]
+    number: int
+    items: int = 1
+
+
+@dataclass
+class Result:
+    """Seconds per item across repeats."""
+
+    median: float
+    p95: float
+    min: float
+    repeat: int
+    number: int
+    items: int
+
+    @property
+    def per_second(self) -> float:
+        return 1 / self.median if self.median else float("inf")
+
+
+def benchmark(name: str, number: int = 100, items: int = 1) -> Callable:
+    """Register a setup function as benchmark *name*."""
+    def decorator(setup: Callable[[], Callable]) -> Callable:
+        BENCHMARKS[name] = Benchmark(name, setup, number, items)
+        return setup
+    return decorator
+
+
+class FakeWebSocket:
+    """In-process stand-in for a browser client.
+
+    Acks every message carrying an id on the next loop iteration, the
+    soonest a real client could, so the server path runs exactly as in
+    production minus the network.
+    """
+
+    def __init__(self) -> None:
+        self.session = None
+        self.messages = 0
+        self.bytes = 0
+
+    async def send_text(self, text: str) -> None:
+        self._receive(text)
+
+    async def send_bytes(self, data: bytes) -> None:
+        self._receive(data)
+
+    def _receive(self, payload: str | bytes) -> None:
+        from auditorium.protocol import decode
+
+        self.messages += 1
+        self.bytes += len(payload)
+        message = decode(payload)
+        if "id" in message:
+            asyncio.get_running_loop().call_soon(self.session.ack, message["id"])
+
+
+def fake_session(**settings):
+    """Return a session connected to a :class:`FakeWebSocket`."""
+    from auditorium.server import Session
+
+    ws = FakeWebSocket()
+    session = Session(ws=ws, **settings)
+    ws.session = session
+    return session
+
+
+def run(names: list[str] | None = None, repeat: int = 20) -> dict[str, Result]:
+    """Run the selected benchmarks (all by default) and return their results."""
+    selected = [BENCHMARKS[name] for name in names] if names is not None else list(BENCHMARKS.values())
+    return {bench.name: _measure(bench, repeat) for bench in selected}
+
+
+def select(patterns: list[str]) -> list[str]:
+    """Names of benchmarks matching any of the regular expressions."""
+    return [name for name in BENCHMARKS if any(re.search(p, name) for p in patterns)]
+
+
+def _measure(bench: Benchmark, repeat: int) -> Result:
+    samples = []
+    for _ in range(repeat):
+        op = bench.setup()
+        if inspect.iscoroutinefunction(op):
+            elapsed = asyncio.run(_time_async(op, bench.number))
+        else:
+            elapsed = _time_sync(op, bench.number)
+        samples.append(elapsed / (bench.number * bench.items))
+    samples.sort()
+    return Result(
+        median=statistics.median(samples),
+        p95=samples[max(0, math.ceil(0.95 * len(samples)) - 1)],
+        min=samples[0],
+        repeat=repeat,
+        number=bench.number,
+        items=bench.items,
+    )
+
+
+def _time_sync(op: Callable, number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        op()
+    return time.perf_counter() - start
+
+
+async def _time_async(op: Callable, number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        await op()
+    return time.perf_counter() - start
+
+
+# --- Baselines ---
+
+
+def save(results: dict[str, Result], path: Path) -> None:
+    """Write results and the environment they were measured in as JSON."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({
+        "meta": _environment(),
+        "results": {name: asdict(result) for name, result in results.items()},
+    }, indent=2) + "\n")
+
+
+def load(path: Path) -> tuple[dict, dict[str, Result]]:
+    """Read a baseline written by :func:`save`."""
+    data = json.loads(path.read_text())
+    return data["meta"], {name: Result(**fields) for name, fields in data["results"].items()}
+
+
+def baseline_path(name: str) -> Path:
+    """Resolve a baseline name (``BASELINE_DIR/<name>.json``) or path."""
+    path = Path(name)
+    if path.suffix == ".json" or path.exists():
+        return path
+    return BASELINE_DIR / f"{name}.json"
+
+
+def compare(base: dict[str, Result], current: dict[str, Result]) -> dict[str, float]:
+    """Ratio of current to baseline median per benchmark present in both."""
+    return {
+        name: current[name].median / base[name].median
+        for name in current
+        if name in base and base[name].median
+    }
+
+
+def _environment() -> dict:
+    try:
+        package = version("auditorium")
+    except PackageNotFoundError:
+        package = None
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).parent, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "auditorium": package,
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.node(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
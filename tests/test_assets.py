@@ -0,0 +1,52 @@
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from auditorium import assets
+from auditorium.assets import stylesheet_bundle, used_features
+
+STATIC_DIR = Path(assets.__file__).parent / "static"
+
+
+@pytest.mark.parametrize(("html", "math"), [
+    ("<p>$x^2$</p>", True),
+    ("<p>$$\\int_0^1 f$$</p>", True),
+    ('<span class="katex"><span>x</span></span>', True),
+    ("<p>costs $5 and $10</p>", False),
+    ("<pre><code>$ ls -la\n$ cd /tmp</code></pre>", False),
+    ("<p>only $5</p>", False),
+])
+def test_math_detection(html, math):
+    assert ("math" in used_features([{"html": html}])) is math
+
+
+def test_bundle_hit_reads_no_assets(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    static = tmp_path / "static"
+    shutil.copytree(STATIC_DIR, static)
+    features = frozenset({"math", "code"})
+    bundle = stylesheet_bundle(static, features)
+
+    def refuse(self):
+        raise AssertionError(f"read {self}")
+
+    monkeypatch.setattr(Path, "read_bytes", refuse)
+    monkeypatch.setattr(assets, "_build_bundle", refuse)
+    assert stylesheet_bundle(static, features) == bundle
+
+
+def test_editing_an_asset_rebuilds_the_bundle(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    static = tmp_path / "static"
+    shutil.copytree(STATIC_DIR, static)
+    before = stylesheet_bundle(static, frozenset())
+
+    theme = static / "theme.css"
+    theme.write_text(theme.read_text() + "\n.edited { color: red; }\n")
+    os.utime(theme, ns=(theme.stat().st_atime_ns, theme.stat().st_mtime_ns + 1))
+    after = stylesheet_bundle(static, frozenset())
+
+    assert after != before
+    assert ".edited" in after
@@ -0,0 +1,72 @@
+import asyncio
+
+from auditorium import bus as bus_module
+from auditorium.bus import Broker, Bus, _frame, _read_frame
+
+PAYLOAD = b"x" * 65536
+
+
+async def _stalled_subscriber(path, channel):
+    """A worker that subscribes to *channel* and then stops reading."""
+    reader, writer = await asyncio.open_unix_connection(str(path))
+    await _read_frame(reader)  # welcome
+    writer.write(_frame({"op": "sub", "channel": channel}))
+    await writer.drain()
+    return reader, writer
+
+
+def test_stalled_worker_is_resynced_without_holding_up_others(tmp_path, monkeypatch):
+    monkeypatch.setattr(bus_module, "BUS_QUEUE_LIMIT", 4)
+    path = tmp_path / "bus.sock"
+
+    async def scenario():
+        broker = Broker(path)
+        serving = asyncio.create_task(broker.serve())
+        while not path.exists():
+            await asyncio.sleep(0.01)
+        reader, writer = await _stalled_subscriber(path, "deck")
+        publisher = await Bus.connect(path)
+        listener = await Bus.connect(path)
+        received = []
+        overflows = []
+
+        async def on_frame(header, payload):
+            received.append(len(payload))
+
+        listener.subscribe("deck", on_frame)
+        listener.overflow_handlers.append(lambda: overflows.append(True))
+        await listener.writer.drain()
+        await asyncio.sleep(0.05)
+
+        total = 64
+        for _ in range(total):
+            publisher.publish("deck", PAYLOAD)
+            await publisher.writer.drain()
+        for _ in range(100):
+            if len(received) == total:
+                break
+            await asyncio.sleep(0.02)
+        queued = max(q.qsize() for q in broker.queues.values())
+
+        ops = []
+        while True:
+            try:
+                header, _, _ = await asyncio.wait_for(_read_frame(reader), 0.5)
+            except asyncio.TimeoutError:
+                break
+            ops.append(header["op"])
+
+        publisher.close()
+        listener.close()
+        writer.close()
+        serving.cancel()
+        return received, overflows, queued, ops
+
+    received, overflows, queued, ops = asyncio.run(scenario())
+    assert received == [len(PAYLOAD)] * 64
+    assert overflows == []
+    assert queued <= 4
+    assert "overflow" in ops
+    # Membership is resent after the dropped backlog, and frames were dropped
+    assert ops[ops.index("overflow") + 1] == "workers"
+    assert ops.count("pub") < 64
@@ -0,0 +1,135 @@
+import asyncio
+import threading
+
+import pytest
+
+from auditorium.cache import ResultCache, key_for
+
+
+def define(source: str, filename: str = "deck.py"):
+    """Compile a one-function module, as if loaded from a deck file."""
+    namespace = {}
+    exec(compile(source, filename, "exec"), namespace)
+    return namespace["make"]
+
+
+def double(n):
+    return n * 2
+
+
+def test_memory_tier_evicts_least_recently_used():
+    store = ResultCache(max_entries=2)
+    store.store("a", 1)
+    store.store("b", 2)
+    assert store.lookup("a") == (True, 1)  # a is now the most recent
+    store.store("c", 3)
+
+    assert store.lookup("b") == (False, None)
+    assert store.lookup("a") == (True, 1)
+    assert store.lookup("c") == (True, 3)
+    assert store.stats()["evictions"] == 1
+    assert store.stats()["entries"] == 2
+
+
+def test_disk_tier_evicts_least_recently_used_within_its_size(tmp_path):
+    store = ResultCache(tmp_path, max_entries=1, max_bytes=2500)
+    for key in "abc":
+        store.store(key, b"x" * 1000)
+    # Each pickle is a little over 1000 bytes, so only two fit
+    assert sorted(path.stem for path in tmp_path.glob("*.pkl")) == ["b", "c"]
+    assert store.stats()["disk_bytes"] <= 2500
+
+    fresh = ResultCache(tmp_path, max_entries=1)
+    assert fresh.lookup("b") == (True, b"x" * 1000)
+    assert fresh.stats()["disk_hits"] == 1
+
+
+def test_results_larger_than_the_disk_tier_stay_in_memory(tmp_path):
+    store = ResultCache(tmp_path, max_bytes=100)
+    store.store("big", b"x" * 1000)
+    assert list(tmp_path.glob("*.pkl")) == []
+    assert store.lookup("big") == (True, b"x" * 1000)
+
+
+def test_concurrent_misses_share_one_computation():
+    store = ResultCache()
+    calls = []
+
+    async def scenario():
+        gate = asyncio.Event()
+
+        async def run():
+            calls.append(1)
+            await gate.wait()
+            return 42
+
+        waiters = [asyncio.create_task(store.get_async("k", double, (1,), {}, run)) for _ in range(3)]
+        for _ in range(10):
+            await asyncio.sleep(0)
+        gate.set()
+        return await asyncio.gather(*waiters)
+
+    assert asyncio.run(scenario()) == [42, 42, 42]
+    assert calls == [1]
+    assert store.stats()["misses"] == 1
+
+
+def test_waiters_take_over_when_the_computing_session_is_cancelled():
+    store = ResultCache()
+    calls = []
+
+    async def scenario():
+        async def run():
+            calls.append(1)
+            await asyncio.sleep(0.01 if len(calls) > 1 else 60)
+            return len(calls)
+
+        first = asyncio.create_task(store.get_async("k", double, (1,), {}, run))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(store.get_async("k", double, (1,), {}, run))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await asyncio.wait_for(second, 1)
+
+    assert asyncio.run(scenario()) == 2
+    assert calls == [1, 1]
+
+
+def test_key_changes_with_the_function_body_and_arguments():
+    before = define("def make(n):\n    return n * 2\n")
+    same = define("def make(n):\n    return n * 2\n")
+    after = define("def make(n):\n    return n * 3\n")
+    assert key_for("k", before, (1,), {}) == key_for("k", same, (1,), {})
+    assert key_for("k", before, (1,), {}) != key_for("k", after, (1,), {})
+    assert key_for("k", before, (1,), {}) != key_for("k", before, (2,), {})
+    assert key_for("k", before, (1,), {}) != key_for("other", before, (1,), {})
+
+
+def test_unpicklable_arguments_are_rejected():
+    with pytest.raises(TypeError, match="picklable"):
+        key_for("k", double, (threading.Lock(),), {})
+
+
+def test_sync_cached_function_refuses_the_event_loop(tmp_path):
+    make = define(
+        "from auditorium.cache import cached\n"
+        "calls = []\n"
+        "@cached\n"
+        "def make(n):\n"
+        "    calls.append(n)\n"
+        "    return n + 1\n",
+        str(tmp_path / "deck.py"),
+    )
+
+    async def on_loop():
+        return make(1)
+
+    with pytest.raises(RuntimeError, match="ctx.compute"):
+        asyncio.run(on_loop())
+
+    async def off_loop():
+        return await asyncio.to_thread(make, 1), await asyncio.to_thread(make, 1)
+
+    assert asyncio.run(off_loop()) == (2, 2)
+    assert make.__wrapped__.__globals__["calls"] == [1]
+    assert len(list((tmp_path / ".auditorium-cache").glob("*.pkl"))) == 1
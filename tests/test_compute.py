@@ -0,0 +1,71 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from auditorium.compute import ComputePool
+
+
+def square(n):
+    return n * n
+
+
+def fail():
+    raise ValueError("nope")
+
+
+def sleep_forever(pid_file):
+    with open(pid_file, "w") as f:
+        f.write(str(os.getpid()))
+    time.sleep(60)
+
+
+def alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    # Reaped or a zombie awaiting its parent
+    with open(f"/proc/{pid}/stat") as f:
+        return f.read().split(") ")[1][0] != "Z"
+
+
+def test_process_calls_return_results_and_raise():
+    pool = ComputePool(workers=2)
+
+    async def scenario():
+        assert await pool.run(square, 7, process=True) == 49
+        assert await asyncio.gather(*(pool.run(square, n, process=True) for n in range(4))) == [0, 1, 4, 9]
+        with pytest.raises(ValueError, match="nope"):
+            await pool.run(fail, process=True)
+        assert await pool.run(square, 3) == 9
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="needs /proc")
+def test_cancelling_a_running_process_call_terminates_it(tmp_path):
+    pool = ComputePool(workers=1)
+    pid_file = tmp_path / "pid"
+
+    async def scenario():
+        call = asyncio.create_task(pool.run(sleep_forever, str(pid_file), process=True))
+        for _ in range(200):
+            if pid_file.exists() and pid_file.read_text():
+                break
+            await asyncio.sleep(0.01)
+        pid = int(pid_file.read_text())
+        assert alive(pid)
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+        for _ in range(200):
+            if not alive(pid):
+                break
+            await asyncio.sleep(0.01)
+        assert not alive(pid)
+        # The slot it held is free again
+        assert await asyncio.wait_for(pool.run(square, 5, process=True), 10) == 25
+
+    asyncio.run(scenario())
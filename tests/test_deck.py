@@ -0,0 +1,51 @@
+from auditorium.deck import Deck
+
+
+async def _intro(ctx):
+    """Opening slide."""
+
+
+async def _generated(ctx):
+    """Generated slide."""
+
+
+def test_single_generated_slide_is_materialized():
+    deck = Deck()
+
+    @deck.generate(count=1)
+    def one():
+        yield "Generated", _generated
+
+    slide = deck.slides[0]
+    assert slide.func is _generated
+    assert deck.meta(0).title == "Generated"
+    assert deck.fingerprint(0)
+
+
+def test_empty_generator_next_to_another():
+    deck = Deck()
+    deck.generate(count=0)(lambda: iter(()))
+    deck.generate([_intro, ("Generated", _generated)], count=2)
+
+    assert len(deck.slides) == 2
+    assert deck.slides[0].func is _intro
+    assert deck.meta(0).excerpt == "Opening slide."
+    assert deck.slides[1].name == "Generated"
+
+
+def test_find_covers_registered_and_expanded_generated_slides():
+    deck = Deck()
+    deck.slide(_intro)
+
+    @deck.generate(count=3)
+    def numbers():
+        for n in range(3):
+            yield f"Number {n}", _generated
+
+    assert deck.find("_intro") == 0
+    # Not expanded yet: reachable by position only
+    assert deck.find("Number 1") is None
+    assert deck.slides[2].name == "Number 1"
+    assert deck.find("Number 1") == 2
+    assert deck.find("Number 0") == 1
+    assert deck.find("missing") is None
@@ -0,0 +1,81 @@
+import pytest
+
+from auditorium.dom import Element, SlideDom, UnsupportedSelector
+
+
+def inner(markup: str) -> str:
+    el = Element("div")
+    el.set_inner_html(markup)
+    return el.inner_html()
+
+
+def test_mutations_build_the_same_markup_as_the_client():
+    dom = SlideDom()
+    for mutation in [
+        {"action": "append", "html": "<div><h1>Title</h1></div>"},
+        {"action": "append", "html": '<div id="cols"><div id="left"></div><div id="right"></div></div>'},
+        {"action": "push_target", "selector": "#left"},
+        {"action": "append", "html": "<div><p>left</p></div>", "element_id": "note"},
+        {"action": "pop_target"},
+        {"action": "append", "html": "<div><p>right</p></div>", "target": "#right"},
+        {"action": "set_class", "selector": "#cols", "cls": "wide dim"},
+        {"action": "remove_class", "selector": "#cols", "cls": "dim"},
+        {"action": "replace", "selector": "h1", "html": "New <em>title</em>"},
+        {"action": "remove", "selector": "#right > div"},
+        {"action": "remove", "selector": "#missing"},
+    ]:
+        dom.apply(mutation)
+
+    assert dom.snapshot() == {
+        "html": (
+            "<div><h1>New <em>title</em></h1></div>"
+            '<div id="cols" class="wide"><div id="left"><div id="note"><p>left</p></div></div>'
+            '<div id="right"></div></div>'
+        ),
+        "classes": "aud-slide-root",
+        "targets": [],
+    }
+
+
+def test_open_targets_survive_a_snapshot_round_trip():
+    dom = SlideDom()
+    dom.apply({"action": "append", "html": '<div id="box"></div>'})
+    dom.apply({"action": "push_target", "selector": "#box"})
+    copy = SlideDom()
+    copy.load(dom.snapshot())
+    copy.apply({"action": "append", "html": "<p>inside</p>"})
+
+    assert copy.snapshot()["html"] == '<div id="box"><p>inside</p></div>'
+    assert copy.snapshot()["targets"] == ["#box"]
+
+
+@pytest.mark.parametrize(("markup", "expected"), [
+    ("<p>a<p>b", "<p>a</p><p>b</p>"),
+    ("<p>a<div>b</div>", "<p>a</p><div>b</div>"),
+    ("<p>a</p></p>", "<p>a</p><p></p>"),
+    ("<ul><li>a<li>b<ul><li>c</ul><li>d</ul>", "<ul><li>a</li><li>b<ul><li>c</li></ul></li><li>d</li></ul>"),
+    ("<dl><dt>a<dd>b<dt>c</dl>", "<dl><dt>a</dt><dd>b</dd><dt>c</dt></dl>"),
+    (
+        "<table><tbody><tr><td>1<td>2<tr><td>3</tbody></table>",
+        "<table><tbody><tr><td>1</td><td>2</td></tr><tr><td>3</td></tr></tbody></table>",
+    ),
+    ("<button><p>a<div>b</div></button>", "<button><p>a</p><div>b</div></button>"),
+    ("a &amp; <br/>b<img src=x>", 'a &amp; <br>b<img src="x">'),
+])
+def test_implied_end_tags_match_the_browser(markup, expected):
+    assert inner(markup) == expected
+
+
+def test_selectors():
+    root = Element("#document")
+    root.set_inner_html('<div class="a b"><p id="x" data-k="v">1</p><span><p>2</p></span></div>')
+
+    assert root.query("#x").id == "x"
+    assert root.query("div.a.b > p").id == "x"
+    assert root.query("div span p").children == ["2"]
+    assert root.query('[data-k="v"]').id == "x"
+    assert root.query("em, span").tag == "span"
+    assert root.query("div > .missing") is None
+    for selector in ("p:first-child", "div + p", "div ~ p"):
+        with pytest.raises(UnsupportedSelector):
+            root.query(selector)
@@ -0,0 +1,53 @@
+import math
+
+from auditorium.metrics import Registry
+
+
+def test_render_exposition_text():
+    registry = Registry()
+    requests = registry.counter("requests_total", "Requests served")
+    registry.gauge("slide", "Slide of each session", lambda: {'a"b': 2, "c\nd": 0.5}, label="session")
+    latency = registry.histogram("latency_seconds", "Round trips", (0.1, 1.0))
+    requests.inc(3)
+    for value in (0.05, 0.5, 0.5, 5.0):
+        latency.observe(value)
+
+    assert registry.render() == "\n".join([
+        "# HELP requests_total Requests served",
+        "# TYPE requests_total counter",
+        "requests_total 3",
+        "# HELP slide Slide of each session",
+        "# TYPE slide gauge",
+        'slide{session="a\\"b"} 2',
+        'slide{session="c\\nd"} 0.5',
+        "# HELP latency_seconds Round trips",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{le="0.1"} 1',
+        'latency_seconds_bucket{le="1.0"} 3',
+        'latency_seconds_bucket{le="+Inf"} 4',
+        "latency_seconds_sum 6.05",
+        "latency_seconds_count 4",
+    ]) + "\n"
+
+
+def test_gauge_with_several_labels():
+    registry = Registry()
+    registry.gauge("cache", "Cache stats", lambda: {("render", "hits"): 4}, label=("cache", "stat"))
+
+    assert 'cache{cache="render",stat="hits"} 4' in registry.render()
+
+
+def test_histogram_quantiles():
+    registry = Registry()
+    latency = registry.histogram("latency_seconds", "Round trips", (0.1, 1.0))
+    assert math.isnan(latency.quantile(0.5))
+
+    for value in (0.05, 0.5, 0.5, 5.0):
+        latency.observe(value)
+    # Ranks interpolate linearly within their bucket
+    assert latency.quantile(0.25) == 0.1
+    assert latency.quantile(0.5) == 0.1 + 0.9 * 0.5
+    assert latency.quantile(0.75) == 1.0
+    # The open +Inf bucket reports its lower bound
+    assert latency.quantile(0.99) == 1.0
+    assert registry.collect()["latency_seconds"]["count"] == 4
@@ -0,0 +1,215 @@
+import json
+import random
+import re
+import shutil
+import subprocess
+from collections import OrderedDict
+from pathlib import Path
+
+import pytest
+
+from auditorium import protocol
+from auditorium.protocol import (
+    BATCH, CODECS, FRAGMENT_CAPACITY_LIMIT, FRAGMENT_MIN_SIZE, MESSAGE, MUTATIONS, Fragments, decode, encode,
+    negotiate, pack, unpack,
+)
+
+PROTOCOL_JS = Path(protocol.__file__).parent / "static" / "protocol.js"
+
+
+def full_mutation(action: str, fields: tuple[str, ...], message_id: int | None = 7) -> dict:
+    mutation = {"type": "mutation", "action": action, **{name: f"{name}-value" for name in fields}}
+    if message_id is not None:
+        mutation["id"] = message_id
+    return mutation
+
+
+def js_constants() -> dict:
+    """MESSAGE, BATCH and the ACTIONS table as written in protocol.js."""
+    source = PROTOCOL_JS.read_text()
+    table = re.search(r"const ACTIONS = \{(.*?)\n    \};", source, re.S).group(1)
+    actions = {
+        int(op): (action, tuple(re.findall(r"'(\w+)'", fields)))
+        for op, action, fields in re.findall(r"(\d+): \['(\w+)', \[([^\]]*)\]\]", table)
+    }
+    return {
+        "MESSAGE": int(re.search(r"const MESSAGE = (\d+);", source).group(1)),
+        "BATCH": int(re.search(r"const BATCH = (\d+);", source).group(1)),
+        "ACTIONS": actions,
+    }
+
+
+def test_js_opcode_table_matches_mutations():
+    constants = js_constants()
+    assert constants["MESSAGE"] == MESSAGE
+    assert constants["BATCH"] == BATCH
+    assert constants["ACTIONS"] == {op: (action, fields) for action, (op, fields) in MUTATIONS.items()}
+
+
+@pytest.mark.parametrize("codec", CODECS)
+@pytest.mark.parametrize("action", MUTATIONS)
+def test_every_mutation_round_trips(codec, action):
+    mutation = full_mutation(action, MUTATIONS[action][1])
+    assert decode(encode(mutation, codec)) == mutation
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_batches_and_other_messages_round_trip(codec):
+    batch = {
+        "type": "batch",
+        "id": 3,
+        "mutations": [
+            full_mutation(action, fields, message_id=None) for action, (_, fields) in MUTATIONS.items()
+        ] + [{"type": "mutation", "action": "future_action", "x": 1}],
+    }
+    assert decode(encode(batch, codec)) == batch
+    for message in ({"type": "slide", "index": 2, "total": 9}, {"type": "mutation", "action": "future_action"}):
+        assert decode(encode(message, codec)) == message
+
+
+def test_pack_drops_trailing_none_fields_only():
+    append = {"type": "mutation", "action": "append", "id": 1, "html": "<p>x</p>", "element_id": None}
+    assert pack(append) == [1, 1, "<p>x</p>"]
+    assert unpack(pack(append)) == {"type": "mutation", "action": "append", "id": 1, "html": "<p>x</p>"}
+
+    targeted = {**append, "target": "#left"}
+    assert pack(targeted) == [1, 1, "<p>x</p>", None, "#left"]
+    assert pack({"type": "mutation", "action": "pop_target", "id": 2}) == [7, 2]
+
+
+def test_pack_falls_back_to_plain_messages():
+    unknown = {"type": "mutation", "action": "future_action", "id": 1}
+    assert pack(unknown) == [MESSAGE, unknown]
+    batch = pack({"type": "batch", "id": 4, "mutations": [unknown]})
+    assert batch == [BATCH, 4, [[MESSAGE, unknown]]]
+
+
+def test_negotiate_picks_first_supported_codec():
+    assert negotiate(["zstd", "compact", "json"]) == "compact"
+    assert negotiate(["zstd"]) == "json"
+    assert negotiate([]) == "json"
+    assert negotiate(None) == "json"
+    assert negotiate(list(CODECS)) == CODECS[0]
+
+
+def test_compact_frames_are_smaller_than_json():
+    mutation = full_mutation("append", MUTATIONS["append"][1])
+    assert len(encode(mutation, "compact")) < len(encode(mutation, "json"))
+    assert isinstance(encode(mutation, "compact"), str)
+    if "msgpack" in CODECS:
+        assert isinstance(encode(mutation, "msgpack"), bytes)
+
+
+# --- The browser decoder, run under Node when available ---
+
+needs_node = pytest.mark.skipif(shutil.which("node") is None, reason="needs node")
+
+
+def run_js(script: str, frames: list) -> list:
+    """Feed encoded *frames* to protocol.js's decode in Node and return what *script* prints."""
+    payload = [
+        {"binary": list(frame)} if isinstance(frame, bytes) else {"text": frame} for frame in frames
+    ]
+    program = f"""
+globalThis.window = {{}};
+globalThis.location = {{ search: '' }};
+eval(require('fs').readFileSync({json.dumps(str(PROTOCOL_JS))}, 'utf8'));
+const protocol = window.auditoriumProtocol;
+const frames = {json.dumps(payload)}.map(f => f.text !== undefined ? f.text : new Uint8Array(f.binary).buffer);
+{script}
+"""
+    out = subprocess.run(["node"], input=program, capture_output=True, text=True, check=True).stdout
+    return json.loads(out)
+
+
+@needs_node
+@pytest.mark.parametrize("codec", CODECS)
+def test_browser_decodes_every_mutation(codec):
+    messages = [full_mutation(action, fields) for action, (_, fields) in MUTATIONS.items()]
+    messages.append({"type": "batch", "id": 9, "mutations": [
+        full_mutation("replace", ("selector", "html"), message_id=None),
+    ]})
+    # The fragment fields are consumed by the decoder's fragment cache
+    messages = [_without_fragments(m) for m in messages]
+    decoded = run_js(
+        "console.log(JSON.stringify(frames.map(f => protocol.decode(f))));",
+        [encode(m, codec) for m in messages],
+    )
+    assert decoded == messages
+
+
+def _without_fragments(message: dict) -> dict:
+    if message["type"] == "batch":
+        return {**message, "mutations": [_without_fragments(m) for m in message["mutations"]]}
+    return {k: v for k, v in message.items() if k not in ("fragment", "ref")}
+
+
+# --- Fragment references ---
+
+
+def js_fragment_capacity() -> int:
+    return int(re.search(r"const FRAGMENT_CAPACITY = (\d+);", PROTOCOL_JS.read_text()).group(1))
+
+
+def fragment_stream(count: int = 600, distinct: int = 200) -> list[dict]:
+    """Mutations cycling through more fragments than the client holds, with repeats."""
+    rng = random.Random(0)
+    return [
+        {"type": "mutation", "action": "append", "id": i,
+         "html": f"<p>{rng.randrange(distinct)}</p>".ljust(FRAGMENT_MIN_SIZE, " ")}
+        for i in range(count)
+    ]
+
+
+def test_js_fragment_capacity_fits_the_server_model():
+    capacity = js_fragment_capacity()
+    assert 0 < capacity <= FRAGMENT_CAPACITY_LIMIT
+    # The capacity the browser announces is used as-is, not clamped
+    assert Fragments(capacity).capacity == capacity
+    assert "resetFragments" in PROTOCOL_JS.read_text()
+
+
+def test_fragments_mirror_the_client_lru_past_capacity():
+    capacity = js_fragment_capacity()
+    fragments = Fragments(capacity)
+    client: OrderedDict[str, str] = OrderedDict()
+    refs = 0
+    for mutation in fragment_stream():
+        out = fragments.compact(mutation)
+        assert out is not mutation or mutation["html"] in client.values()
+        if "ref" in out:
+            # The client must still hold what it is referred to
+            assert out["ref"] in client
+            assert client[out["ref"]] == mutation["html"]
+            client.move_to_end(out["ref"])
+            refs += 1
+        else:
+            assert out["html"] == mutation["html"]
+            assert mutation["html"] not in client.values()
+            client[out["fragment"]] = out["html"]
+            if len(client) > capacity:
+                client.popitem(last=False)
+        assert list(client) == list(fragments.held)
+    assert 0 < refs < len(fragment_stream())
+
+
+def test_short_html_is_never_a_fragment():
+    fragments = Fragments(8)
+    mutation = {"type": "mutation", "action": "append", "html": "<p>short</p>"}
+    assert fragments.compact(mutation) is mutation
+    assert fragments.compact(mutation) is mutation
+    assert not fragments.held
+
+
+@needs_node
+@pytest.mark.parametrize("codec", CODECS)
+def test_browser_resolves_fragments_past_capacity(codec):
+    messages = fragment_stream()
+    fragments = Fragments(js_fragment_capacity())
+    frames = [encode(fragments.compact(m), codec) for m in messages]
+    decoded = run_js(
+        "protocol.resetFragments();"
+        "console.log(JSON.stringify(frames.map(f => protocol.decode(f).html)));",
+        frames,
+    )
+    assert decoded == [m["html"] for m in messages]
@@ -0,0 +1,48 @@
+import textwrap
+
+from auditorium.cli import _load_deck
+
+DECK = """
+from auditorium import Deck
+from auditorium.cache import cached
+
+deck = Deck()
+
+
+@cached
+def compute(n):
+    return n * {factor}
+
+
+def plain(n):
+    return n * {factor}
+
+
+@deck.slide
+async def uses_cached(ctx):
+    await ctx.md(str(await ctx.compute(compute, 2)))
+
+
+@deck.slide
+async def uses_plain(ctx):
+    await ctx.md(str(plain(2)))
+"""
+
+
+def _fingerprints(tmp_path, **fields):
+    path = tmp_path / "deck.py"
+    path.write_text(textwrap.dedent(DECK.format(**fields)))
+    deck = _load_deck(path)
+    return [deck.fingerprint(i) for i in range(len(deck.slides))]
+
+
+def test_editing_cached_helper_changes_fingerprint(tmp_path):
+    before = _fingerprints(tmp_path, factor=2)
+    after = _fingerprints(tmp_path, factor=3)
+
+    assert before[0] != after[0]
+    assert before[1] != after[1]
+
+
+def test_unchanged_cached_helper_keeps_fingerprint(tmp_path):
+    assert _fingerprints(tmp_path, factor=2) == _fingerprints(tmp_path, factor=2)
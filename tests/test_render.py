@@ -0,0 +1,30 @@
+from auditorium import render
+from auditorium.metrics import ServerMetrics
+
+
+def test_file_cache_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(render, "FILE_CACHE_SIZE", 2)
+    render.clear_cache()
+    paths = []
+    for n in range(3):
+        path = tmp_path / f"{n}.md"
+        path.write_text(f"# {n}")
+        paths.append(path)
+
+    render.read_markdown_file(paths[0])
+    render.read_markdown_file(paths[1])
+    render.read_markdown_file(paths[0])  # most recent again
+    render.read_markdown_file(paths[2])  # evicts 1
+
+    assert list(render._file_cache) == [paths[0].resolve(), paths[2].resolve()]
+    assert render.cache_info()["files"] == {"hits": 1, "misses": 3, "size": 2, "maxsize": 2}
+
+
+def test_render_cache_is_exported_as_metric():
+    render.clear_cache()
+    render.render_markdown("# cached")
+    render.render_markdown("# cached")
+
+    text = ServerMetrics().render()
+    assert 'auditorium_render_cache{cache="render",stat="hits"} 1' in text
+    assert 'auditorium_render_cache{cache="render",stat="misses"} 1' in text
@@ -0,0 +1,67 @@
+import json
+import time
+
+from fastapi.testclient import TestClient
+
+from auditorium.deck import Deck
+from auditorium.server import create_app
+
+
+def make_deck(selector: str) -> Deck:
+    deck = Deck()
+
+    @deck.slide
+    async def stepped(ctx):
+        await ctx.md("one")
+        await ctx.show('<p class="gone">x</p>')
+        await ctx.hide(selector)
+        await ctx.step()
+        await ctx.md("two")
+
+    return deck
+
+
+def receive(ws) -> dict:
+    message = json.loads(ws.receive_text())
+    if "id" in message:
+        ws.send_text(json.dumps({"type": "ack", "id": message["id"]}))
+    return message
+
+
+def start(client) -> str:
+    """Run the slide up to its step and drop the socket, returning the session id."""
+    with client.websocket_connect("/ws") as ws:
+        ws.send_text(json.dumps({"type": "hello", "slide": 0}))
+        session_id = receive(ws)["id"]
+        mutations = 0
+        while mutations < 3:
+            mutations += receive(ws)["type"] == "mutation"
+        time.sleep(0.1)
+    time.sleep(0.1)
+    return session_id
+
+
+def test_resume_sends_one_snapshot_and_continues_at_the_step():
+    with TestClient(create_app(make_deck(".gone"))) as client:
+        session_id = start(client)
+        with client.websocket_connect("/ws") as ws:
+            ws.send_text(json.dumps({"type": "hello", "slide": 0, "session": session_id}))
+            messages = [receive(ws) for _ in range(5)]
+            assert [m["type"] for m in messages] == ["session", "slide", "notes", "next_preview", "snapshot"]
+            assert messages[0]["id"] == session_id
+            assert messages[-1]["html"] == "<div><p>one</p></div><div></div>"
+
+            ws.send_text(json.dumps({"type": "keypress", "key": "ArrowRight"}))
+            message = receive(ws)
+            assert message["type"] == "mutation"
+            assert message["html"] == "<div><p>two</p></div>"
+
+
+def test_unsupported_selector_restarts_the_slide_on_resume():
+    with TestClient(create_app(make_deck("p:first-child"))) as client:
+        session_id = start(client)
+        with client.websocket_connect("/ws") as ws:
+            ws.send_text(json.dumps({"type": "hello", "slide": 0, "session": session_id}))
+            types = [receive(ws)["type"] for _ in range(4)]
+            # The mirror can't follow the selector, so the slide runs again from the top
+            assert types == ["session", "clear", "slide", "notes"]
@@ -0,0 +1,145 @@
+import asyncio
+import json
+
+from auditorium.deck import Deck
+from auditorium.server import Session, _run_slide, create_app
+
+
+class FakeSocket:
+    """Collects the frames a session sends, decoded."""
+
+    def __init__(self) -> None:
+        self.frames: list[dict] = []
+
+    async def send_text(self, text: str) -> None:
+        self.frames.append(json.loads(text))
+
+    async def send_bytes(self, data: bytes) -> None:
+        raise AssertionError("the json codec only sends text frames")
+
+
+async def settle() -> None:
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+def mutation(n: int) -> dict:
+    return {"action": "append", "html": f"<p>{n}</p>"}
+
+
+def test_window_of_one_waits_for_each_ack():
+    async def scenario():
+        ws = FakeSocket()
+        session = Session(ws=ws)
+        sending = asyncio.create_task(session.send_mutation(mutation(1)))
+        await settle()
+        assert not sending.done()
+        assert [frame["id"] for frame in ws.frames] == [1]
+
+        session.ack(1)
+        await settle()
+        assert sending.done()
+        assert session.pending_acks == {}
+
+    asyncio.run(scenario())
+
+
+def test_window_keeps_earlier_mutations_in_flight():
+    async def scenario():
+        ws = FakeSocket()
+        session = Session(ws=ws, ack_window=3)
+        for n in range(2):
+            await asyncio.wait_for(session.send_mutation(mutation(n)), 1)
+        third = asyncio.create_task(session.send_mutation(mutation(2)))
+        await settle()
+        # All three are out, but the window is full until the oldest is acked
+        assert [frame["id"] for frame in ws.frames] == [1, 2, 3]
+        assert not third.done()
+
+        session.ack(1)
+        await settle()
+        assert third.done()
+
+        flushing = asyncio.create_task(session.flush())
+        await settle()
+        assert not flushing.done()
+        session.ack(2)
+        session.ack(3)
+        await settle()
+        assert flushing.done()
+
+    asyncio.run(scenario())
+
+
+def test_cancel_slide_releases_pending_acks():
+    async def scenario():
+        session = Session(ws=FakeSocket())
+        sending = asyncio.create_task(session.send_mutation(mutation(1)))
+        await settle()
+        assert not sending.done()
+
+        session.cancel_slide()
+        await asyncio.wait_for(sending, 1)
+        assert session.pending_acks == {}
+
+    asyncio.run(scenario())
+
+
+class AckingSocket(FakeSocket):
+    """Acks every acked frame as soon as it arrives."""
+
+    session: Session
+
+    async def send_text(self, text: str) -> None:
+        await super().send_text(text)
+        frame = self.frames[-1]
+        if "id" in frame:
+            asyncio.get_running_loop().call_soon(self.session.ack, frame["id"])
+
+
+def test_batches_flush_at_step_sleep_and_end():
+    deck = Deck(batch_mutations=True)
+
+    @deck.slide
+    async def timed(ctx):
+        await ctx.md("a")
+        await ctx.md("b")
+        await ctx.step()
+        await ctx.md("c")
+        await ctx.sleep(0.01)
+        await ctx.md("d")
+        await ctx.md("e")
+
+    async def scenario():
+        app = create_app(deck)
+        ws = AckingSocket()
+        session = ws.session = Session(ws=ws, batch_mutations=True, auto_step=0.01, slide_delay=0)
+        await _run_slide(app, session)
+        return ws.frames
+
+    frames = asyncio.run(scenario())
+    batches = [frame for frame in frames if frame["type"] == "batch"]
+    assert [len(batch["mutations"]) for batch in batches] == [2, 1, 2]
+    assert not any(frame["type"] == "mutation" for frame in frames)
+    # One acked frame per boundary, each with its own id
+    assert [frame["id"] for frame in frames if "id" in frame] == [1, 2, 3]
+    assert frames[-1]["type"] == "finished"
+
+
+def test_batch_waits_for_flush():
+    async def scenario():
+        ws = FakeSocket()
+        session = Session(ws=ws, batch_mutations=True)
+        for n in range(3):
+            await asyncio.wait_for(session.send_mutation(mutation(n)), 1)
+        assert ws.frames == []
+
+        flushing = asyncio.create_task(session.flush())
+        await settle()
+        assert [frame["type"] for frame in ws.frames] == ["batch"]
+        assert not flushing.done()
+        session.ack(ws.frames[0]["id"])
+        await settle()
+        assert flushing.done()
+
+    asyncio.run(scenario())
@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+from auditorium.deck import Deck
+from auditorium.server import _go_to_slide, _handle_keypress, _new_session, _run_slide, create_app
+
+from test_session import AckingSocket, settle
+
+
+def make_deck(runs: list[str]) -> Deck:
+    deck = Deck(speculate=True)
+
+    @deck.slide
+    async def first(ctx):
+        await ctx.md("one")
+
+    @deck.slide
+    async def second(ctx):
+        runs.append("second")
+        await ctx.md("two-a")
+        await ctx.step()
+        await ctx.md("two-b")
+
+    @deck.slide
+    async def third(ctx):
+        runs.append("third")
+        await ctx.md("three")
+
+    return deck
+
+
+def sent(ws: AckingSocket, text: str) -> bool:
+    return any(text in json.dumps(frame) for frame in ws.frames)
+
+
+async def start(deck: Deck, hello: dict | None = None):
+    app = create_app(deck)
+    ws = AckingSocket()
+    session = ws.session = _new_session(app, ws, hello or {})
+    await _run_slide(app, session)
+    return app, ws, session
+
+
+def test_advancing_adopts_the_speculative_run():
+    runs = []
+
+    async def scenario():
+        app, ws, session = await start(make_deck(runs))
+        spec = session.speculation
+        assert spec is not None and spec.current_slide == 1
+        await asyncio.wait_for(spec.ready.wait(), 1)
+        # Run ahead of time, but nothing reaches the client yet
+        assert runs == ["second"]
+        assert not sent(ws, "two-a")
+
+        await _handle_keypress(app, session, "ArrowRight")
+        await asyncio.wait_for(spec.adopted.wait(), 1)
+        assert sent(ws, "two-a") and not sent(ws, "two-b")
+
+        await settle()
+        await _handle_keypress(app, session, "ArrowRight")
+        await asyncio.wait_for(session.slide_task, 1)
+        assert sent(ws, "two-b")
+        # Adopted, not run again (the third slide is now speculated in turn)
+        assert runs.count("second") == 1
+        session.cancel_slide()
+        session.discard_speculation()
+
+    asyncio.run(scenario())
+
+
+def test_other_navigation_discards_the_speculative_run():
+    runs = []
+
+    async def scenario():
+        app, ws, session = await start(make_deck(runs))
+        spec = session.speculation
+        await asyncio.wait_for(spec.ready.wait(), 1)
+        running = spec.slide_task
+
+        await _go_to_slide(app, session, 2)
+        await asyncio.wait_for(session.slide_task, 1)
+        await settle()
+        assert running.done() and not spec.adopted.is_set()
+        assert sent(ws, "three") and not sent(ws, "two-a")
+        assert runs == ["second", "third"]
+
+    asyncio.run(scenario())
+
+
+def test_capturing_sessions_do_not_speculate():
+    async def scenario():
+        app, ws, session = await start(make_deck([]), {"capture": True})
+        return session.speculation
+
+    assert asyncio.run(scenario()) is None